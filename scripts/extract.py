@@ -60,11 +60,24 @@ ATTRIBUTION CONFIDENCE:
 - UNKNOWN: Relay scripts, orphan broadcast_text
 """
 
+import argparse
 import csv
+import hashlib
+import json
+import math
+import re
+import threading
+import time
 import yaml
 import os
+import sqlite3
+from decimal import Decimal
+import msgpack
 import mysql.connector
-from collections import defaultdict
+from mysql.connector import pooling
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 
 # =========================
 # CONFIG
@@ -90,6 +103,46 @@ DIALOG_TYPES = {
 }
 
 OUTPUT_CSV = "../data/all_npc_dialog.csv"
+STAGED_OUTPUT_CSV = OUTPUT_CSV + ".tmp"  # streamed here, promoted after the regression check
+QUERY_CACHE_DIR = "../data/extract_cache"
+
+# Set (via --snapshot) to run against a local SQLite snapshot instead of DB_CONFIG
+SNAPSHOT_DB = None
+
+# Set (via --profile) to an ExtractionProfiler to time extractors and queries
+PROFILER = None
+
+# Every table extract.py reads, with the columns worth indexing for its joins/filters
+SNAPSHOT_TABLES = {
+    "creature_template": ["Entry", "GossipMenuId", "DisplayId1"],
+    "creature_model_info": ["modelid"],
+    "broadcast_text": ["Id"],
+    "script_texts": ["entry"],
+    "npc_text_broadcast_text": ["Id"],
+    "gossip_menu": ["entry"],
+    "gossip_menu_option": ["menu_id", "action_menu_id", "action_script_id"],
+    "gameobject_template": ["entry", "data3"],
+    "gameobject": ["guid"],
+    "page_text": ["entry"],
+    "item_template": ["entry"],
+    "quest_template": ["entry", "StartScript", "CompleteScript"],
+    "creature_questrelation": ["quest"],
+    "creature_involvedrelation": ["quest"],
+    "questgiver_greeting": ["Entry"],
+    "trainer_greeting": ["Entry"],
+    "creature_ai_scripts": ["creature_id"],
+    "dbscripts_on_creature_death": ["id", "dataint"],
+    "dbscripts_on_creature_movement": ["id", "dataint"],
+    "dbscripts_on_relay": ["id", "dataint"],
+    "dbscripts_on_quest_start": ["id", "dataint"],
+    "dbscripts_on_quest_end": ["id", "dataint"],
+    "dbscripts_on_gossip": ["id", "dataint"],
+    "dbscripts_on_event": ["id", "dataint"],
+    "dbscripts_on_go_template_use": ["id", "dataint"],
+    "dbscripts_on_go_use": ["id", "dataint"],
+    "dbscripts_on_spell": ["id", "dataint"],
+}
+CSV_FIELDNAMES = ["npc_name", "sex", "dialog_type", "quest_id", "text"]
 RACE_YAML = "../data/npc_race.yaml"
 SEX_YAML = "../data/npc_sex.yaml"
 
@@ -132,10 +185,75 @@ EXCLUDED_SUBSTRINGS = [
 # =========================
 
 def get_connection():
+    if SNAPSHOT_DB:
+        return SnapshotConnection(SNAPSHOT_DB)
     return mysql.connector.connect(**DB_CONFIG)
 
-def is_clean_text(text):
-    """Checks if text is non-empty and doesn't contain generic combat noise."""
+def get_connection_pool(size):
+    """Pool of read-only connections for running extractors in parallel (max 32 per mysql.connector)."""
+    if SNAPSHOT_DB:
+        return SnapshotPool(SNAPSHOT_DB)
+    return pooling.MySQLConnectionPool(
+        pool_name="extract",
+        pool_size=min(size, pooling.CNX_POOL_MAXSIZE),
+        **DB_CONFIG,
+    )
+
+class TextFilter:
+    """
+    Case-insensitive substring blocklist compiled into a single regex.
+
+    Rules can be added at any time (add_rules recompiles). Every blocked text
+    increments hits[rule] for the first rule in list order it contains, so we can
+    see which rules remove how much text. --jobs threads share one filter, so hits
+    are counted under a lock.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self.lowered = []
+        self.hits = Counter()
+        self.lock = threading.Lock()
+        self.pattern = None
+        self.add_rules(rules)
+
+    def add_rules(self, rules):
+        for rule in rules:
+            if rule.lower() not in self.lowered:
+                self.rules.append(rule)
+                self.lowered.append(rule.lower())
+        alternation = "|".join(re.escape(rule) for rule in self.lowered)
+        self.pattern = re.compile(alternation) if self.rules else None
+
+    def blocking_rule(self, text, count=True):
+        """Return the rule that blocks text (counting the hit unless count=False), or None."""
+        if self.pattern is None:
+            return None
+        lowered = text.lower()
+        if not self.pattern.search(lowered):
+            return None
+        # The regex finds the leftmost match; credit the first rule in list order instead
+        rule = next(rule for rule, low in zip(self.rules, self.lowered) if low in lowered)
+        if count:
+            with self.lock:
+                self.hits[rule] += 1
+        return rule
+
+    def print_hits(self):
+        print("\n🧹 Text filter hits:")
+        for rule in sorted(self.rules, key=lambda r: self.hits[r], reverse=True):
+            print(f"  {self.hits[rule]:>8}  {rule!r}")
+
+
+TEXT_FILTER = TextFilter(EXCLUDED_SUBSTRINGS)
+
+
+def is_clean_text(text, count=True):
+    """
+    Checks if text is non-empty and doesn't contain generic combat noise (see TEXT_FILTER).
+    count=False leaves the filter and profiler counters alone, for callers that
+    test several candidate texts of one row and count the row once themselves.
+    """
     if text is None:
         return False
     
@@ -143,12 +261,33 @@ def is_clean_text(text):
     if not t:
         return False
     
-    for pattern in EXCLUDED_SUBSTRINGS:
-        if pattern.lower() in t.lower():
-            return False
+    if TEXT_FILTER.blocking_rule(t, count) is not None:
+        if PROFILER and count:
+            PROFILER.count_dropped()
+        return False
             
     return True
 
+
+def count_filtered(*texts):
+    """Count one filter hit for a row dropped over its texts, crediting the first blocked one."""
+    for text in texts:
+        if text and text.strip() and not is_clean_text(text, count=False):
+            is_clean_text(text)
+            return
+
+def open_cursor(db, query_cache=None):
+    """
+    Dictionary cursor on db, served through query_cache when one is given.
+    Under --profile only queries that reach the database are profiled.
+    """
+    cursor = db.cursor(dictionary=True)
+    if PROFILER:
+        cursor = PROFILER.wrap(cursor)
+    if query_cache:
+        cursor = query_cache.wrap(cursor)
+    return cursor
+
 def load_existing_yaml(filepath):
     """Load existing YAML file if it exists, otherwise return empty dict."""
     if os.path.exists(filepath):
@@ -156,9 +295,413 @@ def load_existing_yaml(filepath):
             return yaml.safe_load(f) or {}
     return {}
 
+# =========================
+# SNAPSHOT BACKEND
+# =========================
+#
+# A SQLite copy of the SNAPSHOT_TABLES, so extraction can run without a MariaDB
+# server (local iteration, CI benchmarks). The connection/cursor classes mimic the
+# subset of mysql.connector the extractors use, so they run unchanged.
+
+def sqlite_column_type(mysql_type):
+    mysql_type = mysql_type.lower()
+    if "int" in mysql_type:
+        return "INTEGER"
+    if mysql_type in ("float", "double", "real"):
+        return "REAL"
+    if mysql_type == "decimal":
+        return "NUMERIC"
+    if "blob" in mysql_type or "binary" in mysql_type:
+        return "BLOB"
+    return "TEXT"
+
+
+def sqlite_value(value):
+    """SQLite can't bind Decimal or bytearray; everything else passes through."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return value
+
+
+def export_snapshot(snapshot_path, tables=SNAPSHOT_TABLES, batch_size=5000):
+    """
+    Copy `tables` from the MySQL world DB (DB_CONFIG) into an indexed SQLite file.
+    Written to a temp file and renamed, so a failed export never leaves a partial snapshot.
+    """
+    tmp_path = snapshot_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    db = mysql.connector.connect(**DB_CONFIG)
+    cursor = db.cursor()
+    out = sqlite3.connect(tmp_path)
+
+    for table, index_columns in tables.items():
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+        """, (DB_CONFIG["database"], table))
+        columns = cursor.fetchall()
+        if not columns:
+            print(f"  [WARN] {table} not found in {DB_CONFIG['database']}, skipping")
+            continue
+
+        column_defs = ", ".join(f'"{name}" {sqlite_column_type(kind)}' for name, kind in columns)
+        out.execute(f'CREATE TABLE "{table}" ({column_defs})')
+
+        column_list = ", ".join(f"`{name}`" for name, _ in columns)
+        insert = f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(columns))})'
+        cursor.execute(f"SELECT {column_list} FROM `{table}`")
+        count = 0
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            out.executemany(insert, [[sqlite_value(v) for v in row] for row in batch])
+            count += len(batch)
+
+        known_columns = {name for name, _ in columns}
+        for column in index_columns:
+            if column in known_columns:
+                out.execute(f'CREATE INDEX "idx_{table}_{column}" ON "{table}" ("{column}")')
+
+        out.commit()
+        print(f"  {table}: {count} rows")
+
+    out.execute("ANALYZE")
+    out.commit()
+    out.close()
+    cursor.close()
+    db.close()
+    os.replace(tmp_path, snapshot_path)
+
+
+class SnapshotConnection:
+    """mysql.connector-style connection over a SQLite snapshot file (opened read-only)."""
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Snapshot not found: {path} (create it with --export-snapshot)")
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        # MySQL functions used by the extractors
+        self.conn.create_function("FLOOR", 1, lambda x: None if x is None else math.floor(x))
+        self.conn.create_function("MOD", 2, lambda a, b: None if a is None or not b else a % b)
+
+    def cursor(self, dictionary=True):
+        return SnapshotCursor(self.conn.cursor())
+
+    def close(self):
+        self.conn.close()
+
+
+class SnapshotCursor:
+    """Dictionary cursor over SQLite that accepts mysql.connector's %s placeholders."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=None):
+        self.cursor.execute(sql.replace("%s", "?"), tuple(params or ()))
+
+    def fetchall(self):
+        columns = [d[0] for d in self.cursor.description or ()]
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def close(self):
+        self.cursor.close()
+
+
+class SnapshotPool:
+    """Pool stand-in: SQLite connections are cheap, so every request opens a new one."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def get_connection(self):
+        return SnapshotConnection(self.path)
+
+
+# =========================
+# QUERY CACHE
+# =========================
+
+TABLE_REF_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?", re.IGNORECASE)
+
+
+def pack_value(value):
+    """msgpack fallback for MySQL types it can't encode (FLOOR/MOD return DECIMAL)."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+class QueryCache:
+    """
+    Disk cache of query results, so re-running extraction (e.g. while iterating on
+    attribution heuristics) doesn't re-query tables that haven't changed.
+
+    Each SELECT is stored as one msgpack file keyed by the SQL text, its params and
+    the CHECKSUM TABLE of every table it reads. Checksums are taken once per table
+    per run. refresh=True ignores existing entries and rewrites them.
+    --jobs threads share one cache, so checksums and hit counts are updated under a lock.
+    """
+
+    def __init__(self, cache_dir=QUERY_CACHE_DIR, refresh=False):
+        self.cache_dir = cache_dir
+        self.refresh = refresh
+        self.checksums = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def wrap(self, cursor):
+        return CachedCursor(cursor, self)
+
+    def table_checksums(self, cursor, tables):
+        # Held across the CHECKSUM query so concurrent extractors don't checksum a table twice
+        with self.lock:
+            missing = [t for t in tables if t not in self.checksums]
+            if missing:
+                cursor.execute("CHECKSUM TABLE " + ", ".join(f"`{t}`" for t in missing))
+                for r in cursor.fetchall():
+                    self.checksums[r["Table"].rsplit(".", 1)[-1]] = r["Checksum"]
+            return [(t, self.checksums.get(t)) for t in tables]
+
+    def count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def key(self, cursor, sql, params):
+        tables = sorted(set(TABLE_REF_PATTERN.findall(sql)))
+        h = hashlib.sha256()
+        h.update(" ".join(sql.split()).encode("utf-8"))
+        h.update(repr(params).encode("utf-8"))
+        h.update(repr(self.table_checksums(cursor, tables)).encode("utf-8"))
+        return h.hexdigest()
+
+    def load(self, key):
+        path = os.path.join(self.cache_dir, f"{key}.msgpack")
+        if self.refresh or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            cached = msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+        return [dict(zip(cached["columns"], values)) for values in cached["rows"]]
+
+    def store(self, key, rows):
+        columns = list(rows[0].keys()) if rows else []
+        payload = msgpack.packb(
+            {"columns": columns, "rows": [[r[c] for c in columns] for r in rows]},
+            default=pack_value,
+            use_bin_type=True,
+        )
+        path = os.path.join(self.cache_dir, f"{key}.msgpack")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"  # two extractors may store the same query
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+
+class CachedCursor:
+    """Dictionary-cursor stand-in that serves execute()/fetchall() from a QueryCache."""
+
+    def __init__(self, cursor, cache):
+        self.cursor = cursor
+        self.cache = cache
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        key = self.cache.key(self.cursor, sql, params)
+        rows = self.cache.load(key)
+        self.cache.count(hit=rows is not None)
+        if rows is None:
+            self.cursor.execute(sql, params)
+            rows = self.cursor.fetchall()
+            self.cache.store(key, rows)
+        elif PROFILER:
+            PROFILER.count_cache_hit()
+        self.rows = rows
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        self.cursor.close()
+
+
+# =========================
+# PROFILING
+# =========================
+
+def approx_row_bytes(row):
+    return sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in row.values())
+
+
+def profile_stage(name):
+    """Attribute time, queries and is_clean_text drops to `name` (no-op without --profile)."""
+    return PROFILER.stage(name) if PROFILER else nullcontext()
+
+
+class ExtractionProfiler:
+    """
+    Per-stage (extractor / preload) timings, row counts and query stats for --profile.
+
+    Queries and is_clean_text drops are attributed to the stage active on the
+    current thread, so --jobs runs are profiled correctly. Queries are recorded
+    below the query cache; cache hits are counted separately per stage.
+    With explain=True the plan of every distinct SELECT is captured once.
+    """
+
+    def __init__(self, explain=False):
+        self.explain = explain
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.queries = []
+        self.plans = {}
+        self.started = time.perf_counter()
+
+    def stage_stats(self, name):
+        """Stats dict of stage `name`; the caller holds self.lock."""
+        return self.stages.setdefault(name, {
+            "wall_seconds": 0.0,
+            "queries": 0,
+            "query_seconds": 0.0,
+            "query_cache_hits": 0,
+            "rows_fetched": 0,
+            "bytes_fetched": 0,
+            "rows_emitted": 0,
+            "rows_dropped_unclean": 0,
+        })
+
+    def add(self, name, **amounts):
+        with self.lock:
+            stats = self.stage_stats(name)
+            for key, amount in amounts.items():
+                stats[key] += amount
+
+    @property
+    def current(self):
+        return getattr(self.local, "stage", None) or "(unstaged)"
+
+    @contextmanager
+    def stage(self, name):
+        outer = getattr(self.local, "stage", None)
+        self.local.stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, wall_seconds=time.perf_counter() - start)
+            self.local.stage = outer
+
+    def wrap(self, cursor):
+        return ProfilingCursor(cursor, self)
+
+    def count_dropped(self):
+        self.add(self.current, rows_dropped_unclean=1)
+
+    def count_cache_hit(self):
+        self.add(self.current, query_cache_hits=1)
+
+    def add_emitted(self, name, count):
+        self.add(name, rows_emitted=count)
+
+    def record_query(self, sql, seconds, rows):
+        stage = self.current
+        row_bytes = sum(approx_row_bytes(r) for r in rows)
+        with self.lock:
+            stats = self.stage_stats(stage)
+            stats["queries"] += 1
+            stats["query_seconds"] += seconds
+            stats["rows_fetched"] += len(rows)
+            stats["bytes_fetched"] += row_bytes
+            self.queries.append({
+                "stage": stage,
+                "sql": sql,
+                "seconds": seconds,
+                "rows": len(rows),
+                "bytes": row_bytes,
+            })
+
+    def capture_plan(self, cursor, sql, params):
+        if not self.explain or sql in self.plans or not sql.upper().startswith("SELECT"):
+            return
+        prefix = "EXPLAIN QUERY PLAN " if SNAPSHOT_DB else "EXPLAIN "
+        try:
+            cursor.execute(prefix + sql, params)
+            self.plans[sql] = cursor.fetchall()
+        except Exception as e:
+            self.plans[sql] = [{"error": str(e)}]
+
+    def write_report(self, path):
+        report = {
+            "total_seconds": time.perf_counter() - self.started,
+            "stages": self.stages,
+            "queries": sorted(self.queries, key=lambda q: q["seconds"], reverse=True),
+            "plans": self.plans,
+            "text_filter_hits": dict(TEXT_FILTER.hits),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    def print_summary(self, top_queries=10):
+        print("\n⏱  Extraction profile (sorted by wall time):")
+        print(f"  {'stage':<38} {'wall s':>8} {'query s':>8} {'queries':>7} {'cached':>7} "
+              f"{'fetched':>9} {'MB':>7} {'emitted':>8} {'dropped':>8}")
+        for name, st in sorted(self.stages.items(), key=lambda kv: kv[1]["wall_seconds"], reverse=True):
+            print(f"  {name:<38} {st['wall_seconds']:>8.2f} {st['query_seconds']:>8.2f} {st['queries']:>7} "
+                  f"{st['query_cache_hits']:>7} {st['rows_fetched']:>9} {st['bytes_fetched'] / 1e6:>7.1f} "
+                  f"{st['rows_emitted']:>8} {st['rows_dropped_unclean']:>8}")
+
+        print(f"\n  Slowest {top_queries} queries:")
+        for q in sorted(self.queries, key=lambda q: q["seconds"], reverse=True)[:top_queries]:
+            print(f"  {q['seconds']:>8.2f}s {q['rows']:>8} rows  [{q['stage']}] {q['sql'][:90]}")
+
+
+class ProfilingCursor:
+    """Cursor wrapper that times execute()+fetchall() and records them on the profiler."""
+
+    def __init__(self, cursor, profiler):
+        self.cursor = cursor
+        self.profiler = profiler
+        self.sql = None
+        self.seconds = 0.0
+
+    def execute(self, sql, params=None):
+        self.sql = " ".join(sql.split())
+        self.profiler.capture_plan(self.cursor, self.sql, params)
+        start = time.perf_counter()
+        self.cursor.execute(sql, params)
+        self.seconds = time.perf_counter() - start
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self.cursor.fetchall()
+        self.profiler.record_query(self.sql, self.seconds + time.perf_counter() - start, rows)
+        return rows
+
+    def close(self):
+        self.cursor.close()
+
+
 # =========================
 # EXTRACTION FUNCTIONS
 # =========================
+#
+# Every extractor has the signature extractor(cursor, npc_meta, preloaded). It is a
+# generator that yields dialog rows as they are produced and returns the set of
+# broadcast_text ids it consumed (seen = yield from extractor(...)).
+# `preloaded` holds tables loaded once per run by load_shared_tables and joined
+# in Python by the extractors.
 
 def load_npc_metadata(cursor):
     """
@@ -182,7 +725,145 @@ def load_npc_metadata(cursor):
     return {r["npc_id"]: r for r in cursor.fetchall()}
 
 
-def extract_scriptdev2_texts(cursor, npc_meta):
+def load_broadcast_text(cursor):
+    """
+    Load broadcast_text once per run.
+
+    SOURCE: broadcast_text
+
+    Text vs Text1 is chosen here (first one passing is_clean_text), so extractors
+    only fetch broadcast_text ids and join in Python instead of each one joining
+    the table server-side.
+
+    Returns: dict bt_id -> stripped text, only for ids with usable text
+    """
+    cursor.execute("SELECT Id, Text, Text1 FROM broadcast_text WHERE Id > 0")
+
+    texts = {}
+    for row in cursor.fetchall():
+        txt = row["Text"] if is_clean_text(row["Text"], count=False) else row["Text1"]
+        if is_clean_text(txt, count=False):
+            texts[row["Id"]] = txt.strip()
+        else:
+            count_filtered(row["Text"], row["Text1"])
+
+    return texts
+
+
+def load_page_text(cursor):
+    """
+    Load page_text once per run for resolve_page_chain.
+
+    SOURCE: page_text
+
+    Returns a dict with keys:
+      - 'pages': entry -> (text, next_page)
+      - 'chains': memoized page lists for acyclic chains, keyed by start page
+      - 'cyclic': page lists for start pages whose chain loops
+    """
+    cursor.execute("SELECT entry, text, next_page FROM page_text")
+    pages = {r["entry"]: (r["text"], r["next_page"]) for r in cursor.fetchall()}
+    return {"pages": pages, "chains": {}, "cyclic": {}}
+
+
+def resolve_page_chain(page_text, start_page):
+    """
+    Assemble a book: follow page_text.next_page from start_page.
+
+    Returns the list of stripped page texts that pass is_clean_text, in reading order.
+    Chains are memoized per page, so books sharing pages are only walked once.
+    A chain that loops back on itself stops at the first repeated page.
+    """
+    pages = page_text["pages"]
+    chains = page_text["chains"]
+
+    if start_page in chains:
+        return chains[start_page]
+    if start_page in page_text["cyclic"]:
+        return page_text["cyclic"][start_page]
+
+    walk = []
+    visited = set()
+    tail = []
+    page_id = start_page
+    while page_id and page_id in pages:
+        if page_id in chains:
+            tail = chains[page_id]
+            break
+        if page_id in visited:
+            print(f"  [WARN] page_text chain from {start_page} loops at page {page_id}")
+            book = [pages[p][0].strip() for p in walk if is_clean_text(pages[p][0])]
+            page_text["cyclic"][start_page] = book
+            return book
+        visited.add(page_id)
+        walk.append(page_id)
+        next_page = pages[page_id][1]
+        page_id = next_page if next_page != 0 else None
+
+    # Acyclic: every page on the walk gets its own memoized suffix
+    book = tail
+    for page_id in reversed(walk):
+        text = pages[page_id][0]
+        if is_clean_text(text):
+            book = [text.strip()] + book
+        chains[page_id] = book
+
+    return book
+
+
+def load_shared_tables(cursor):
+    """Preload tables shared by several extractors (passed to each as `preloaded`)."""
+    return {
+        "broadcast_text": load_broadcast_text(cursor),
+        "page_text": load_page_text(cursor),
+    }
+
+
+def build_name_key_trie(creatures):
+    """
+    Build a prefix trie of creature name keys for script_texts comment matching.
+
+    Key = LOWER(REPLACE(Name, ' ', '_')), as in the old SQL LIKE pattern. Since '_' is
+    a single-character wildcard in LIKE, a '_' in a key is kept as a wildcard edge.
+
+    Returns: nested dicts char -> node; node[None] = list of (entry, name) ending there
+    """
+    trie = {}
+    for entry, name in creatures:
+        if name is None:
+            continue  # CONCAT(NULL, ...) never matched
+        node = trie
+        for ch in name.replace(" ", "_").lower():
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append((entry, name))
+    return trie
+
+
+def match_name_keys(trie, comment):
+    """
+    Return every (entry, name) whose key is a prefix of comment
+    (equivalent of comment LIKE CONCAT(key, '%'), case-insensitive like MySQL's default collation).
+    """
+    if comment is None:
+        return []
+
+    matches = list(trie.get(None, ()))
+    nodes = [trie]
+    for ch in comment.lower():
+        next_nodes = []
+        for node in nodes:
+            for child in (node.get(ch), node.get("_") if ch != "_" else None):
+                if child is not None:
+                    next_nodes.append(child)
+                    matches.extend(child.get(None, ()))
+        if not next_nodes:
+            break
+        nodes = next_nodes
+
+    return matches
+
+
+def extract_scriptdev2_texts(cursor, npc_meta, preloaded):
     """
     Extract ScriptDev2 C++ script texts.
     
@@ -193,23 +874,29 @@ def extract_scriptdev2_texts(cursor, npc_meta):
     
     FLOW:
     script_texts.entry < 0 (negative IDs)
-    -> script_texts.comment LIKE creature_name pattern (HEURISTIC)
+    -> script_texts.comment starts with creature name key (HEURISTIC, see build_name_key_trie)
     -> creature_template.ScriptName match (if available)
+
+    The name match is done in Python against a trie of creature name keys, in one
+    pass over script_texts, instead of a LIKE-CONCAT join that MySQL evaluates for
+    every script_texts x creature_template pair.
     """
-    rows = []
     seen = set()
 
+    cursor.execute("""
+        SELECT Entry, Name
+        FROM creature_template
+        WHERE ScriptName IS NOT NULL
+    """)
+    name_trie = build_name_key_trie((r["Entry"], r["Name"]) for r in cursor.fetchall())
+
     cursor.execute("""
         SELECT
             st.entry AS script_entry,
             st.content_default AS text,
             st.broadcast_text_id,
-            st.comment,
-            ct.Entry AS npc_id,
-            ct.Name AS npc_name
+            st.comment
         FROM script_texts st
-        LEFT JOIN creature_template ct ON ct.ScriptName IS NOT NULL
-            AND st.comment LIKE CONCAT(LOWER(REPLACE(ct.Name, ' ', '_')), '%')
         WHERE st.entry < 0
           AND st.content_default IS NOT NULL
           AND st.content_default != ''
@@ -219,26 +906,27 @@ def extract_scriptdev2_texts(cursor, npc_meta):
         if not is_clean_text(row["text"]):
             continue
 
-        # Try to extract NPC name from comment (heuristic)
-        npc_name = row["npc_name"]
-        if not npc_name and row["comment"]:
-            npc_name = row["comment"].split()[0].replace('_', ' ').title()
+        # Like the old LEFT JOIN: one row per matching creature, or one unmatched row
+        for npc_id, npc_name in match_name_keys(name_trie, row["comment"]) or [(None, None)]:
+            # Try to extract NPC name from comment (heuristic)
+            if not npc_name and row["comment"]:
+                npc_name = row["comment"].split()[0].replace('_', ' ').title()
 
-        rows.append({
-            "npc_name": npc_name or "Unknown",
-            "sex": npc_meta.get(row["npc_id"], {}).get("sex") if row["npc_id"] else None,
-            "dialog_type": DIALOG_TYPES["GOSSIP"],  # Best guess - these are spoken lines
-            "quest_id": None,
-            "text": row["text"].strip(),
-        })
+            yield {
+                "npc_name": npc_name or "Unknown",
+                "sex": npc_meta.get(npc_id, {}).get("sex") if npc_id else None,
+                "dialog_type": DIALOG_TYPES["GOSSIP"],  # Best guess - these are spoken lines
+                "quest_id": None,
+                "text": row["text"].strip(),
+            }
 
         if row["broadcast_text_id"]:
             seen.add(row["broadcast_text_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_creature_death(cursor, npc_meta):
+def extract_dbscripts_creature_death(cursor, npc_meta, preloaded):
     """
     Extract creature death script dialogue.
     
@@ -272,7 +960,7 @@ def extract_dbscripts_creature_death(cursor, npc_meta):
     - Buddy attribution is reliable when present
     - data_flags=16 just changes buddy search method (guid vs entry)
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
@@ -282,18 +970,15 @@ def extract_dbscripts_creature_death(cursor, npc_meta):
             d.data_flags,
             d.search_radius,
             d.dataint AS bt_id,
-            bt.Text,
-            bt.Text1,
             d.comments
         FROM dbscripts_on_creature_death d
-        JOIN broadcast_text bt ON bt.Id = d.dataint
         WHERE d.command = 0
-          AND bt.Id > 0
+          AND d.dataint > 0
     """)
 
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if not is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is None:
             continue
 
         # Determine speaker based on data_flags
@@ -321,20 +1006,20 @@ def extract_dbscripts_creature_death(cursor, npc_meta):
         # Get NPC details
         npc = npc_meta.get(speaker_entry) if speaker_entry else None
 
-        rows.append({
+        yield {
             "npc_name": npc["npc_name"] if npc else "Unknown",
             "sex": npc["sex"] if npc else None,
             "dialog_type": DIALOG_TYPES["GOSSIP"],
             "quest_id": None,
-            "text": txt.strip(),
-        })
+            "text": txt,
+        }
 
         seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_creature_movement(cursor, npc_meta):
+def extract_dbscripts_creature_movement(cursor, npc_meta, preloaded):
     """
     Extract creature waypoint movement script dialogue.
     
@@ -371,7 +1056,7 @@ def extract_dbscripts_creature_movement(cursor, npc_meta):
     - Some older DBs may use different ID formatting
     - Waypoint-triggered dialogue may be conditional (event-based)
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
@@ -381,20 +1066,17 @@ def extract_dbscripts_creature_movement(cursor, npc_meta):
             d.data_flags,
             d.search_radius,
             d.dataint AS bt_id,
-            bt.Text,
-            bt.Text1,
             d.comments,
             FLOOR(d.id / 100) AS derived_creature_entry,
             MOD(d.id, 100) AS script_number
         FROM dbscripts_on_creature_movement d
-        JOIN broadcast_text bt ON bt.Id = d.dataint
         WHERE d.command = 0
-          AND bt.Id > 0
+          AND d.dataint > 0
     """)
 
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if not is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is None:
             continue
 
         # Determine speaker based on data_flags and actual DB patterns
@@ -433,20 +1115,20 @@ def extract_dbscripts_creature_movement(cursor, npc_meta):
         if not npc:
             speaker_entry = None
 
-        rows.append({
+        yield {
             "npc_name": npc["npc_name"] if npc else "Unknown",
             "sex": npc["sex"] if npc else None,
             "dialog_type": DIALOG_TYPES["GOSSIP"],
             "quest_id": None,
-            "text": txt.strip(),
-        })
+            "text": txt,
+        }
 
         seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_relay(cursor, npc_meta):
+def extract_dbscripts_relay(cursor, npc_meta, preloaded):
     """
     Extract relay script dialogue.
     
@@ -460,41 +1142,38 @@ def extract_dbscripts_relay(cursor, npc_meta):
     
     IMPORTANT: Do NOT join id to creature_template.entry - these are different ID spaces!
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
         SELECT
             d.id AS relay_id,
-            d.dataint AS bt_id,
-            bt.Text,
-            bt.Text1
+            d.dataint AS bt_id
         FROM dbscripts_on_relay d
-        JOIN broadcast_text bt ON bt.Id = d.dataint
         WHERE d.command = 0
-          AND bt.Id > 0
+          AND d.dataint > 0
     """)
 
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if not is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is None:
             continue
 
         # Relay scripts have no inherent speaker
-        rows.append({
+        yield {
             "npc_name": "Unknown_relaydb",
             "sex": None,
             "dialog_type": DIALOG_TYPES["GOSSIP"],
             "quest_id": None,
-            "text": txt.strip(),
-        })
+            "text": txt,
+        }
 
         seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_quest_start(cursor, npc_meta):
+def extract_dbscripts_quest_start(cursor, npc_meta, preloaded):
     """
     Extract quest start script dialogue.
     
@@ -507,41 +1186,38 @@ def extract_dbscripts_quest_start(cursor, npc_meta):
     -> creature_questrelation.id = creature_template.entry (quest giver)
     -> dbscripts_on_quest_start.dataint = broadcast_text.Id
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
         SELECT DISTINCT
             cqr.id AS npc_id,
             qt.entry AS quest_id,
-            bt.Id AS bt_id,
-            bt.Text,
-            bt.Text1
+            dqs.dataint AS bt_id
         FROM dbscripts_on_quest_start dqs
-        JOIN broadcast_text bt ON bt.Id = dqs.dataint
         JOIN quest_template qt ON qt.StartScript = dqs.id
         JOIN creature_questrelation cqr ON cqr.quest = qt.entry
-        WHERE dqs.command = 0 AND bt.Id > 0
+        WHERE dqs.command = 0 AND dqs.dataint > 0
     """)
 
     for row in cursor.fetchall():
         npc = npc_meta.get(row["npc_id"])
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
+        txt = broadcast_text.get(row["bt_id"])
         
-        if is_clean_text(txt):
-            rows.append({
+        if txt is not None:
+            yield {
                 "npc_name": npc["npc_name"] if npc else "Unknown_quest_start",
                 "sex": npc["sex"] if npc else None,
                 "dialog_type": DIALOG_TYPES["QUEST_ACCEPT"],
                 "quest_id": row["quest_id"],
-                "text": txt.strip(),
-            })
+                "text": txt,
+            }
             seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_quest_end(cursor, npc_meta):
+def extract_dbscripts_quest_end(cursor, npc_meta, preloaded):
     """
     Extract quest completion script dialogue.
     
@@ -554,41 +1230,38 @@ def extract_dbscripts_quest_end(cursor, npc_meta):
     -> creature_involvedrelation.id = creature_template.entry (quest ender)
     -> dbscripts_on_quest_end.dataint = broadcast_text.Id
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
         SELECT DISTINCT
             cir.id AS npc_id,
             qt.entry AS quest_id,
-            bt.Id AS bt_id,
-            bt.Text,
-            bt.Text1
+            dqe.dataint AS bt_id
         FROM dbscripts_on_quest_end dqe
-        JOIN broadcast_text bt ON bt.Id = dqe.dataint
         JOIN quest_template qt ON qt.CompleteScript = dqe.id
         JOIN creature_involvedrelation cir ON cir.quest = qt.entry
-        WHERE dqe.command = 0 AND bt.Id > 0
+        WHERE dqe.command = 0 AND dqe.dataint > 0
     """)
 
     for row in cursor.fetchall():
         npc = npc_meta.get(row["npc_id"])
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
+        txt = broadcast_text.get(row["bt_id"])
         
-        if is_clean_text(txt):
-            rows.append({
+        if txt is not None:
+            yield {
                 "npc_name": npc["npc_name"] if npc else "Unknown_dbscripts_quest_end",
                 "sex": npc["sex"] if npc else None,
                 "dialog_type": DIALOG_TYPES["QUEST_COMPLETE"],
                 "quest_id": row["quest_id"],
-                "text": txt.strip(),
-            })
+                "text": txt,
+            }
             seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_gossip(cursor, npc_meta):
+def extract_dbscripts_gossip(cursor, npc_meta, preloaded):
     """
     Extract gossip script dialogue (when player clicks gossip option).
     
@@ -626,7 +1299,7 @@ def extract_dbscripts_gossip(cursor, npc_meta):
     → gossip_menu_option.menu_id → gossip_menu_option.action_script_id
     → dbscripts_on_gossip.id → dbscripts_on_gossip.dataint → broadcast_text.Id
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
@@ -640,21 +1313,18 @@ def extract_dbscripts_gossip(cursor, npc_meta):
             dsg.data_flags,
             dsg.buddy_entry,
             dsg.dataint AS bt_id,
-            bt.Text,
-            bt.Text1,
             dsg.comments
         FROM gossip_menu_option gmo
         JOIN dbscripts_on_gossip dsg ON dsg.id = gmo.action_script_id
-        JOIN broadcast_text bt ON bt.Id = dsg.dataint
         LEFT JOIN creature_template ct ON ct.GossipMenuId = gmo.menu_id
         WHERE dsg.command = 0
-          AND bt.Id > 0
+          AND dsg.dataint > 0
           AND gmo.action_script_id > 0
     """)
 
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if not is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is None:
             continue
 
         # Determine speaker based on context
@@ -675,20 +1345,62 @@ def extract_dbscripts_gossip(cursor, npc_meta):
         
         npc = npc_meta.get(speaker_entry) if speaker_entry else None
 
-        rows.append({
+        yield {
             "npc_name": npc["npc_name"] if npc else "Unknown_dbscripts_gossip",
             "sex": npc["sex"] if npc else None,
             "dialog_type": DIALOG_TYPES["GOSSIP"],
             "quest_id": None,
-            "text": txt.strip(),
-        })
+            "text": txt,
+        }
 
         seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
+
+
+def load_gossip_owner_graph(cursor, npc_meta):
+    """
+    Bulk-load everything find_menu_owners needs to walk gossip menus in memory.
 
+    SOURCES: creature_template (via npc_meta), gameobject_template, gossip_menu_option
 
-def find_menu_owners(cursor, start_menu_id, max_depth=10):
+    Returns a dict with keys:
+      - 'creatures': menu_id -> list of (entry, name) from creature_template.GossipMenuId
+      - 'gameobjects': menu_id -> list of (entry, name) from gameobject_template.data3
+      - 'parents': menu_id -> list of parent menu_ids (reverse of action_menu_id)
+    """
+    creatures = defaultdict(list)
+    for npc_id, npc in npc_meta.items():
+        if npc["gossip_menu_id"] is not None:
+            creatures[npc["gossip_menu_id"]].append((npc_id, npc["npc_name"]))
+
+    gameobjects = defaultdict(list)
+    cursor.execute("""
+        SELECT entry, name, data3
+        FROM gameobject_template
+        WHERE data3 IS NOT NULL
+    """)
+    for r in cursor.fetchall():
+        gameobjects[r["data3"]].append((r["entry"], r["name"]))
+
+    parents = defaultdict(list)
+    cursor.execute("""
+        SELECT DISTINCT menu_id, action_menu_id
+        FROM gossip_menu_option
+        WHERE action_menu_id IS NOT NULL
+          AND action_menu_id NOT IN (0, -1)
+    """)
+    for r in cursor.fetchall():
+        parents[r["action_menu_id"]].append(r["menu_id"])
+
+    return {
+        "creatures": creatures,
+        "gameobjects": gameobjects,
+        "parents": parents,
+    }
+
+
+def find_menu_owners(graph, start_menu_id, max_depth=10):
     """
     Find owners for a gossip_menu entry by walking upward via gossip_menu_option.action_menu_id.
     Returns a dict with keys:
@@ -696,6 +1408,9 @@ def find_menu_owners(cursor, start_menu_id, max_depth=10):
       - 'gameobjects': list of (entry, name)
     If none found, lists will be empty.
 
+    Walks the in-memory graph from load_gossip_owner_graph, so each orphan costs one
+    BFS over dict lookups and no queries. Not memoized: the walk stops on owners found
+    anywhere on the current level, so a menu's owners aren't a function of its parents'.
     max_depth prevents infinite loops; visited guards against cycles.
     """
     owners = {"creatures": [], "gameobjects": []}
@@ -711,40 +1426,22 @@ def find_menu_owners(cursor, start_menu_id, max_depth=10):
             visited.add(menu_id)
 
             # 1) Direct creature owners
-            cursor.execute("""
-                SELECT Entry, Name FROM creature_template
-                WHERE GossipMenuId = %s
-            """, (menu_id,))
-            for r in cursor.fetchall():
-                owners["creatures"].append((r["Entry"], r["Name"]))
+            owners["creatures"].extend(graph["creatures"].get(menu_id, ()))
 
             if owners["creatures"]:
                 # If we found creature owners for this menu_id, they are canonical — stop searching up from this branch
                 continue
 
             # 2) Direct gameobject owner (data3 is commonly used for gossip/quest GO links in many mangos schemas)
-            # If your DB uses another field, change data3 -> dataN accordingly.
-            cursor.execute("""
-                SELECT entry, name FROM gameobject_template
-                WHERE data3 = %s
-            """, (menu_id,))
-            for r in cursor.fetchall():
-                owners["gameobjects"].append((r["entry"], r["name"]))
+            # If your DB uses another field, change data3 -> dataN accordingly in load_gossip_owner_graph.
+            owners["gameobjects"].extend(graph["gameobjects"].get(menu_id, ()))
 
             if owners["gameobjects"]:
                 # If go owners found, canonical for this branch
                 continue
 
             # 3) Find parent menus (options that point to this menu as action_menu_id)
-            cursor.execute("""
-                SELECT DISTINCT menu_id
-                FROM gossip_menu_option
-                WHERE action_menu_id = %s
-                  AND action_menu_id IS NOT NULL
-                  AND action_menu_id NOT IN (0, -1)
-            """, (menu_id,))
-            for r in cursor.fetchall():
-                parent_menu_id = r["menu_id"]
+            for parent_menu_id in graph["parents"].get(menu_id, ()):
                 if parent_menu_id not in visited:
                     next_queue.append(parent_menu_id)
 
@@ -754,7 +1451,7 @@ def find_menu_owners(cursor, start_menu_id, max_depth=10):
     return owners
 
 
-def extract_gossip_menu_text(cursor, npc_meta):
+def extract_gossip_menu_text(cursor, npc_meta, preloaded):
     """
     Extract gossip menu text and attempt to attribute it to creatures or gameobjects.
 
@@ -766,7 +1463,7 @@ def extract_gossip_menu_text(cursor, npc_meta):
     - If gameobject owners found -> add as item_text with go name
     - If none -> leave as Unknown_gossip_menu (will be separated to investigation later)
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     # PHASE 1: Direct creature links (canonical, fast)
@@ -845,35 +1542,36 @@ def extract_gossip_menu_text(cursor, npc_meta):
     print(f"    Total {len(menu_to_ntbt)} gossip menus to process")
 
     if not menu_to_ntbt:
-        return rows, seen
+        return seen
 
     # Build a map of ntbt -> broadcast_text rows for efficient lookup
     ntbt_ids = list(set(menu_to_ntbt.values()))
     if not ntbt_ids:
-        return rows, seen
+        return seen
         
     placeholders = ",".join(["%s"] * len(ntbt_ids))
     cursor.execute(f"""
         SELECT ntbt.Id AS ntbt_id,
-               bt.Id AS bt_id,
-               bt.Text,
-               bt.Text1
+               ntbt.BroadcastTextId0, ntbt.BroadcastTextId1, ntbt.BroadcastTextId2,
+               ntbt.BroadcastTextId3, ntbt.BroadcastTextId4, ntbt.BroadcastTextId5,
+               ntbt.BroadcastTextId6, ntbt.BroadcastTextId7
         FROM npc_text_broadcast_text ntbt
-        JOIN broadcast_text bt ON bt.Id IN (
-            ntbt.BroadcastTextId0, ntbt.BroadcastTextId1, ntbt.BroadcastTextId2,
-            ntbt.BroadcastTextId3, ntbt.BroadcastTextId4, ntbt.BroadcastTextId5,
-            ntbt.BroadcastTextId6, ntbt.BroadcastTextId7
-        )
-        WHERE ntbt.Id IN ({placeholders}) AND bt.Id > 0
+        WHERE ntbt.Id IN ({placeholders})
     """, tuple(ntbt_ids))
 
-    # Map ntbt_id -> list of broadcast rows
+    # Map ntbt_id -> list of distinct broadcast_text ids (slot order)
     ntbt_to_bts = defaultdict(list)
     for r in cursor.fetchall():
-        ntbt_to_bts[r["ntbt_id"]].append(r)
+        for slot in range(8):
+            bt_id = r[f"BroadcastTextId{slot}"]
+            if bt_id and bt_id > 0 and bt_id not in ntbt_to_bts[r["ntbt_id"]]:
+                ntbt_to_bts[r["ntbt_id"]].append(bt_id)
 
     # PHASE 4: Process all menus
+    # Orphan menus are resolved against an in-memory ownership graph loaded once,
+    # instead of up to three queries per menu per BFS level.
     print("  Phase 4: Extracting text and attributing to owners...")
+    owner_graph = load_gossip_owner_graph(cursor, npc_meta)
     processed_menus = 0
     direct_attributed = 0
     indirect_attributed = 0
@@ -894,64 +1592,64 @@ def extract_gossip_menu_text(cursor, npc_meta):
             direct_attributed += 1
         else:
             # No direct link - try BFS traversal
-            owners = find_menu_owners(cursor, menu_id)
+            owners = find_menu_owners(owner_graph, menu_id)
             if owners["creatures"] or owners["gameobjects"]:
                 indirect_attributed += 1
 
         # Extract broadcast texts for this menu
         bts = ntbt_to_bts.get(ntbt_id, [])
-        for bt_row in bts:
-            txt = bt_row["Text"] if is_clean_text(bt_row["Text"]) else bt_row["Text1"]
-            if not is_clean_text(txt):
+        for bt_id in bts:
+            txt = broadcast_text.get(bt_id)
+            if txt is None:
                 continue
 
             # Attribute based on ownership
             if owners["creatures"]:
                 for (creature_entry, creature_name) in owners["creatures"]:
                     npc = npc_meta.get(creature_entry)
-                    rows.append({
+                    yield {
                         "npc_name": npc["npc_name"] if npc else creature_name or "Unknown",
                         "sex": npc["sex"] if npc else None,
                         "dialog_type": DIALOG_TYPES["GOSSIP"],
                         "quest_id": None,
-                        "text": txt.strip(),
-                    })
-                    seen.add(bt_row["bt_id"])
-                continue  # processed this bt_row
+                        "text": txt,
+                    }
+                    seen.add(bt_id)
+                continue  # processed this bt_id
 
             # Gameobject owners -> treat as ITEM_TEXT
             if owners["gameobjects"]:
                 for (go_entry, go_name) in owners["gameobjects"]:
-                    rows.append({
+                    yield {
                         "npc_name": go_name or f"GameObject_{go_entry}",
                         "sex": None,
                         "dialog_type": DIALOG_TYPES["ITEM_TEXT"],
                         "quest_id": None,
-                        "text": txt.strip(),
-                    })
-                    seen.add(bt_row["bt_id"])
+                        "text": txt,
+                    }
+                    seen.add(bt_id)
                 continue
 
             # No owners: fallback to Unknown_gossip_menu
             unknown_count += 1
-            rows.append({
+            yield {
                 "npc_name": "Unknown_gossip_menu",
                 "sex": None,
                 "dialog_type": DIALOG_TYPES["GOSSIP"],
                 "quest_id": None,
-                "text": txt.strip(),
-            })
-            seen.add(bt_row["bt_id"])
+                "text": txt,
+            }
+            seen.add(bt_id)
 
     print(f"    Processed {processed_menus} menus:")
     print(f"      - Direct attribution: {direct_attributed}")
     print(f"      - Indirect attribution: {indirect_attributed}")
     print(f"      - Unknown: {unknown_count}")
 
-    return rows, seen
+    return seen
 
 
-def extract_dbscripts_misc(cursor, npc_meta):
+def extract_dbscripts_misc(cursor, npc_meta, preloaded):
     """
     Extract miscellaneous dbscript dialogue from tables without direct creature links.
     
@@ -982,7 +1680,7 @@ def extract_dbscripts_misc(cursor, npc_meta):
     
     NOTE: dbscripts_on_gossip has been moved to its own function with proper attribution
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     # Event scripts - truly unknown speaker
@@ -991,28 +1689,25 @@ def extract_dbscripts_misc(cursor, npc_meta):
             d.id AS event_id,
             d.buddy_entry,
             d.data_flags,
-            d.dataint AS bt_id,
-            bt.Text,
-            bt.Text1
+            d.dataint AS bt_id
         FROM dbscripts_on_event d
-        JOIN broadcast_text bt ON bt.Id = d.dataint
-        WHERE d.command = 0 AND bt.Id > 0
+        WHERE d.command = 0 AND d.dataint > 0
     """)
     
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is not None:
             # Try buddy if present
             speaker_entry = row["buddy_entry"] if row["buddy_entry"] else None
             npc = npc_meta.get(speaker_entry) if speaker_entry else None
             
-            rows.append({
+            yield {
                 "npc_name": npc["npc_name"] if npc else "Unknown_dbscripts_misc",
                 "sex": npc["sex"] if npc else None,
                 "dialog_type": DIALOG_TYPES["GOSSIP"],
                 "quest_id": None,
-                "text": txt.strip(),
-            })
+                "text": txt,
+            }
             seen.add(row["bt_id"])
 
     # GO template use scripts
@@ -1022,29 +1717,26 @@ def extract_dbscripts_misc(cursor, npc_meta):
             got.name AS go_name,
             d.buddy_entry,
             d.data_flags,
-            d.dataint AS bt_id,
-            bt.Text,
-            bt.Text1
+            d.dataint AS bt_id
         FROM dbscripts_on_go_template_use d
-        JOIN broadcast_text bt ON bt.Id = d.dataint
         LEFT JOIN gameobject_template got ON got.entry = d.id
-        WHERE d.command = 0 AND bt.Id > 0
+        WHERE d.command = 0 AND d.dataint > 0
     """)
     
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is not None:
             # Buddy may speak, otherwise unknown
             speaker_entry = row["buddy_entry"] if row["buddy_entry"] else None
             npc = npc_meta.get(speaker_entry) if speaker_entry else None
             
-            rows.append({
+            yield {
                 "npc_name": npc["npc_name"] if npc else row["go_name"] or "Unknown_dbscripts_misc",
                 "sex": npc["sex"] if npc else None,
                 "dialog_type": DIALOG_TYPES["GOSSIP"],
                 "quest_id": None,
-                "text": txt.strip(),
-            })
+                "text": txt,
+            }
             seen.add(row["bt_id"])
 
     # GO use scripts (by guid)
@@ -1055,36 +1747,33 @@ def extract_dbscripts_misc(cursor, npc_meta):
             got.name AS go_name,
             d.buddy_entry,
             d.data_flags,
-            d.dataint AS bt_id,
-            bt.Text,
-            bt.Text1
+            d.dataint AS bt_id
         FROM dbscripts_on_go_use d
-        JOIN broadcast_text bt ON bt.Id = d.dataint
         LEFT JOIN gameobject go ON go.guid = d.id
         LEFT JOIN gameobject_template got ON got.entry = go.id
-        WHERE d.command = 0 AND bt.Id > 0
+        WHERE d.command = 0 AND d.dataint > 0
     """)
     
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is not None:
             # Buddy may speak, otherwise unknown
             speaker_entry = row["buddy_entry"] if row["buddy_entry"] else None
             npc = npc_meta.get(speaker_entry) if speaker_entry else None
             
-            rows.append({
+            yield {
                 "npc_name": npc["npc_name"] if npc else row["go_name"] or "Unknown_dbscripts_misc",
                 "sex": npc["sex"] if npc else None,
                 "dialog_type": DIALOG_TYPES["GOSSIP"],
                 "quest_id": None,
-                "text": txt.strip(),
-            })
+                "text": txt,
+            }
             seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_ai_scripts(cursor, npc_meta):
+def extract_ai_scripts(cursor, npc_meta, preloaded):
     """
     Extract creature AI combat script dialogue.
     
@@ -1096,42 +1785,50 @@ def extract_ai_scripts(cursor, npc_meta):
     -> action1/2/3_type = 1 (TALK action)
     -> action1/2/3_param1 = broadcast_text.Id
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
-        SELECT DISTINCT
+        SELECT
             cas.creature_id AS npc_id,
-            bt.Id AS bt_id,
-            bt.Text,
-            bt.Text1
+            cas.action1_type, cas.action1_param1,
+            cas.action2_type, cas.action2_param1,
+            cas.action3_type, cas.action3_param3
         FROM creature_ai_scripts cas
-        JOIN broadcast_text bt ON (
-            (cas.action1_type = 1 AND bt.Id = cas.action1_param1) OR
-            (cas.action2_type = 1 AND bt.Id = cas.action2_param1) OR
-            (cas.action3_type = 1 AND bt.Id = cas.action3_param3)
-        )
-        WHERE bt.Id > 0
+        WHERE cas.action1_type = 1
+           OR cas.action2_type = 1
+           OR cas.action3_type = 1
     """)
 
-    for row in cursor.fetchall():
+    # Python-side equivalent of the old DISTINCT (npc_id, bt_id) join on the three action slots
+    talk_rows = {}
+    for cas in cursor.fetchall():
+        for action_type, bt_id in (
+            (cas["action1_type"], cas["action1_param1"]),
+            (cas["action2_type"], cas["action2_param1"]),
+            (cas["action3_type"], cas["action3_param3"]),
+        ):
+            if action_type == 1 and bt_id and bt_id > 0:
+                talk_rows.setdefault((cas["npc_id"], bt_id), {"npc_id": cas["npc_id"], "bt_id": bt_id})
+
+    for row in talk_rows.values():
         npc = npc_meta.get(row["npc_id"])
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
+        txt = broadcast_text.get(row["bt_id"])
         
-        if is_clean_text(txt):
-            rows.append({
+        if txt is not None:
+            yield {
                 "npc_name": npc["npc_name"] if npc else "Unknown_ai_scripts",
                 "sex": npc["sex"] if npc else None,
                 "dialog_type": DIALOG_TYPES["GOSSIP"],  # Combat text
                 "quest_id": None,
-                "text": txt.strip(),
-            })
+                "text": txt,
+            }
             seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_gameobject_text(cursor, __):
+def extract_gameobject_text(cursor, __, preloaded):
     """
     Extract readable gameobject text (plaques, books, etc).
     
@@ -1141,9 +1838,8 @@ def extract_gameobject_text(cursor, __):
     FLOW:
     gameobject_template.type = 9 (GAMEOBJECT_TYPE_TEXT)
     -> gameobject_template.data0 = page_text.entry
-    -> page_text.next_page (chain multiple pages)
+    -> page_text.next_page (chain multiple pages, via resolve_page_chain)
     """
-    rows = []
 
     cursor.execute("""
         SELECT
@@ -1157,28 +1853,20 @@ def extract_gameobject_text(cursor, __):
 
     gameobjects = cursor.fetchall()
 
-    # Load all page_text for chaining
-    cursor.execute("SELECT entry, text, next_page FROM page_text")
-    page_dict = {r["entry"]: r for r in cursor.fetchall()}
-
     for go in gameobjects:
-        page_id = go["page_id"]
-        while page_id and page_id in page_dict:
-            page = page_dict[page_id]
-            if is_clean_text(page["text"]):
-                rows.append({
-                    "npc_name": go["go_name"],
-                    "sex": None,
-                    "dialog_type": DIALOG_TYPES["ITEM_TEXT"],
-                    "quest_id": None,
-                    "text": page["text"].strip(),
-                })
-            page_id = page["next_page"] if page["next_page"] != 0 else None
+        for text in resolve_page_chain(preloaded["page_text"], go["page_id"]):
+            yield {
+                "npc_name": go["go_name"],
+                "sex": None,
+                "dialog_type": DIALOG_TYPES["ITEM_TEXT"],
+                "quest_id": None,
+                "text": text,
+            }
 
-    return rows, set()  # No broadcast_text tracking for gameobject text
+    return set()  # No broadcast_text tracking for gameobject text
 
 
-def extract_item_text(cursor,__):
+def extract_item_text(cursor, __, preloaded):
     """
     Extract item-contained text (letters, books).
     
@@ -1187,10 +1875,9 @@ def extract_item_text(cursor,__):
     
     FLOW:
     item_template.PageText = page_text.entry
-    -> page_text.next_page (chain multiple pages)
+    -> page_text.next_page (chain multiple pages, via resolve_page_chain)
     -> item_template.startquest (optional quest link)
     """
-    rows = []
 
     cursor.execute("""
         SELECT
@@ -1204,28 +1891,20 @@ def extract_item_text(cursor,__):
 
     items = cursor.fetchall()
 
-    # Load all page_text for chaining
-    cursor.execute("SELECT entry, text, next_page FROM page_text")
-    page_dict = {r["entry"]: r for r in cursor.fetchall()}
-
     for item in items:
-        page_id = item["page_id"]
-        while page_id and page_id in page_dict:
-            page = page_dict[page_id]
-            if is_clean_text(page["text"]):
-                rows.append({
-                    "npc_name": item["item_name"],
-                    "sex": None,
-                    "dialog_type": DIALOG_TYPES["ITEM_TEXT"],
-                    "quest_id": item["quest_id"],
-                    "text": page["text"].strip(),
-                })
-            page_id = page["next_page"] if page["next_page"] != 0 else None
+        for text in resolve_page_chain(preloaded["page_text"], item["page_id"]):
+            yield {
+                "npc_name": item["item_name"],
+                "sex": None,
+                "dialog_type": DIALOG_TYPES["ITEM_TEXT"],
+                "quest_id": item["quest_id"],
+                "text": text,
+            }
 
-    return rows, set()
+    return set()
 
 
-def extract_quest_greetings(cursor, npc_meta):
+def extract_quest_greetings(cursor, npc_meta, preloaded):
     """
     Extract NPC quest/trainer greetings.
     
@@ -1236,7 +1915,6 @@ def extract_quest_greetings(cursor, npc_meta):
     questgiver_greeting.Entry = creature_template.entry
     trainer_greeting.Entry = creature_template.entry
     """
-    rows = []
 
     # Quest greetings
     cursor.execute("""
@@ -1249,13 +1927,13 @@ def extract_quest_greetings(cursor, npc_meta):
     for row in cursor.fetchall():
         npc = npc_meta.get(row["npc_id"])
         if npc and is_clean_text(row["text"]):
-            rows.append({
+            yield {
                 "npc_name": npc["npc_name"],
                 "sex": npc["sex"],
                 "dialog_type": DIALOG_TYPES["GOSSIP"],
                 "quest_id": None,
                 "text": row["text"].strip(),
-            })
+            }
 
     # Trainer greetings
     cursor.execute("""
@@ -1268,18 +1946,18 @@ def extract_quest_greetings(cursor, npc_meta):
     for row in cursor.fetchall():
         npc = npc_meta.get(row["npc_id"])
         if npc and is_clean_text(row["text"]):
-            rows.append({
+            yield {
                 "npc_name": npc["npc_name"],
                 "sex": npc["sex"],
                 "dialog_type": DIALOG_TYPES["GOSSIP"],
                 "quest_id": None,
                 "text": row["text"].strip(),
-            })
+            }
 
-    return rows, set()
+    return set()
 
 
-def extract_quest_texts(cursor, npc_meta):
+def extract_quest_texts(cursor, npc_meta, preloaded):
     """
     Extract quest template text fields.
     
@@ -1297,7 +1975,6 @@ def extract_quest_texts(cursor, npc_meta):
     - OfferRewardText -> quest_complete (from quest ender)
     - Objectives -> quest_objective (from quest giver)
     """
-    rows = []
 
     cursor.execute("""
         SELECT 
@@ -1324,18 +2001,18 @@ def extract_quest_texts(cursor, npc_meta):
         for npc_id, dialog_type, col in fields:
             npc = npc_meta.get(npc_id)
             if npc and is_clean_text(row[col]):
-                rows.append({
+                yield {
                     "npc_name": npc["npc_name"],
                     "sex": npc["sex"],
                     "dialog_type": dialog_type,
                     "quest_id": row["quest_id"],
                     "text": row[col].strip()
-                })
+                }
 
-    return rows, set()
+    return set()
 
 
-def extract_dbscripts_spell(cursor, npc_meta):
+def extract_dbscripts_spell(cursor, npc_meta, preloaded):
     """
     Extract spell-triggered NPC dialogue.
 
@@ -1351,7 +2028,7 @@ def extract_dbscripts_spell(cursor, npc_meta):
     NOTE: Similar to dbscripts_on_relay - spell IDs are not creature entries.
     Attribution is only possible via buddy_entry field.
     """
-    rows = []
+    broadcast_text = preloaded["broadcast_text"]
     seen = set()
 
     cursor.execute("""
@@ -1360,192 +2037,341 @@ def extract_dbscripts_spell(cursor, npc_meta):
             ds.buddy_entry,
             ds.data_flags,
             ds.dataint AS bt_id,
-            bt.Text,
-            bt.Text1,
             ds.comments
         FROM dbscripts_on_spell ds
-        JOIN broadcast_text bt ON bt.Id = ds.dataint
         WHERE ds.command = 0
-          AND bt.Id > 0
+          AND ds.dataint > 0
     """)
 
     for row in cursor.fetchall():
-        txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-        if not is_clean_text(txt):
+        txt = broadcast_text.get(row["bt_id"])
+        if txt is None:
             continue
 
         # Try to determine speaker via buddy_entry
         speaker_entry = row["buddy_entry"] if row["buddy_entry"] else None
         npc = npc_meta.get(speaker_entry) if speaker_entry else None
 
-        rows.append({
+        yield {
             "npc_name": npc["npc_name"] if npc else "Unknown_spell",
             "sex": npc["sex"] if npc else None,
             "dialog_type": DIALOG_TYPES["GOSSIP"],
             "quest_id": None,
-            "text": txt.strip(),
-        })
+            "text": txt,
+        }
         seen.add(row["bt_id"])
 
-    return rows, seen
+    return seen
 
 
-def extract_orphan_broadcast_text(cursor, seen_broadcast_ids):
+def extract_orphan_broadcast_text(broadcast_text, seen_broadcast_ids):
     """
     Extract broadcast_text not referenced by any other source.
     
-    SOURCE: broadcast_text
+    SOURCE: broadcast_text (preloaded via load_broadcast_text, no extra scan)
     ATTRIBUTION: UNKNOWN - no source reference
     
     NOTE: These may be unused, or referenced by systems we don't track yet.
     """
-    rows = []
-
-    cursor.execute("SELECT Id, Text, Text1 FROM broadcast_text WHERE Id > 0")
-    
-    for row in cursor.fetchall():
-        if row["Id"] not in seen_broadcast_ids:
-            txt = row["Text"] if is_clean_text(row["Text"]) else row["Text1"]
-            if is_clean_text(txt):
-                rows.append({
-                    "npc_name": "Unknown_broadcast",
-                    "sex": None,
-                    "dialog_type": DIALOG_TYPES["GOSSIP"],  # Unknown context
-                    "quest_id": None,
-                    "text": txt.strip(),
-                })
 
-    return rows
+    for bt_id, txt in broadcast_text.items():
+        if bt_id not in seen_broadcast_ids:
+            yield {
+                "npc_name": "Unknown_broadcast",
+                "sex": None,
+                "dialog_type": DIALOG_TYPES["GOSSIP"],  # Unknown context
+                "quest_id": None,
+                "text": txt,
+            }
 
 
 # =========================
 # MAIN EXTRACTION
 # =========================
-def extract_all_dialog():
+
+# Order matters: rows are merged (and later deduped first-come-first-serve) in this order
+EXTRACTORS = [
+    extract_scriptdev2_texts,
+    extract_dbscripts_creature_death,
+    extract_dbscripts_creature_movement,
+    extract_dbscripts_relay,
+    extract_dbscripts_quest_start,
+    extract_dbscripts_quest_end,
+    extract_dbscripts_gossip,
+    extract_dbscripts_misc,
+    extract_ai_scripts,
+    extract_gossip_menu_text,  # UPDATED: Now properly handles indirect attribution
+    extract_gameobject_text,
+    extract_item_text,
+    extract_quest_greetings,
+    extract_quest_texts,
+    extract_dbscripts_spell,
+]
+
+
+def collect_extractor(extractor, cursor, npc_meta, preloaded):
+    """Drain an extractor generator into a list. Returns (rows, seen)."""
+    rows = []
+    gen = extractor(cursor, npc_meta, preloaded)
+    while True:
+        try:
+            rows.append(next(gen))
+        except StopIteration as done:
+            return rows, done.value
+
+
+def replay_rows(rows, seen):
+    """Generator over already-collected rows that returns seen, like a live extractor."""
+    yield from rows
+    return seen
+
+
+def run_pooled_extractor(pool, extractor, npc_meta, preloaded, query_cache=None):
+    """Run one extractor to completion on its own pooled connection/cursor."""
+    db = pool.get_connection()
+    try:
+        cursor = open_cursor(db, query_cache)
+        try:
+            with profile_stage(extractor.__name__):
+                return collect_extractor(extractor, cursor, npc_meta, preloaded)
+        finally:
+            cursor.close()
+    finally:
+        db.close()  # returns the connection to the pool
+
+
+def run_extractors(cursor, npc_meta, preloaded, jobs=1, query_cache=None):
     """
-    Main orchestrator - calls all extraction functions in order.
+    Run every extractor in EXTRACTORS.
 
-    Output policy:
-    - Main CSV contains ONLY known NPC dialog
-    - All Unknown_* dialog is deduped and written to investigation CSV
+    jobs=1: sequentially on the shared cursor; rows stream straight through.
+    jobs>1: on a thread pool, each extractor with its own pooled connection.
+    The extractors are independent read-only queries, so wall-clock time tracks
+    the slowest one instead of the sum. Each extractor's rows are buffered until
+    every extractor before it has been emitted.
+
+    Yields: (extractor, rows generator returning seen) in EXTRACTORS order regardless
+    of jobs, so merged output is deterministic.
     """
+    if jobs <= 1:
+        for extractor in EXTRACTORS:
+            print(f"Running {extractor.__name__}...")
+            yield extractor, extractor(cursor, npc_meta, preloaded)
+        return
+
+    pool = get_connection_pool(jobs)
+    workers = min(jobs, pooling.CNX_POOL_MAXSIZE, len(EXTRACTORS))
+    print(f"Running {len(EXTRACTORS)} extractors with {workers} parallel jobs...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            (extractor, executor.submit(run_pooled_extractor, pool, extractor, npc_meta, preloaded, query_cache))
+            for extractor in EXTRACTORS
+        ]
+        for extractor, future in futures:
+            yield extractor, replay_rows(*future.result())
 
-    INVESTIGATION_CSV = "../data/unknown_dialog_investigation.csv"
 
-    db = get_connection()
-    cursor = db.cursor(dictionary=True)
+def count_rows(name, rows, timed=True):
+    """
+    Yield from a row generator, counting rows and timing each step under
+    profile_stage(name) (downstream CSV writing is not included).
+    timed=False for rows replayed from a --jobs worker, which already timed the stage.
 
-    all_rows = []
+    Returns: (count, the generator's return value)
+    """
+    count = 0
+    while True:
+        with profile_stage(name) if timed else nullcontext():
+            try:
+                row = next(rows)
+            except StopIteration as done:
+                result = done.value
+                break
+        count += 1
+        yield row
+
+    if PROFILER:
+        PROFILER.add_emitted(name, count)
+    return count, result
+
+
+def iter_dialog_rows(cursor, npc_meta, preloaded, jobs=1, query_cache=None):
+    """
+    Yield every extracted dialog row: all EXTRACTORS in order, then orphan broadcast_text.
+
+    Every extractor's broadcast_text IDs are unioned before the orphan pass.
+    """
     seen_broadcast_ids = set()
 
-    npc_meta = load_npc_metadata(cursor)
-
-    extractors = [
-        extract_scriptdev2_texts,
-        extract_dbscripts_creature_death,
-        extract_dbscripts_creature_movement,
-        extract_dbscripts_relay,
-        extract_dbscripts_quest_start,
-        extract_dbscripts_quest_end,
-        extract_dbscripts_gossip,
-        extract_dbscripts_misc,
-        extract_ai_scripts,
-        extract_gossip_menu_text,  # UPDATED: Now properly handles indirect attribution
-        extract_gameobject_text,
-        extract_item_text,
-        extract_quest_greetings,
-        extract_quest_texts,
-        extract_dbscripts_spell,
-    ]
-
-    for extractor in extractors:
-        print(f"Running {extractor.__name__}...")
-        new_rows, new_seen = extractor(cursor, npc_meta)
-        all_rows.extend(new_rows)
+    for extractor, rows in run_extractors(cursor, npc_meta, preloaded, jobs, query_cache):
+        count, new_seen = yield from count_rows(extractor.__name__, rows, timed=jobs <= 1)
         seen_broadcast_ids |= new_seen
-        print(f"  Added {len(new_rows)} rows, {len(new_seen)} broadcast_text IDs")
+        print(f"  {extractor.__name__}: added {count} rows, {len(new_seen)} broadcast_text IDs")
 
     print("\nExtracting orphan broadcast_text...")
-    orphan_rows = extract_orphan_broadcast_text(cursor, seen_broadcast_ids)
-    all_rows.extend(orphan_rows)
-    print(f"  Added {len(orphan_rows)} orphan rows")
+    orphan_rows = extract_orphan_broadcast_text(preloaded["broadcast_text"], seen_broadcast_ids)
+    count, _ = yield from count_rows("extract_orphan_broadcast_text", orphan_rows)
+    print(f"  Added {count} orphan rows")
 
-    cursor.close()
 
-    # =========================================================
-    # SEPARATE KNOWN vs UNKNOWN
-    # =========================================================
+def discard_staged(*paths):
+    """Remove staged .tmp outputs that were not promoted."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
 
-    known_rows = []
-    unknown_rows = []
 
-    def is_unknown(name):
-        return not name or name.startswith("Unknown")
+def is_unknown(name):
+    return not name or name.startswith("Unknown")
 
-    for row in all_rows:
-        if is_unknown(row["npc_name"]):
-            unknown_rows.append(row)
-        else:
-            known_rows.append(row)
 
-    # =========================================================
-    # DEDUPE KNOWN ROWS (STRICT)
-    # =========================================================
+def stream_dialog_csvs(rows, output_path, investigation_path, old_index):
+    """
+    Streaming stage: dedupe rows as they arrive and route them to the two CSV writers.
+
+    - Known rows: deduped strictly on (npc_name, sex, dialog_type, quest_id, text) -> output_path
+    - Unknown_* rows: deduped on text only -> investigation_path
 
-    deduped_known = []
+    Only the dedupe keys are held in memory, never the rows themselves.
+    Known rows that match an entry of old_index (see load_existing_csv_index) are
+    recorded so detect_regressions can run without indexing the new output.
+
+    Returns: (known_count, unknown_count, matched_index)
+    """
     seen_known = set()
+    seen_text = set()
+    matched_index = defaultdict(set)
+    known_count = 0
+    unknown_count = 0
 
-    for r in known_rows:
-        key = (
-            r["npc_name"],
-            r["sex"],
-            r["dialog_type"],
-            r["quest_id"],
-            r["text"],
-        )
-        if key not in seen_known:
+    with open(output_path, "w", encoding="utf-8", newline="") as known_f, \
+         open(investigation_path, "w", encoding="utf-8", newline="") as unknown_f:
+        known_writer = csv.DictWriter(known_f, fieldnames=CSV_FIELDNAMES)
+        unknown_writer = csv.DictWriter(unknown_f, fieldnames=CSV_FIELDNAMES)
+        known_writer.writeheader()
+        unknown_writer.writeheader()
+
+        for r in rows:
+            # =========================================================
+            # UNKNOWN ROWS (TEXT-ONLY DEDUPE)
+            # =========================================================
+            if is_unknown(r["npc_name"]):
+                if r["text"] not in seen_text:
+                    seen_text.add(r["text"])
+                    unknown_writer.writerow(r)
+                    unknown_count += 1
+                continue
+
+            # =========================================================
+            # KNOWN ROWS (STRICT DEDUPE)
+            # =========================================================
+            key = (
+                r["npc_name"],
+                r["sex"],
+                r["dialog_type"],
+                r["quest_id"],
+                r["text"],
+            )
+            if key in seen_known:
+                continue
             seen_known.add(key)
-            deduped_known.append(r)
+            known_writer.writerow(r)
+            known_count += 1
 
-    # =========================================================
-    # DEDUPE UNKNOWN ROWS (TEXT-ONLY)
-    # =========================================================
+            dialog = dialog_index_key(r)
+            if dialog in old_index.get(r["npc_name"], ()):
+                matched_index[r["npc_name"]].add(dialog)
 
-    deduped_unknown = []
-    seen_text = set()
+    return known_count, unknown_count, matched_index
 
-    for r in unknown_rows:
-        text = r["text"]
-        if text not in seen_text:
-            seen_text.add(text)
-            deduped_unknown.append(r)
-
-    # =========================================================
-    # WRITE INVESTIGATION CSV
-    # =========================================================
-
-    if deduped_unknown:
-        with open(INVESTIGATION_CSV, "w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["npc_name", "sex", "dialog_type", "quest_id", "text"]
-            )
-            writer.writeheader()
-            writer.writerows(deduped_unknown)
 
-        print(f"\n🔍 Wrote {len(deduped_unknown)} Unknown dialog rows to:")
+def extract_all_dialog(jobs=1, old_index=None, query_cache=None):
+    """
+    Main orchestrator - calls all extraction functions in order.
+
+    jobs: number of extractors to run in parallel (see run_extractors).
+    query_cache: optional QueryCache serving unchanged queries from disk.
+    Results are always merged in EXTRACTORS order, and every extractor's
+    broadcast_text IDs are unioned before the orphan pass.
+
+    Rows are streamed into STAGED_OUTPUT_CSV; the caller promotes it to OUTPUT_CSV
+    once detect_regressions passes. If extraction fails, both staged CSVs are removed.
+
+    Output policy:
+    - Main CSV contains ONLY known NPC dialog
+    - All Unknown_* dialog is deduped and written to investigation CSV
+
+    Returns: (known_count, matched_index) - see stream_dialog_csvs
+    """
+
+    INVESTIGATION_CSV = "../data/unknown_dialog_investigation.csv"
+    staged_investigation_csv = INVESTIGATION_CSV + ".tmp"
+
+    db = get_connection()
+    cursor = open_cursor(db, query_cache)
+
+    with profile_stage("load_npc_metadata"):
+        npc_meta = load_npc_metadata(cursor)
+
+    print("Preloading broadcast_text and page_text...")
+    with profile_stage("load_shared_tables"):
+        preloaded = load_shared_tables(cursor)
+    print(f"  Loaded {len(preloaded['broadcast_text'])} usable broadcast_text rows")
+
+    try:
+        rows = iter_dialog_rows(cursor, npc_meta, preloaded, jobs, query_cache)
+        known_count, unknown_count, matched_index = stream_dialog_csvs(
+            rows, STAGED_OUTPUT_CSV, staged_investigation_csv, old_index or {}
+        )
+
+        # =========================================================
+        # WRITE INVESTIGATION CSV
+        # =========================================================
+
+        if unknown_count:
+            os.replace(staged_investigation_csv, INVESTIGATION_CSV)
+    except BaseException:
+        # A failed or interrupted run must not leave a half-written CSV to be promoted later
+        discard_staged(STAGED_OUTPUT_CSV)
+        raise
+    finally:
+        discard_staged(staged_investigation_csv)
+        cursor.close()
+        db.close()
+
+    if unknown_count:
+        print(f"\n🔍 Wrote {unknown_count} Unknown dialog rows to:")
         print(f"   {INVESTIGATION_CSV}")
 
-    print(f"\n✓ Known dialog rows: {len(deduped_known)}")
-    print(f"✓ Unknown dialog rows (investigation): {len(deduped_unknown)}")
+    if query_cache:
+        print(f"\n💾 Query cache: {query_cache.hits} hits, {query_cache.misses} misses ({query_cache.cache_dir})")
+
+    TEXT_FILTER.print_hits()
+
+    print(f"\n✓ Known dialog rows: {known_count}")
+    print(f"✓ Unknown dialog rows (investigation): {unknown_count}")
 
-    return deduped_known, db
+    return known_count, matched_index
 
 
 # Prevent Regression
+def dialog_index_key(row):
+    """
+    (dialog_type, quest_id, text) key used by the regression indexes.
+    quest_id is compared as a string, since the old index is read back from CSV.
+    """
+    quest_id = row["quest_id"]
+    return (
+        row["dialog_type"],
+        str(quest_id) if quest_id not in (None, "") else None,
+        row["text"],
+    )
+
+
 def load_existing_csv_index(filepath):
     """
-    Load existing OUTPUT_CSV as SOT.
+    Load existing OUTPUT_CSV as SOT. Built before extraction starts, so new rows
+    can be checked against it as they stream past (see stream_dialog_csvs).
     Returns: dict[npc_name] -> set of (dialog_type, quest_id, text)
     """
     index = defaultdict(set)
@@ -1556,33 +2382,18 @@ def load_existing_csv_index(filepath):
     with open(filepath, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for r in reader:
-            index[r["npc_name"]].add((
-                r["dialog_type"],
-                r["quest_id"] or None,
-                r["text"],
-            ))
+            index[r["npc_name"]].add(dialog_index_key(r))
 
     return index
 
 
-def build_new_csv_index(rows):
-    """
-    Build dialog index from newly extracted rows.
-    """
-    index = defaultdict(set)
-    for r in rows:
-        index[r["npc_name"]].add((
-            r["dialog_type"],
-            r["quest_id"],
-            r["text"],
-        ))
-    return index
-
-
 def detect_regressions(old_index, new_index):
     """
     Detect deleted or replaced dialog lines per NPC.
 
+    new_index only needs the new lines that exist in old_index
+    (the matched_index from stream_dialog_csvs).
+
     Returns: dict[npc_name] -> set of missing dialog tuples
     """
     regressions = {}
@@ -1616,38 +2427,76 @@ def abort_on_regression(regressions):
 # MAIN
 # =========================
 
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Run extractors in parallel on N pooled DB connections (default: 1, sequential)")
+    parser.add_argument("--cache-dir", type=str, default=QUERY_CACHE_DIR,
+                        help=f"Directory for cached query results (default: {QUERY_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always query the database; don't read or write the query cache")
+    parser.add_argument("--refresh-cache", action="store_true",
+                        help="Re-run every query and overwrite its cache entry")
+    parser.add_argument("--snapshot", type=str, default=None,
+                        help="Extract from this SQLite snapshot instead of the MySQL server (implies --no-cache)")
+    parser.add_argument("--export-snapshot", type=str, default=None,
+                        help="Copy the tables extract.py uses from MySQL into this SQLite file, then exit")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Write a JSON profile (per-extractor timings, rows, queries) to this path and print a summary")
+    parser.add_argument("--explain", action="store_true",
+                        help="With --profile, also capture the query plan of every distinct SELECT")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    print("Extracting dialog...")
-    data, db = extract_all_dialog()
+    args = parse_args()
 
-    # ---------------------------------------------------------
-    # SOT REGRESSION CHECK (BEFORE WRITING)
-    # ---------------------------------------------------------
-    print("\n🔒 Checking for dialog regressions...")
+    if args.export_snapshot:
+        print(f"Exporting snapshot to {args.export_snapshot}...")
+        export_snapshot(args.export_snapshot)
+        print("\n✓ Snapshot complete!")
+        raise SystemExit(0)
+
+    SNAPSHOT_DB = args.snapshot
+    PROFILER = ExtractionProfiler(explain=args.explain) if args.profile else None
 
     old_index = load_existing_csv_index(OUTPUT_CSV)
-    new_index = build_new_csv_index(data)
 
-    regressions = detect_regressions(old_index, new_index)
+    # CHECKSUM TABLE is MySQL-only, and a local snapshot doesn't need the cache anyway
+    use_cache = not (args.no_cache or SNAPSHOT_DB)
+    query_cache = QueryCache(args.cache_dir, refresh=args.refresh_cache) if use_cache else None
 
-    if regressions:
-        abort_on_regression(regressions)
+    print("Extracting dialog...")
+    try:
+        known_count, matched_index = extract_all_dialog(
+            jobs=args.jobs, old_index=old_index, query_cache=query_cache
+        )
 
-    print("✓ No regressions detected. Safe to write CSV.")
+        if PROFILER:
+            PROFILER.print_summary()
+            PROFILER.write_report(args.profile)
+            print(f"  ✓ {args.profile}")
 
-    # ---------------------------------------------------------
-    # WRITE OUTPUT
-    # ---------------------------------------------------------
-    print(f"\nWriting CSV with {len(data)} dialog lines...")
-    with open(OUTPUT_CSV, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["npc_name", "sex", "dialog_type", "quest_id", "text"]
-        )
-        writer.writeheader()
-        writer.writerows(data)
+        # ---------------------------------------------------------
+        # SOT REGRESSION CHECK (BEFORE REPLACING)
+        # ---------------------------------------------------------
+        print("\n🔒 Checking for dialog regressions...")
 
-    print(f"  ✓ {OUTPUT_CSV}")
+        regressions = detect_regressions(old_index, matched_index)
+
+        if regressions:
+            abort_on_regression(regressions)
+
+        print("✓ No regressions detected. Safe to write CSV.")
+
+        # ---------------------------------------------------------
+        # WRITE OUTPUT
+        # ---------------------------------------------------------
+        os.replace(STAGED_OUTPUT_CSV, OUTPUT_CSV)
+        print(f"\nWrote CSV with {known_count} dialog lines")
+        print(f"  ✓ {OUTPUT_CSV}")
+    finally:
+        # No-op once promoted; removes the staged CSV on regression or any other failure
+        discard_staged(STAGED_OUTPUT_CSV)
 
-    db.close()
     print(f"\n✓ Extraction complete!")
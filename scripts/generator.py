@@ -1,10 +1,25 @@
+import hashlib
+import importlib.metadata
 import io
 import os
+import queue
+import sqlite3
+import subprocess
 import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 
 import argparse
+import copy
 import re
+import shutil
+import numpy as np
 import pandas as pd
 import soundfile as sf
 from pydub import AudioSegment
@@ -38,11 +53,309 @@ elif isinstance(NPC_METADATA, dict):
 else:
     raise ValueError("npc_metadata.json has an unsupported format")
 
-import torch
-import torchaudio as ta
-from chatterbox.tts_turbo import ChatterboxTurboTTS
+# =========================
+# TTS BACKENDS
+# =========================
+
+# Everything the generator needs from a TTS engine goes through a backend, so the
+# chunking / scheduling / writing stages can run on hosts without the real model.
+# Backends are cheap to construct; the model (and torch) load on first synthesis,
+# so planning, filtering and cleanup commands never pay for them.
+BACKEND_NAME = "chatterbox"
+TTS_DEVICE = "auto"
+TORCH_THREADS = None   # None = torch's default (all cores)
+INTEROP_THREADS = None
+QUANTIZE = False       # dynamic int8 quantization of QUANTIZE_SUBMODULES (CPU only)
+QUANTIZE_SUBMODULES = ("t3",)   # the autoregressive token model dominates CPU time
+SYNTHETIC_CHARS_PER_SECOND = 15.0   # audio length of the synthetic backend
+BACKEND = None
+
+
+class TTSBackend:
+    """
+    Interface every backend implements:
+        sample_rate            output sample rate in Hz
+        version()              identifies model + settings, for cache and manifest keys;
+                               must not load the model
+        load()                 load the model; called before synthesis, must be idempotent
+        prepare_voice(voice)   make narrator `voice` (a REF_CODES key) the current voice
+        synthesize_batch(texts) audio per text for the current voice, float in [-1, 1],
+                               as arrays or tensors, in input order
+        release_memory()       optional hook after a batch / narrator group
+    Backends call record() from synthesize_batch so print_backend_stats() can report
+    the real-time factor.
+    """
+    name = None
+    sample_rate = 24000
+    synth_seconds = 0.0
+    audio_seconds = 0.0
+
+    def record(self, seconds, outputs):
+        self.synth_seconds += seconds
+        self.audio_seconds += sum(out.shape[-1] for out in outputs) / self.sample_rate
+
+    def version(self):
+        raise NotImplementedError
+
+    def load(self):
+        raise NotImplementedError
+
+    def prepare_voice(self, narrator_voice):
+        raise NotImplementedError
+
+    def synthesize_batch(self, texts):
+        raise NotImplementedError
+
+    def release_memory(self):
+        pass
+
+
+class ChatterboxBackend(TTSBackend):
+    """ChatterboxTurboTTS, with conditionals from the voice conditioning cache."""
+    name = "chatterbox"
+    sample_rate = 24000
+
+    def __init__(self, device="auto", torch_threads=None, interop_threads=None, quantize=False, keep_reference=False):
+        # Rejected up front: version() (and so every cache and manifest key) depends on quantize
+        if quantize and device not in ("auto", "cpu"):
+            raise ValueError(f"--quantize needs --device cpu (or auto), not {device}")
+        self.device = device
+        self.torch_threads = torch_threads
+        self.interop_threads = interop_threads
+        self.quantize = quantize
+        self.keep_reference = keep_reference   # keep an fp32 copy for compare_with_fp32()
+        self.model = None
+        self.reference = None
+
+    def version(self):
+        # Read from package metadata, not the loaded model, so planning stays torch-free
+        try:
+            package_version = importlib.metadata.version("chatterbox-tts")
+        except importlib.metadata.PackageNotFoundError:
+            package_version = "unknown"
+        return f"ChatterboxTurboTTS-{package_version}" + ("-int8" if self.quantize else "")
+
+    def resolve_device(self):
+        """auto → cuda if available, else mps, else cpu."""
+        import torch
+
+        if self.device != "auto":
+            return self.device
+        if self.quantize:
+            return "cpu"   # dynamic int8 kernels are CPU-only
+        if torch.cuda.is_available():
+            return "cuda"
+        if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+            return "mps"
+        return "cpu"
+
+    def load(self):
+        if self.model is None:
+            import torch
+            from chatterbox.tts_turbo import ChatterboxTurboTTS
+
+            if self.torch_threads:
+                torch.set_num_threads(self.torch_threads)
+            if self.interop_threads:
+                try:
+                    torch.set_num_interop_threads(self.interop_threads)
+                except RuntimeError:
+                    # Only settable before torch's first parallel work
+                    print("[WARN] torch inter-op threads already fixed, ignoring --interop-threads")
+            device = self.resolve_device()
+            print(f"[INFO] Loading ChatterboxTurboTTS on {device}")
+            self.model = ChatterboxTurboTTS.from_pretrained(device=device)
+
+            if self.quantize:
+                if self.keep_reference:
+                    self.reference = copy.deepcopy(self.model)
+                self.quantize_model()
+
+            self.warm_up()
+        return self
+
+    def quantize_model(self):
+        """Dynamic int8 quantization of the Linear layers in QUANTIZE_SUBMODULES, in place."""
+        import torch
+
+        for name in QUANTIZE_SUBMODULES:
+            module = getattr(self.model, name, None)
+            if module is None:
+                print(f"[WARN] Model has no '{name}' submodule to quantize")
+                continue
+            torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            print(f"[INFO] Quantized {name} to dynamic int8")
+
+    def warm_up(self):
+        """One throwaway generation so kernel selection and allocator growth don't land on the first job."""
+        if getattr(self.model, "conds", None) is None:
+            return
+        import torch
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            self.model.generate("Warming up.")
+        print(f"[INFO] Warm-up took {time.perf_counter() - start:.1f}s")
+
+    def prepare_voice(self, narrator_voice):
+        self.model.conds = get_voice_conditionals(narrator_voice)
+
+    def synthesize_batch(self, texts):
+        # Chatterbox Turbo has no batched generate(): texts run one after another, so
+        # --batch-size only groups and orders the work, it doesn't batch on the device
+        import torch
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            outputs = [self.model.generate(text) for text in texts]
+        self.record(time.perf_counter() - start, outputs)
+        return outputs
+
+    def compare_with_fp32(self, texts, narrator_voice):
+        """
+        Opt-in quality / speed check of the quantized model against the fp32 copy:
+        the same texts with the same seed through both, reporting duration, RTF and
+        a rough log-spectrogram distance (dB). Outputs are sampled, so the distance
+        is only meaningful as a comparison between runs, not against zero.
+        """
+        import torch
+
+        if self.reference is None:
+            print("[SKIP] Quality check needs --quantize on cpu")
+            return
+
+        self.prepare_voice(narrator_voice)
+        self.reference.conds = self.model.conds
+        totals = Counter()
+
+        print(f"\n🔬 int8 vs fp32 on {len(texts)} chunks ({narrator_voice})")
+        print(f"   {'chars':>5} {'fp32 s':>7} {'int8 s':>7} {'fp32 RTF':>8} {'int8 RTF':>8} {'dist dB':>7}")
+        with torch.no_grad():
+            for text in texts:
+                timings = []
+                outputs = []
+                for model in (self.reference, self.model):
+                    torch.manual_seed(0)
+                    start = time.perf_counter()
+                    outputs.append(model.generate(text))
+                    timings.append(time.perf_counter() - start)
+
+                durations = [out.shape[-1] / self.sample_rate for out in outputs]
+                distance = spectral_distance(*outputs)
+                totals["fp32_synth"] += timings[0]
+                totals["int8_synth"] += timings[1]
+                totals["fp32_audio"] += durations[0]
+                totals["int8_audio"] += durations[1]
+                totals["distance"] += distance
+                print(f"   {len(text):>5} {durations[0]:>7.2f} {durations[1]:>7.2f} "
+                      f"{timings[0] / durations[0]:>8.2f} {timings[1] / durations[1]:>8.2f} {distance:>7.2f}")
+
+        fp32_rtf = totals["fp32_synth"] / totals["fp32_audio"]
+        int8_rtf = totals["int8_synth"] / totals["int8_audio"]
+        print(f"   RTF fp32 {fp32_rtf:.2f} → int8 {int8_rtf:.2f} ({fp32_rtf / int8_rtf:.2f}x), "
+              f"mean distance {totals['distance'] / len(texts):.2f} dB\n")
+
+        # The fp32 copy is only for the check
+        self.reference = None
+
+    def release_memory(self):
+        """HARD MEMORY RELEASE after synthesis (only meaningful on CUDA)."""
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+class SyntheticBackend(TTSBackend):
+    """
+    Deterministic stand-in for benchmarking and testing without a GPU or torch.
+    Emits a per-voice tone with a little text-seeded noise, SYNTHETIC_CHARS_PER_SECOND
+    characters per second of audio, so files have realistic sizes and durations.
+    """
+    name = "synthetic"
+    sample_rate = 24000
+
+    def __init__(self, **_):
+        self.voice = None
+        self.frequency = 220.0
+
+    def version(self):
+        return f"synthetic-{SYNTHETIC_CHARS_PER_SECOND}cps"
+
+    def load(self):
+        return self
+
+    def prepare_voice(self, narrator_voice):
+        self.voice = narrator_voice
+        self.frequency = 110.0 + zlib.crc32(narrator_voice.encode("utf-8")) % 330
+
+    def synthesize_batch(self, texts):
+        start = time.perf_counter()
+        audio = []
+        for text in texts:
+            samples = max(1, round(len(text) * self.sample_rate / SYNTHETIC_CHARS_PER_SECOND))
+            rng = np.random.default_rng(zlib.crc32(f"{self.voice}\0{text}".encode("utf-8")))
+            t = np.arange(samples, dtype=np.float32) / self.sample_rate
+            tone = 0.3 * np.sin(2 * np.pi * self.frequency * t)
+            audio.append((tone + rng.normal(0.0, 0.02, samples)).astype(np.float32))
+        self.record(time.perf_counter() - start, audio)
+        return audio
+
+
+BACKENDS = {backend.name: backend for backend in (ChatterboxBackend, SyntheticBackend)}
+
+
+def get_backend():
+    """The configured backend (constructed, not necessarily loaded)."""
+    global BACKEND
+    if BACKEND is None:
+        BACKEND = BACKENDS[BACKEND_NAME](
+            device=TTS_DEVICE,
+            torch_threads=TORCH_THREADS,
+            interop_threads=INTEROP_THREADS,
+            quantize=QUANTIZE,
+        )
+    return BACKEND
 
-tts = ChatterboxTurboTTS.from_pretrained(device="cuda")
+
+def load_backend():
+    return get_backend().load()
+
+
+def spectral_distance(a, b, n_fft=1024, hop=256):
+    """Mean absolute difference of two clips' log-magnitude spectrograms (dB), over the shorter one."""
+    import torch
+
+    specs = []
+    for wav in (a, b):
+        wav = torch.as_tensor(wav).detach().float().cpu().flatten()
+        spec = torch.stft(wav, n_fft=n_fft, hop_length=hop, window=torch.hann_window(n_fft), return_complex=True)
+        specs.append(20 * torch.log10(spec.abs().clamp_min(1e-5)))
+    frames = min(spec.shape[-1] for spec in specs)
+    return (specs[0][:, :frames] - specs[1][:, :frames]).abs().mean().item()
+
+
+def run_quality_check(plan, count):
+    """compare_with_fp32 on the first `count` planned chunks of the largest narrator group."""
+    if not plan:
+        print("[SKIP] Quality check: nothing planned")
+        return
+    backend = get_backend()
+    if not isinstance(backend, ChatterboxBackend):
+        print(f"[SKIP] Quality check needs the chatterbox backend, not {backend.name}")
+        return
+    narrator_voice, jobs = next(iter(plan.items()))
+    texts = [chunk for job in jobs for chunk in job["chunks"]][:count]
+    backend.keep_reference = True   # before load(), which quantizes
+    backend.load().compare_with_fp32(texts, narrator_voice)
+
+
+def print_backend_stats():
+    backend = get_backend()
+    if not backend.audio_seconds:
+        return
+    print(f"⏱️  {backend.version()}: {backend.synth_seconds:.1f}s synthesis for {backend.audio_seconds:.1f}s audio "
+          f"(RTF {backend.synth_seconds / backend.audio_seconds:.3f})")
 
 
 
@@ -85,6 +398,538 @@ def build_ref_codes(samples_root="../samples"):
 
 REF_CODES = build_ref_codes("../samples")
 
+# Voice table of the daemon job running on this thread (see using_voices), so each
+# job sees the samples present when it started without changing REF_CODES
+JOB_VOICES = threading.local()
+
+
+def ref_codes():
+    """The voice table in effect: the current daemon job's, else REF_CODES."""
+    table = getattr(JOB_VOICES, "table", None)
+    return REF_CODES if table is None else table
+
+
+@contextmanager
+def using_voices(table):
+    JOB_VOICES.table = table
+    try:
+        yield
+    finally:
+        JOB_VOICES.table = None
+
+
+# =========================
+# VOICE CONDITIONING CACHE
+# =========================
+
+# Prepared conditionals per narrator sample, so the reference wav is loaded,
+# resampled and embedded once instead of once per chunk.
+VOICE_CACHE_DIR = "../cache/voice_conditionals"
+VOICE_LRU_SIZE = 8
+
+VOICE_LRU = OrderedDict()   # cache key -> conditionals
+SAMPLE_HASHES = {}          # (path, size, mtime) -> sha256
+
+
+def file_sha256(path):
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in SAMPLE_HASHES:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        SAMPLE_HASHES[memo_key] = h.hexdigest()
+    return SAMPLE_HASHES[memo_key]
+
+
+def model_version():
+    return get_backend().version()
+
+
+def get_voice_conditionals(narrator_voice):
+    """
+    Chatterbox conditionals for a narrator voice: from the in-memory LRU, else from
+    disk (keyed by the sample's content hash and the model version), else computed
+    with prepare_conditionals and persisted.
+    """
+    import torch
+
+    tts = get_backend().model
+    audio_path = ref_codes()[narrator_voice]["audio_path"]
+    key = f"{narrator_voice}_{file_sha256(audio_path)[:16]}_{model_version()}"
+
+    if key in VOICE_LRU:
+        VOICE_LRU.move_to_end(key)
+        return VOICE_LRU[key]
+
+    cache_path = os.path.join(VOICE_CACHE_DIR, f"{key}.pt")
+    if os.path.exists(cache_path):
+        conds = torch.load(cache_path, map_location=tts.device, weights_only=False)
+    else:
+        tts.prepare_conditionals(audio_path)
+        conds = tts.conds
+        os.makedirs(VOICE_CACHE_DIR, exist_ok=True)
+        # pid in the temp name: shard processes may prepare the same voice at once
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        torch.save(conds, tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    VOICE_LRU[key] = conds
+    if len(VOICE_LRU) > VOICE_LRU_SIZE:
+        VOICE_LRU.popitem(last=False)
+    return conds
+
+
+# =========================
+# CHUNK AUDIO CACHE
+# =========================
+
+# Content-addressed int16 PCM per synthesized chunk, so lines shared between NPCs
+# (guards, innkeepers, repeated book pages) are synthesized once per voice.
+CHUNK_CACHE_DIR = "../cache/chunk_audio"
+CHUNK_CACHE_MAX_BYTES = 20 * 1024 ** 3
+CHUNK_CACHE_ENABLED = True
+
+CHUNK_CACHE_INDEX = None        # key -> bytes on disk, least recently used first
+CHUNK_CACHE_BYTES = 0           # sum of CHUNK_CACHE_INDEX values
+CHUNK_CACHE_LOCK = threading.Lock()   # writer threads put while synthesis gets
+CHUNK_CACHE_STATS = Counter()   # hits, misses, evictions, bytes written
+
+
+def chunk_cache_key(narrator_voice, chunk):
+    """hash(normalized chunk text, voice sample, model version)."""
+    audio_path = ref_codes()[narrator_voice]["audio_path"]
+    normalized = " ".join(chunk.split())
+    payload = "\0".join([normalized, narrator_voice, file_sha256(audio_path), model_version(), str(get_backend().sample_rate)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chunk_cache_path(key):
+    return os.path.join(CHUNK_CACHE_DIR, key[:2], f"{key}.pcm")
+
+
+def load_chunk_cache_index():
+    """Scan the cache dir once, ordering entries by last use (mtime)."""
+    global CHUNK_CACHE_INDEX, CHUNK_CACHE_BYTES
+    if CHUNK_CACHE_INDEX is not None:
+        return CHUNK_CACHE_INDEX
+
+    entries = []
+    if os.path.isdir(CHUNK_CACHE_DIR):
+        for root, _, files in os.walk(CHUNK_CACHE_DIR):
+            for name in files:
+                if name.endswith(".pcm"):
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime_ns, name[:-4], stat.st_size))
+    entries.sort()
+
+    CHUNK_CACHE_INDEX = OrderedDict((key, size) for _, key, size in entries)
+    CHUNK_CACHE_BYTES = sum(size for _, _, size in entries)
+    return CHUNK_CACHE_INDEX
+
+
+def chunk_cache_get(key):
+    """Cached int16 PCM for key, or None. A hit refreshes the entry's LRU position."""
+    if not CHUNK_CACHE_ENABLED:
+        return None
+    with CHUNK_CACHE_LOCK:
+        return _chunk_cache_get(key)
+
+
+def _chunk_cache_get(key):
+    global CHUNK_CACHE_BYTES
+    index = load_chunk_cache_index()
+    if key not in index:
+        CHUNK_CACHE_STATS["misses"] += 1
+        return None
+
+    path = chunk_cache_path(key)
+    try:
+        with open(path, "rb") as f:
+            pcm = np.frombuffer(f.read(), dtype=np.int16)
+        os.utime(path)
+    except FileNotFoundError:
+        # Removed behind our back (another process evicted it)
+        CHUNK_CACHE_BYTES -= index.pop(key)
+        CHUNK_CACHE_STATS["misses"] += 1
+        return None
+
+    index.move_to_end(key)
+    CHUNK_CACHE_STATS["hits"] += 1
+    return pcm
+
+
+def chunk_cache_put(key, pcm):
+    """Store int16 PCM under key, evicting least recently used entries past the size limit."""
+    if not CHUNK_CACHE_ENABLED:
+        return
+    with CHUNK_CACHE_LOCK:
+        _chunk_cache_put(key, pcm)
+
+
+def _chunk_cache_put(key, pcm):
+    global CHUNK_CACHE_BYTES
+    index = load_chunk_cache_index()
+    path = chunk_cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = np.ascontiguousarray(pcm, dtype=np.int16).tobytes()
+    tmp_path = f"{path}.{os.getpid()}.tmp"   # shard processes share the cache
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    CHUNK_CACHE_BYTES += len(data) - index.pop(key, 0)
+    index[key] = len(data)
+    CHUNK_CACHE_STATS["bytes_written"] += len(data)
+
+    while CHUNK_CACHE_BYTES > CHUNK_CACHE_MAX_BYTES and len(index) > 1:
+        old_key, size = index.popitem(last=False)
+        try:
+            os.remove(chunk_cache_path(old_key))
+        except FileNotFoundError:
+            pass
+        CHUNK_CACHE_BYTES -= size
+        CHUNK_CACHE_STATS["evictions"] += 1
+
+
+def print_chunk_cache_stats():
+    if not CHUNK_CACHE_ENABLED:
+        return
+    hits, misses = CHUNK_CACHE_STATS["hits"], CHUNK_CACHE_STATS["misses"]
+    lookups = hits + misses
+    rate = 100 * hits / lookups if lookups else 0.0
+    index = load_chunk_cache_index()
+    print(f"🗂️  Chunk cache: {hits} hits / {misses} misses ({rate:.1f}% hit rate), "
+          f"{CHUNK_CACHE_STATS['evictions']} evicted, "
+          f"{len(index)} entries / {CHUNK_CACHE_BYTES / 1024 ** 2:.1f} MB on disk")
+
+
+# =========================
+# CHUNK CHECKPOINTS
+# =========================
+
+# Long files (merged item_text books) keep each synthesized chunk as a checkpoint
+# until the whole wav is renamed into place, so an interrupted run resumes from the
+# last finished chunk. Unlike the chunk cache these are never evicted or disabled.
+# Files are named by chunk index and chunk cache key, so a checkpoint left by a
+# different text, sample or model is never picked up.
+CHECKPOINT_DIR = "../cache/checkpoints"
+CHECKPOINT_MIN_CHUNKS = 2   # single-chunk lines have nothing to resume
+
+
+def uses_checkpoints(chunks):
+    return len(chunks) >= CHECKPOINT_MIN_CHUNKS
+
+
+def checkpoint_dir(filepath):
+    return os.path.join(CHECKPOINT_DIR, hashlib.sha1(os.path.normpath(filepath).encode("utf-8")).hexdigest())
+
+
+def checkpoint_path(filepath, chunk_idx, key):
+    return os.path.join(checkpoint_dir(filepath), f"{chunk_idx:05d}-{key[:16]}.pcm")
+
+
+def checkpoint_get(filepath, chunk_idx, key):
+    """Checkpointed int16 PCM of chunk chunk_idx of filepath, or None."""
+    try:
+        with open(checkpoint_path(filepath, chunk_idx, key), "rb") as f:
+            return np.frombuffer(f.read(), dtype=np.int16)
+    except FileNotFoundError:
+        return None
+
+
+def checkpoint_put(filepath, chunk_idx, key, pcm):
+    path = checkpoint_path(filepath, chunk_idx, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(np.ascontiguousarray(pcm, dtype=np.int16).tobytes())
+    os.replace(tmp_path, path)
+
+
+def checkpoint_clear(filepath):
+    """Drop filepath's checkpoints once its wav is complete."""
+    shutil.rmtree(checkpoint_dir(filepath), ignore_errors=True)
+
+
+def checkpoint_resumable(plan):
+    """Planned jobs that have checkpointed chunks from an interrupted run."""
+    return sum(
+        1 for jobs in plan.values() for job in jobs
+        if uses_checkpoints(job["chunks"]) and os.path.isdir(checkpoint_dir(job["filepath"]))
+    )
+
+
+def checkpoint_chunk(narrator_voice, filepath, chunk_idx, chunk, key, raw):
+    """
+    Convert a freshly synthesized chunk of a checkpointed file right away, cache and
+    checkpoint it; returns its int16 PCM.
+    """
+    with TELEMETRY.stage("convert", narrator_voice, len(chunk)):
+        pcm = wav_to_int16(raw)
+    chunk_cache_put(key, pcm)
+    checkpoint_put(filepath, chunk_idx, key, pcm)
+    return pcm
+
+
+# =========================
+# GENERATION TELEMETRY
+# =========================
+
+# Per-chunk latency of each generation stage, as histograms per narrator and per
+# chunk length, plus run totals (chunks/s, real-time factor, ETA). Always collected;
+# written as JSON at the end of a run and, with --prometheus-textfile, as a
+# node_exporter textfile that is refreshed while the run is going.
+TELEMETRY_STAGES = ("chunk", "condition", "synthesize", "convert", "write")
+TELEMETRY_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TELEMETRY_LENGTH_BUCKET_CHARS = 50
+TELEMETRY_FLUSH_SECONDS = 15
+TELEMETRY_METRIC_PREFIX = "betterquest_generator"
+
+
+class GenerationTelemetry:
+    """
+    Stage latencies and throughput for one generator process.
+
+    Stages are timed per chunk (a batched synthesize call is split evenly over its
+    chunks); chunking times a whole row and the writer pool's write a whole file,
+    bucketed by that row's or file's length.
+    Writer threads report finished files, so counters are guarded by a lock, and
+    flushes by a second one (writing takes the first).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.by_narrator = {}   # (stage, narrator) -> histogram
+        self.by_length = {}     # (stage, "0-49" chars) -> histogram
+        self.totals = Counter()
+        self.run_base = Counter()   # totals when the current run began (the daemon runs many)
+        self.started = time.time()
+        self.run_started = None
+        self.files_total = 0
+        self.chars_total = 0
+        self.progress = False
+        self.json_path = None
+        self.prometheus_path = None
+        self.last_flush = 0.0
+
+    @staticmethod
+    def new_histogram():
+        return {"buckets": [0] * len(TELEMETRY_LATENCY_BUCKETS), "count": 0, "sum": 0.0}
+
+    @staticmethod
+    def length_bucket(chars):
+        low = chars // TELEMETRY_LENGTH_BUCKET_CHARS * TELEMETRY_LENGTH_BUCKET_CHARS
+        return f"{low}-{low + TELEMETRY_LENGTH_BUCKET_CHARS - 1}"
+
+    def observe(self, stage, seconds, narrator_voice=None, chars=None):
+        keys = [(self.by_narrator, (stage, narrator_voice or "(none)"))]
+        if chars is not None:
+            keys.append((self.by_length, (stage, self.length_bucket(chars))))
+        with self.lock:
+            for table, key in keys:
+                hist = table.get(key)
+                if hist is None:
+                    hist = table[key] = self.new_histogram()
+                for i, bound in enumerate(TELEMETRY_LATENCY_BUCKETS):
+                    if seconds <= bound:
+                        hist["buckets"][i] += 1
+                        break
+                hist["count"] += 1
+                hist["sum"] += seconds
+
+    @contextmanager
+    def stage(self, stage, narrator_voice=None, chars=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, narrator_voice, chars)
+
+    def begin_run(self, plan):
+        """Totals for progress and ETA, from the jobs about to run."""
+        with self.lock:
+            self.run_started = time.time()
+            self.run_base = Counter(self.totals)
+            self.files_total = sum(len(jobs) for jobs in plan.values())
+            self.chars_total = sum(len(c) for jobs in plan.values() for job in jobs for c in job["chunks"])
+        self.draw_progress()
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.totals[name] += amount
+
+    def file_done(self, chunks, audio_seconds):
+        with self.lock:
+            self.totals["files"] += 1
+            self.totals["chunks"] += len(chunks)
+            self.totals["chars"] += sum(len(c) for c in chunks)
+            self.totals["audio_seconds"] += audio_seconds
+        self.draw_progress()
+        self.flush(final=False)
+
+    def run_totals(self):
+        return {name: self.totals[name] - self.run_base[name] for name in ("files", "chunks", "chars", "audio_seconds")}
+
+    def rates(self):
+        """chunks/s, chars/s, real-time factor and ETA seconds of the current run."""
+        run = self.run_totals()
+        elapsed = time.time() - (self.run_started or self.started)
+        chunks_per_second = run["chunks"] / elapsed if elapsed else 0.0
+        chars_per_second = run["chars"] / elapsed if elapsed else 0.0
+        audio = run["audio_seconds"]
+        remaining = max(0, self.chars_total - run["chars"])
+        return {
+            "elapsed_seconds": elapsed,
+            "chunks_per_second": chunks_per_second,
+            "chars_per_second": chars_per_second,
+            "rtf": elapsed / audio if audio else None,
+            "eta_seconds": remaining / chars_per_second if chars_per_second else None,
+        }
+
+    def progress_line(self):
+        run = self.run_totals()
+        rates = self.rates()
+        rtf = f"{rates['rtf']:.2f}" if rates["rtf"] is not None else "?"
+        eta = format_duration(rates["eta_seconds"]) if run["files"] < self.files_total else "0m00s"
+        return (f"⏳ {run['files']}/{self.files_total} files, "
+                f"{run['chars']}/{self.chars_total} chars | "
+                f"{rates['chunks_per_second']:.2f} chunks/s | RTF {rtf} | ETA {eta}")
+
+    def draw_progress(self):
+        if self.progress:
+            with self.lock:
+                sys.stdout.write("\r\x1b[K" + self.progress_line())
+                sys.stdout.flush()
+
+    def log(self, message):
+        """print(), unless the live progress line replaces per-file messages."""
+        if not self.progress:
+            print(message)
+
+    def end_progress(self):
+        if self.progress:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+    def report(self):
+        with self.lock:
+            return {
+                "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "backend": BACKEND_NAME,
+                "files_total": self.files_total,
+                "chars_total": self.chars_total,
+                "totals": dict(self.totals),
+                "run_totals": self.run_totals(),
+                **self.rates(),
+                "latency_buckets": list(TELEMETRY_LATENCY_BUCKETS),
+                "stages_by_narrator": {f"{stage}|{narrator}": hist for (stage, narrator), hist in sorted(self.by_narrator.items())},
+                "stages_by_length": {f"{stage}|{length}": hist for (stage, length), hist in sorted(self.by_length.items())},
+            }
+
+    @staticmethod
+    def temp_path(path):
+        # Shards may share a path, and a daemon's runs may overlap a periodic flush
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def write_report(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = self.temp_path(path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def write_prometheus(self, path):
+        """Prometheus text format, replaced atomically as the textfile collector expects."""
+        lines = []
+
+        def histogram(name, help_text, label, table):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (stage, value), hist in sorted(table.items()):
+                labels = f'stage="{stage}",{label}="{prometheus_escape(value)}"'
+                cumulative = 0
+                for bound, n in zip(TELEMETRY_LATENCY_BUCKETS, hist["buckets"]):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+                lines.append(f"{name}_sum{{{labels}}} {hist['sum']:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {hist['count']}")
+
+        with self.lock:
+            histogram(f"{TELEMETRY_METRIC_PREFIX}_stage_seconds",
+                      "Per-chunk latency of a generation stage, by narrator.", "narrator", self.by_narrator)
+            histogram(f"{TELEMETRY_METRIC_PREFIX}_stage_by_length_seconds",
+                      "Per-chunk latency of a generation stage, by chunk length in characters.", "length", self.by_length)
+            rates = self.rates()
+            run = self.run_totals()
+            gauges = {
+                "files_done": run["files"],
+                "files_total": self.files_total,
+                "chunks_done": run["chunks"],
+                "chars_done": run["chars"],
+                "chars_total": self.chars_total,
+                "audio_seconds": run["audio_seconds"],
+                "chunks_per_second": rates["chunks_per_second"],
+                "real_time_factor": rates["rtf"],
+                "eta_seconds": rates["eta_seconds"],
+            }
+        for name, value in gauges.items():
+            if value is not None:
+                lines.append(f"# TYPE {TELEMETRY_METRIC_PREFIX}_{name} gauge")
+                lines.append(f"{TELEMETRY_METRIC_PREFIX}_{name} {value}")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = self.temp_path(path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def flush(self, final=True):
+        """
+        Write the Prometheus textfile, and at the end of a run the JSON report.
+        final=False is the periodic flush: a no-op until TELEMETRY_FLUSH_SECONDS
+        have passed, or while another thread is flushing.
+        """
+        if not self.flush_lock.acquire(blocking=final):
+            return
+        try:
+            if not final and time.time() - self.last_flush < TELEMETRY_FLUSH_SECONDS:
+                return
+            self.last_flush = time.time()
+            if self.prometheus_path:
+                self.write_prometheus(self.prometheus_path)
+            if final and self.json_path:
+                self.write_report(self.json_path)
+        except OSError as e:
+            print(f"[ERROR] Writing telemetry failed: {e}")
+        finally:
+            self.flush_lock.release()
+
+    def print_summary(self):
+        rates = self.rates()
+        rtf = f"{rates['rtf']:.2f}" if rates["rtf"] is not None else "?"
+        run = self.run_totals()
+        print(f"📈 Telemetry: {run['files']} files, {run['chunks']} chunks in "
+              f"{format_duration(rates['elapsed_seconds'])} — {rates['chunks_per_second']:.2f} chunks/s, RTF {rtf}")
+        print(f"  {'stage':<12} {'count':>7} {'total s':>9} {'mean ms':>9}")
+        for stage in TELEMETRY_STAGES:
+            hists = [h for (s, _), h in self.by_narrator.items() if s == stage]
+            count = sum(h["count"] for h in hists)
+            if count:
+                seconds = sum(h["sum"] for h in hists)
+                print(f"  {stage:<12} {count:>7} {seconds:>9.2f} {1000 * seconds / count:>9.1f}")
+        if self.json_path:
+            print(f"  Report → {self.json_path}")
+
+
+def prometheus_escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+TELEMETRY = GenerationTelemetry()
 
 
 # =========================
@@ -161,7 +1006,7 @@ def get_narrator_from_metadata(row, narrator_override=None):
     """
     # If narrator override is specified, use it if it exists
     if narrator_override:
-        if narrator_override in REF_CODES:
+        if narrator_override in ref_codes():
             return narrator_override
         else:
             print(f"[WARNING] Narrator override '{narrator_override}' not found in samples. Falling back to default logic.")
@@ -171,7 +1016,7 @@ def get_narrator_from_metadata(row, narrator_override=None):
     # ✅ BOOKS / ITEM TEXT
     if dialog_type in ("book", "item_text"):
         # must exist in ../samples/narrator/narrator.wav
-        if "narrator" in REF_CODES:
+        if "narrator" in ref_codes():
             return "narrator"
         print("[SKIP] No narrator voice sample found")
         return None
@@ -194,10 +1039,10 @@ def get_narrator_from_metadata(row, narrator_override=None):
 
     narrator = f"{race}_{sex}".lower()
 
-    if narrator in REF_CODES:
+    if narrator in ref_codes():
         return narrator
 
-    if race.lower() in REF_CODES:
+    if race.lower() in ref_codes():
         return race.lower()
 
     print(f"[SKIP] No voice sample for narrator '{narrator}' ({name})")
@@ -294,53 +1139,18 @@ def normalize_dialog_text(text: str) -> str:
     return text.strip()
 
 
-# Build gossip index map from CSV
-def build_gossip_index_map(df):
+def resolve_output_path(row, output_dir="../sounds", narrator_override=None):
     """
-    Pre-index all gossip lines per NPC from the CSV.
-    Returns dict: {npc_name: [text1, text2, ...]}
-    """
-    gossip_map = {}
-    
-    for _, row in df.iterrows():
-        npc_name = row.get("npc_name")
-        if not npc_name:
-            continue
-        
-        dialog_type = str(row.get("dialog_type", "")).lower()
-        if "gossip" not in dialog_type:
-            continue
-        
-        text = row.get("text", "")
-        if not text:
-            continue
-        
-        if npc_name not in gossip_map:
-            gossip_map[npc_name] = []
-        
-        # Only add unique texts
-        if text not in gossip_map[npc_name]:
-            gossip_map[npc_name].append(text)
-    
-    return gossip_map
-
+    Work out which voice speaks a row and where its wav goes.
 
-def generate_tts_for_row(row, output_dir="../sounds", regenerate=False, gossip_map=None, narrator_override=None):
-    """
-    Generate TTS audio for a single row.
-    
-    Args:
-        row: DataFrame row with dialog data
-        output_dir: Output directory for audio files
-        regenerate: Whether to regenerate existing files
-        gossip_map: Pre-built gossip index map
-        narrator_override: Optional wav filename (without extension) to use instead of race/sex lookup
+    Returns: (narrator_voice, filepath), or (None, None) if no narrator voice exists.
+    Does not touch the filesystem.
     """
     # Get the narrator voice to use for TTS generation
     narrator_voice = get_narrator_from_metadata(row, narrator_override=narrator_override)
-    if not narrator_voice or narrator_voice not in REF_CODES:
+    if not narrator_voice or narrator_voice not in ref_codes():
         print(f"[SKIP] No narrator metadata for NPC: {row['npc_name']}")
-        return None
+        return None, None
 
     # Get the original race/sex for folder structure (ignore override for folder naming)
     folder_race = get_narrator_from_metadata(row, narrator_override=None)
@@ -354,14 +1164,12 @@ def generate_tts_for_row(row, output_dir="../sounds", regenerate=False, gossip_m
     # ✅ BOOKS
     if dialog_type in ("book", "item_text"):
         base_dir = os.path.join(output_dir, folder_race)
-        os.makedirs(base_dir, exist_ok=True)
         filename = f"{sanitize_filename(npc_name)}.wav"
 
     # ---------- NPCs ----------
     else:
         npc_dirname = sanitize_filename(npc_name)
         base_dir = os.path.join(output_dir, folder_race, npc_dirname)
-        os.makedirs(base_dir, exist_ok=True)
 
         # 1. Check if it is a valid Quest
         qid = row.get("quest_id")
@@ -379,55 +1187,1149 @@ def generate_tts_for_row(row, output_dir="../sounds", regenerate=False, gossip_m
                 clean_text = "unknown_dialog"
             filename = f"{clean_text[:50]}.wav"
 
+    return narrator_voice, os.path.join(base_dir, filename)
 
-    print(f"Generating {base_dir}/{filename} (using voice: {narrator_voice})")
-    filepath = os.path.join(base_dir, filename)
 
-    if os.path.exists(filepath) and not regenerate:
-        print(f"[SKIP] File already exists: {filepath}")
-        return filepath
+def wav_to_int16(wav):
+    """Model output (tensor or array, float in [-1, 1]) → mono int16 PCM."""
+    if hasattr(wav, "detach"):
+        wav = wav.detach().cpu().numpy()
 
-    # Use the narrator_voice (which may be overridden) for actual TTS generation
-    ref = REF_CODES[narrator_voice]
-    text_chunks = chunk_text_robust(row["text"])
-    SAMPLE_RATE = 24000
+    wav = wav.squeeze()
+
+    # float → int16
+    return (wav * 32767).clip(-32768, 32767).astype("int16")
 
-    if not text_chunks:
-        return None
 
+def write_wav(filepath, pcm_chunks):
+    """
+    Write int16 PCM chunks, in order, as one mono wav.
+    Written beside the target and renamed over it, so a hardlinked target is
+    replaced rather than rewritten in place under every path sharing it.
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
     with sf.SoundFile(
-        filepath,
+        filepath + ".tmp",
         mode="w",
-        samplerate=SAMPLE_RATE,
+        samplerate=get_backend().sample_rate,
         channels=1,
         subtype="PCM_16",
-    ) as f, torch.no_grad():
+        format="WAV",
+    ) as f:
+        for pcm in pcm_chunks:
+            f.write(pcm)
+    os.replace(filepath + ".tmp", filepath)
+
+
+# =========================
+# WRITER PIPELINE
+# =========================
+
+def peak_normalize(pcm_chunks, headroom_db=1.0):
+    """Scale a file's chunks together so its peak sits headroom_db below full scale."""
+    peak = max((int(np.abs(pcm.astype(np.int32)).max()) for pcm in pcm_chunks if len(pcm)), default=0)
+    if not peak:
+        return pcm_chunks
+    gain = 32767 * 10 ** (-headroom_db / 20) / peak
+    return [(pcm * gain).clip(-32768, 32767).astype("int16") for pcm in pcm_chunks]
+
+
+class AudioWriterPool:
+    """
+    Writer stage of the generation pipeline.
+
+    Synthesis submits each job's chunk outputs to a bounded queue and moves straight
+    on to the next job. Writer threads convert model output to int16, fill the chunk
+    cache, optionally peak-normalize, write the wav, update the manifest and drop the
+    file's chunk checkpoints, so the model never waits on conversion or disk. The
+    bound keeps synthesis from running arbitrarily far ahead of the disk.
+    """
+
+    def __init__(self, workers=2, queue_size=8, peak_normalize_output=False, on_done=None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.peak_normalize_output = peak_normalize_output
+        self.on_done = on_done   # called with each job once its wav (and aliases) are on disk
+        self.errors = []
+        self.threads = [threading.Thread(target=self._run, daemon=True) for _ in range(max(1, workers))]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, narrator_voice, job, parts, wall_seconds, synthesized=()):
+        """
+        parts: one entry per chunk, in order — int16 PCM (cache hit, checkpoint, or
+        converted early for a checkpointed file) or (cache key or None, raw model output).
+        wall_seconds: synthesis time spent on the job, for the narrator rates.
+        synthesized: indices of the chunks synthesized for this job in this run; only
+        those count towards the narrator rates.
+        """
+        if self.errors:
+            raise self.errors[0]
+        self.queue.put((narrator_voice, job, parts, wall_seconds, synthesized))
+
+    def close(self):
+        """Drain the queue and stop the writers; re-raises the first writer error."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                self._write(*item)
+            except Exception as e:
+                # Keep draining so synthesis never blocks on a full queue
+                print(f"[ERROR] Writing {item[1]['filepath']} failed: {e}")
+                self.errors.append(e)
+
+    def _write(self, narrator_voice, job, parts, wall_seconds, synthesized):
+        pcm_chunks = []
+        for chunk, part in zip(job["chunks"], parts):
+            if isinstance(part, tuple):
+                key, raw = part
+                with TELEMETRY.stage("convert", narrator_voice, len(chunk)):
+                    pcm = wav_to_int16(raw)
+                if key:
+                    chunk_cache_put(key, pcm)
+            else:
+                pcm = part
+            pcm_chunks.append(pcm)
+
+        # Cached and resumed chunks cost next to no wall time, so they'd skew the rates
+        synth_chars = sum(len(job["chunks"][i]) for i in synthesized)
+        synth_audio = sum(len(pcm_chunks[i]) for i in synthesized) / get_backend().sample_rate
+
+        if self.peak_normalize_output:
+            pcm_chunks = peak_normalize(pcm_chunks)
+
+        chars = sum(len(c) for c in job["chunks"])
+        with TELEMETRY.stage("write", narrator_voice, chars):
+            write_wav(job["filepath"], pcm_chunks)
+        duration = manifest_finish(job["filepath"])
+        if uses_checkpoints(job["chunks"]):
+            checkpoint_clear(job["filepath"])
+        if synthesized:
+            record_rate(narrator_voice, synth_chars, synth_audio, wall_seconds)
+        TELEMETRY.file_done(job["chunks"], duration)
+        link_aliases(job["filepath"], job["aliases"])
+        if self.on_done:
+            self.on_done(job)
+
+
+# =========================
+# BATCHED GENERATION
+# =========================
+
+BATCH_BUCKET_CHARS = 50   # chunks within the same 50-char length band share a batch
+BATCH_WINDOW_ROWS = 256   # rows per narrator held in memory until their wavs are written
+
+
+def generate_batched(plan, batch_size=8, writers=2, peak_normalize_output=False, on_done=None, regenerate=False):
+    """
+    Batched alternative to synthesizing a plan job by job.
+
+    Works through the plan one narrator at a time (one voice conditioning switch per
+    narrator), synthesizes every distinct chunk of a window once, and hands chunks to
+    backend.synthesize_batch batch_size at a time, bucketed by length. A backend
+    without batched inference (chatterbox) still generates a batch's texts one by one,
+    so there batch_size only groups the work. Each job's audio is reassembled in its
+    original chunk order and handed to the writer pool. regenerate=True: see run_plan.
+    """
+    backend = load_backend()
+    pool = AudioWriterPool(workers=writers, peak_normalize_output=peak_normalize_output, on_done=on_done)
+    try:
+        for narrator_voice, jobs in plan.items():
+            TELEMETRY.log(f"[BATCH] {narrator_voice}: {len(jobs)} files")
+            with TELEMETRY.stage("condition", narrator_voice):
+                backend.prepare_voice(narrator_voice)
+
+            for start in range(0, len(jobs), BATCH_WINDOW_ROWS):
+                window = jobs[start:start + BATCH_WINDOW_ROWS]
+
+                audio = {}
+                pending = {}   # cache key -> [(job_idx, chunk_idx)], one synthesis per distinct chunk
+                buckets = {}
+                for job_idx, job in enumerate(window):
+                    manifest_start(job["filepath"], job["inputs"], len(job["chunks"]))
+                    checkpointed = uses_checkpoints(job["chunks"])
+                    for chunk_idx, chunk in enumerate(job["chunks"]):
+                        key = chunk_cache_key(narrator_voice, chunk)
+                        pcm = checkpoint_get(job["filepath"], chunk_idx, key) if checkpointed and not regenerate else None
+                        if pcm is not None:
+                            audio[(job_idx, chunk_idx)] = pcm
+                            TELEMETRY.count("resumed_chunks")
+                            continue
+                        if key in pending:
+                            pending[key].append((job_idx, chunk_idx))
+                            continue
+                        pcm = None if regenerate else chunk_cache_get(key)
+                        if pcm is not None:
+                            audio[(job_idx, chunk_idx)] = pcm
+                            TELEMETRY.count("cached_chunks")
+                            continue
+                        pending[key] = [(job_idx, chunk_idx)]
+                        buckets.setdefault(len(chunk) // BATCH_BUCKET_CHARS, []).append((key, chunk))
+
+                synth_seconds = 0.0
+                for _, items in sorted(buckets.items()):
+                    for b in range(0, len(items), batch_size):
+                        batch = items[b:b + batch_size]
+                        batch_start = time.perf_counter()
+                        outputs = backend.synthesize_batch([c for _, c in batch])
+                        batch_seconds = time.perf_counter() - batch_start
+                        synth_seconds += batch_seconds
+                        per_chunk = batch_seconds / len(batch)
+                        for _, chunk in batch:
+                            TELEMETRY.observe("synthesize", per_chunk, narrator_voice, len(chunk))
+                        for (key, chunk), raw in zip(batch, outputs):
+                            # Checkpointed files get int16 now, so the chunk survives an interruption
+                            pcm = None
+                            for job_idx, chunk_idx in pending[key]:
+                                job = window[job_idx]
+                                if not uses_checkpoints(job["chunks"]):
+                                    continue
+                                if pcm is None:
+                                    pcm = checkpoint_chunk(narrator_voice, job["filepath"], chunk_idx, chunk, key, raw)
+                                else:
+                                    checkpoint_put(job["filepath"], chunk_idx, key, pcm)
+                            # Otherwise only the first slot caches it; duplicates just reuse the output
+                            for n, slot in enumerate(pending[key]):
+                                audio[slot] = pcm if pcm is not None else (key if n == 0 else None, raw)
+                backend.release_memory()
+
+                # Synthesis time is shared by the synthesized chars; a duplicate chunk is
+                # charged to the first slot that needed it
+                synthesized = {}
+                for slots in pending.values():
+                    job_idx, chunk_idx = slots[0]
+                    synthesized.setdefault(job_idx, []).append(chunk_idx)
+                synth_chars = sum(len(window[j]["chunks"][c]) for j, idxs in synthesized.items() for c in idxs) or 1
+                for job_idx, job in enumerate(window):
+                    TELEMETRY.log(f"Generating {job['filepath']} (using voice: {narrator_voice})")
+                    job_synthesized = synthesized.get(job_idx, [])
+                    job_chars = sum(len(job["chunks"][c]) for c in job_synthesized)
+                    parts = [audio.pop((job_idx, c)) for c in range(len(job["chunks"]))]
+                    pool.submit(narrator_voice, job, parts, synth_seconds * job_chars / synth_chars, job_synthesized)
+    finally:
+        pool.close()
+
+
+# =========================
+# GENERATION MANIFEST
+# =========================
 
-        for chunk in text_chunks:
-            wav = tts.generate(
-                chunk,
-                audio_prompt_path=ref["audio_path"]
+# One row per output wav: which inputs produced it and whether it finished.
+# Lets a run decide what to skip from one query instead of a stat per file,
+# resume after an interruption, and regenerate only files whose inputs changed.
+MANIFEST_DB = "../cache/generation_manifest.sqlite"
+MANIFEST = None
+MANIFEST_LOCK = threading.Lock()   # shared by synthesis and the writer threads
+
+
+def manifest_db_path():
+    """Non-default backends get their own manifest, so benchmark runs never touch the real one."""
+    if BACKEND_NAME == "chatterbox":
+        return MANIFEST_DB
+    root, ext = os.path.splitext(MANIFEST_DB)
+    return f"{root}.{BACKEND_NAME}{ext}"
+
+
+def get_manifest():
+    global MANIFEST
+    if MANIFEST is None:
+        db_path = manifest_db_path()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # Long timeout: shard processes write to the same manifest
+        MANIFEST = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        MANIFEST.execute("PRAGMA journal_mode=WAL")
+        MANIFEST.execute("""
+            CREATE TABLE IF NOT EXISTS generated (
+                path TEXT PRIMARY KEY,
+                text_hash TEXT NOT NULL,
+                narrator TEXT NOT NULL,
+                sample_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                chunk_count INTEGER,
+                duration REAL,
+                bytes INTEGER,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        MANIFEST.execute("CREATE INDEX IF NOT EXISTS idx_generated_status ON generated(status)")
+        # Running totals per narrator, for --plan estimates
+        MANIFEST.execute("""
+            CREATE TABLE IF NOT EXISTS narrator_rates (
+                narrator TEXT PRIMARY KEY,
+                chars INTEGER NOT NULL,
+                audio_seconds REAL NOT NULL,
+                wall_seconds REAL NOT NULL
             )
+        """)
+        MANIFEST.commit()
+    return MANIFEST
 
-            if isinstance(wav, torch.Tensor):
-                wav = wav.detach().cpu().numpy()
 
-            wav = wav.squeeze()
+def text_sha256(text):
+    return hashlib.sha256(" ".join(str(text).split()).encode("utf-8")).hexdigest()
 
-            # float → int16
-            wav = (wav * 32767).clip(-32768, 32767).astype("int16")
 
-            f.write(wav)
+def generation_inputs(narrator_voice, text, voices):
+    """
+    (text_hash, narrator, sample_hash, model_version) — what a wav depends on.
+    voices: the caller's narrator -> (sample_hash, model_version) memo, so each
+    narrator's sample is stat'ed and hashed once per plan instead of once per row.
+    """
+    if narrator_voice not in voices:
+        voices[narrator_voice] = (file_sha256(ref_codes()[narrator_voice]["audio_path"]), model_version())
+    return (text_sha256(text), narrator_voice, *voices[narrator_voice])
+
+
+def load_manifest():
+    """path -> (status, inputs) for every tracked wav."""
+    rows = get_manifest().execute(
+        "SELECT path, status, text_hash, narrator, sample_hash, model_version FROM generated"
+    )
+    return {path: (status, tuple(inputs)) for path, status, *inputs in rows}
+
+
+def manifest_start(filepath, inputs, chunk_count):
+    db = get_manifest()
+    with MANIFEST_LOCK:
+        db.execute(
+            "INSERT OR REPLACE INTO generated VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, 'in_progress', ?)",
+            (filepath, *inputs, chunk_count, time.time()),
+        )
+        db.commit()
+
+
+def manifest_finish(filepath):
+    """Mark filepath done; returns its duration in seconds."""
+    info = sf.info(filepath)
+    duration = info.frames / info.samplerate
+    db = get_manifest()
+    with MANIFEST_LOCK:
+        db.execute(
+            "UPDATE generated SET status = 'done', duration = ?, bytes = ?, updated_at = ? WHERE path = ?",
+            (duration, os.path.getsize(filepath), time.time(), filepath),
+        )
+        db.commit()
+    return duration
+
+
+def record_rate(narrator_voice, chars, audio_seconds, wall_seconds):
+    db = get_manifest()
+    with MANIFEST_LOCK:
+        db.execute(
+            """
+            INSERT INTO narrator_rates VALUES (?, ?, ?, ?)
+            ON CONFLICT(narrator) DO UPDATE SET
+                chars = chars + excluded.chars,
+                audio_seconds = audio_seconds + excluded.audio_seconds,
+                wall_seconds = wall_seconds + excluded.wall_seconds
+            """,
+            (narrator_voice, chars, audio_seconds, wall_seconds),
+        )
+        db.commit()
+
+
+def load_rates():
+    """narrator -> (chars, audio_seconds, wall_seconds), plus None -> totals over all narrators."""
+    rows = get_manifest().execute("SELECT narrator, chars, audio_seconds, wall_seconds FROM narrator_rates").fetchall()
+    rates = {narrator: (chars, audio, wall) for narrator, chars, audio, wall in rows}
+    if rows:
+        rates[None] = tuple(sum(r[i] for r in rows) for i in (1, 2, 3))
+    return rates
+
+
+def manifest_link(source, target):
+    """Record target as done with the same inputs as source (no-op if source is untracked)."""
+    db = get_manifest()
+    with MANIFEST_LOCK:
+        db.execute(
+            """
+            INSERT OR REPLACE INTO generated
+            SELECT ?, text_hash, narrator, sample_hash, model_version, chunk_count, duration, bytes, 'done', ?
+            FROM generated WHERE path = ?
+            """,
+            (target, time.time(), source),
+        )
+        db.commit()
+
+
+# =========================
+# SCHEDULER
+# =========================
+
+def plan_jobs(df, output_dir="../sounds", regenerate=False, narrator_override=None, shard=None):
+    """
+    Plan the whole run before any model work starts.
+
+    Every row is resolved to (narrator, output path) and chunked; rows whose wav
+    is up to date are dropped unless regenerate is set. A path tracked in the
+    manifest is up to date when it finished with the same text, narrator, sample
+    and model; an untracked path (generated before the manifest) when it exists.
+    Jobs are grouped by narrator so a voice stays conditioned for its whole group,
+    and ordered within each group by chunk length so neighbouring jobs cost about
+    the same.
+
+    Rows with the same narrator and the same (whitespace-normalized) text become
+    one job: the first path is synthesized, the others are listed as aliases and
+    linked to it afterwards. If the canonical file already exists, its missing
+    aliases go to links instead and no synthesis is planned.
+
+    With shard=(index, count) only this shard's part is returned (see in_shard);
+    a job travels with its aliases.
+
+    Returns: (plan, missing, skipped, links)
+        plan: OrderedDict narrator -> [{"filepath", "chunks", "aliases", "inputs"}], largest group first
+        missing: rows with no narrator voice (npc_name, dialog_type)
+        skipped: number of rows whose output is up to date
+        links: [(existing canonical wav, alias path)] to link without synthesis
+    """
+    groups = {}
+    missing = []
+    skipped = 0
+    links = []
+    seen_paths = set()
+    canonical = {}   # (narrator, normalized text) -> job, or existing filepath
+    manifest = {} if regenerate else load_manifest()
+    voices = {}   # narrator -> (sample_hash, model_version), see generation_inputs
+    stale = 0
+
+    for _, row in df.iterrows():
+        narrator_voice, filepath = resolve_output_path(row, output_dir, narrator_override)
+        if not narrator_voice:
+            missing.append({"npc_name": row["npc_name"], "dialog_type": row["dialog_type"]})
+            continue
+
+        # Two rows can land on the same file (e.g. gossip sharing its first 50 chars)
+        if filepath in seen_paths:
+            continue
+        seen_paths.add(filepath)
+
+        inputs = generation_inputs(narrator_voice, row["text"], voices)
+        tracked = manifest.get(filepath)
+        if regenerate:
+            exists = False
+        elif tracked is None:
+            exists = os.path.exists(filepath)
+        else:
+            exists = tracked == ("done", inputs)
+            stale += not exists and tracked[0] == "done"
+
+        text_key = (narrator_voice, inputs[0])
+        first = canonical.get(text_key)
+
+        if first is None:
+            if exists:
+                canonical[text_key] = filepath
+                skipped += 1
+                continue
+            with TELEMETRY.stage("chunk", narrator_voice, len(row["text"])):
+                chunks = chunk_text_robust(row["text"])
+            if chunks:
+                job = {"filepath": filepath, "chunks": chunks, "aliases": [], "inputs": inputs}
+                canonical[text_key] = job
+                groups.setdefault(narrator_voice, []).append(job)
+        elif exists:
+            skipped += 1
+        elif isinstance(first, dict):
+            first["aliases"].append(filepath)
+        else:
+            links.append((first, filepath))
+
+    if shard:
+        groups, links = shard_plan(groups, links, shard)
+        missing = [m for m in missing if in_shard(m["npc_name"], shard)]
+
+    plan = OrderedDict()
+    for narrator_voice, jobs in sorted(groups.items(), key=lambda kv: (-len(kv[1]), kv[0])):
+        jobs.sort(key=lambda job: (max(len(c) for c in job["chunks"]), sum(len(c) for c in job["chunks"])))
+        plan[narrator_voice] = jobs
+
+    if stale:
+        print(f"[MANIFEST] {stale} files have changed text, voice or model and will be regenerated")
+    return plan, missing, skipped, links
+
+
+DEFAULT_CHARS_PER_AUDIO_SECOND = 15.0   # used until a run has measured the real figure
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "?"
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
+
+
+def estimate_seconds(chars, narrator_voice, rates):
+    """
+    (audio seconds, wall seconds) for chars of text, from the narrator's measured
+    rates, else the all-narrator rates, else a default for audio and unknown wall time.
+    """
+    measured = rates.get(narrator_voice) or rates.get(None)
+    if not measured or not measured[0]:
+        return chars / DEFAULT_CHARS_PER_AUDIO_SECOND, None
+    measured_chars, audio_seconds, wall_seconds = measured
+    return chars * audio_seconds / measured_chars, chars * wall_seconds / measured_chars
+
+
+def print_plan(plan, missing, skipped, links):
+    """Jobs / chunks / characters per voice, with audio and wall-time estimates."""
+    rates = load_rates()
+    total_jobs = sum(len(jobs) for jobs in plan.values())
+    aliases = sum(len(job["aliases"]) for jobs in plan.values() for job in jobs) + len(links)
+    print(f"\n📋 Planned {total_jobs} files across {len(plan)} voices, {aliases} more as links to identical lines "
+          f"({skipped} already exist, {len(missing)} without narrator)")
+    resumable = checkpoint_resumable(plan)
+    if resumable:
+        print(f"♻️  {resumable} interrupted files resume from their chunk checkpoints in {CHECKPOINT_DIR}")
+
+    total_audio = 0.0
+    total_wall = 0.0
+    wall_known = True
+    for narrator_voice, jobs in plan.items():
+        chunks = sum(len(job["chunks"]) for job in jobs)
+        chars = sum(len(c) for job in jobs for c in job["chunks"])
+        audio_seconds, wall_seconds = estimate_seconds(chars, narrator_voice, rates)
+        total_audio += audio_seconds
+        if wall_seconds is None:
+            wall_known = False
+        else:
+            total_wall += wall_seconds
+        print(f"   {narrator_voice:<28} {len(jobs):>7} files {chunks:>8} chunks {chars:>10} chars "
+              f"~{format_duration(audio_seconds):>7} audio ~{format_duration(wall_seconds):>7} wall")
+
+    print(f"   {'TOTAL':<28} ~{format_duration(total_audio)} audio, "
+          f"~{format_duration(total_wall if wall_known else None)} wall"
+          + ("" if rates else " (no measured rates yet, audio uses a default, wall unknown)"))
+    print()
+
+
+def write_job_file(path, plan, links):
+    """Write a plan as JSON that --jobs-file can run directly."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created_at": time.time(),
+            "model_version": model_version(),
+            "plan": plan,
+            "links": links,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"📝 Wrote job file → {path}")
+
+
+def read_job_file(path):
+    """
+    Load a plan written by write_job_file, dropping jobs the manifest says
+    finished (with the same inputs) after the file was written, so a job file
+    can be rerun to resume.
+    Returns: (plan, links)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if data.get("model_version") != model_version():
+        print(f"[WARN] Job file was planned for {data.get('model_version')}, running {model_version()}")
+
+    finished = {
+        path: tuple(inputs)
+        for path, *inputs in get_manifest().execute(
+            """
+            SELECT path, text_hash, narrator, sample_hash, model_version FROM generated
+            WHERE status = 'done' AND updated_at >= ?
+            """,
+            (data["created_at"],),
+        )
+    }
+    plan = OrderedDict()
+    for narrator_voice, jobs in data["plan"].items():
+        if narrator_voice not in ref_codes():
+            print(f"[SKIP] Narrator '{narrator_voice}' not found in ../samples/ ({len(jobs)} jobs)")
+            continue
+        for job in jobs:
+            job["inputs"] = tuple(job["inputs"])
+        todo = [job for job in jobs if finished.get(job["filepath"]) != job["inputs"]]
+        if todo:
+            plan[narrator_voice] = todo
+
+    return plan, [tuple(link) for link in data["links"]]
+
+
+def run_plan(plan, writers=2, peak_normalize_output=False, on_done=None, regenerate=False):
+    """
+    Synthesize a plan job by job, narrator group by narrator group.
+    Finished jobs go to an AudioWriterPool, so the model moves on to the next job
+    while the previous one is converted and written. Multi-chunk files resume from
+    their checkpoints, see CHUNK CHECKPOINTS. regenerate=True synthesizes every chunk,
+    ignoring cached and checkpointed audio (fresh audio is still written to both).
+    """
+    backend = load_backend()
+    pool = AudioWriterPool(workers=writers, peak_normalize_output=peak_normalize_output, on_done=on_done)
+    try:
+        for narrator_voice, jobs in plan.items():
+            TELEMETRY.log(f"[VOICE] {narrator_voice}: {len(jobs)} files")
+            with TELEMETRY.stage("condition", narrator_voice):
+                backend.prepare_voice(narrator_voice)
+
+            for job in jobs:
+                TELEMETRY.log(f"Generating {job['filepath']} (using voice: {narrator_voice})")
+                manifest_start(job["filepath"], job["inputs"], len(job["chunks"]))
+
+                checkpointed = uses_checkpoints(job["chunks"])
+                parts = []
+                synthesized = []
+                synth_seconds = 0.0
+                for chunk_idx, chunk in enumerate(job["chunks"]):
+                    key = chunk_cache_key(narrator_voice, chunk)
+                    pcm = checkpoint_get(job["filepath"], chunk_idx, key) if checkpointed and not regenerate else None
+                    if pcm is not None:
+                        TELEMETRY.count("resumed_chunks")
+                        parts.append(pcm)
+                        continue
+                    pcm = None if regenerate else chunk_cache_get(key)
+                    if pcm is not None:
+                        TELEMETRY.count("cached_chunks")
+                        parts.append(pcm)
+                        continue
+                    synth_start = time.time()
+                    with TELEMETRY.stage("synthesize", narrator_voice, len(chunk)):
+                        raw = backend.synthesize_batch([chunk])[0]
+                    synth_seconds += time.time() - synth_start
+                    synthesized.append(chunk_idx)
+                    if checkpointed:
+                        parts.append(checkpoint_chunk(narrator_voice, job["filepath"], chunk_idx, chunk, key, raw))
+                    else:
+                        parts.append((key, raw))
+
+                pool.submit(narrator_voice, job, parts, synth_seconds, synthesized)
+
+            backend.release_memory()
+    finally:
+        pool.close()
+
+
+# =========================
+# DEDUPLICATION
+# =========================
+
+LINK_MODE = "hardlink"   # or "copy"
+
+
+def link_file(source, target):
+    """
+    Make target a hardlink to source (or a copy with LINK_MODE = "copy").
+    Falls back to copying when the filesystem can't hardlink.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + ".tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    if LINK_MODE == "hardlink":
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copy2(source, tmp)
+    else:
+        shutil.copy2(source, tmp)
+    os.replace(tmp, target)
+
+
+def link_aliases(filepath, aliases):
+    for alias in aliases:
+        TELEMETRY.log(f"[LINK] {alias} → {filepath}")
+        link_file(filepath, alias)
+        manifest_link(filepath, alias)
 
-            # HARD MEMORY RELEASE
-            del wav
-            torch.cuda.empty_cache()
 
-    return filepath
+def dedupe_sounds(output_dir="../sounds"):
+    """
+    Collapse byte-identical wavs under output_dir into hardlinks of one file.
+    Candidates are grouped by size first so only same-size files get hashed.
+    """
+    by_size = {}
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            if name.lower().endswith(".wav"):
+                path = os.path.join(root, name)
+                by_size.setdefault(os.path.getsize(path), []).append(path)
+
+    linked = 0
+    saved = 0
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+
+        by_hash = {}
+        for path in sorted(paths):
+            by_hash.setdefault(file_sha256(path), []).append(path)
+
+        for same in by_hash.values():
+            source = same[0]
+            source_inode = os.stat(source).st_ino
+            for path in same[1:]:
+                if os.stat(path).st_ino == source_inode:
+                    continue
+                link_file(source, path)
+                linked += 1
+                saved += size
+
+    print(f"🔗 Linked {linked} duplicate wavs, {saved / 1024 ** 2:.1f} MB reclaimed")
+
+
+# =========================
+# GENERATION DAEMON
+# =========================
+
+# A long-running process that keeps the model and voice conditionals resident and
+# runs jobs (filter sets, as on the command line) one at a time. When it is up,
+# the CLI submits its filters there and follows the progress instead of loading
+# the model itself.
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_JOB_FIELDS = ("race", "sex", "npc", "zone", "type", "limit", "narrator", "regenerate", "batch_size", "normalize")
+DAEMON_HISTORY = 100   # finished jobs kept for status queries
+DAEMON_REQUEST_TIMEOUT = 10     # seconds for the daemon to accept a job
+DAEMON_HEARTBEAT_SECONDS = 15   # a job's event stream repeats its state at least this often
+DAEMON_EVENT_TIMEOUT = 60       # seconds without an event before the client gives up on the daemon
+# Fixed when the daemon starts (device, threads, caches, writers) or only meaningful
+# in this process (telemetry files, progress line); setting any of them keeps the
+# run local instead of silently using the daemon's settings. Backend, quantization
+# and output dir are compared against the daemon's own (see daemon_local_reason).
+DAEMON_LOCAL_OPTIONS = (
+    "device", "torch_threads", "interop_threads", "no_chunk_cache", "chunk_cache_gb",
+    "writers", "link_mode", "telemetry_json", "prometheus_textfile", "progress",
+)
+
+
+class GenerationDaemon:
+    """Job queue and worker behind the HTTP API (see create_daemon_app)."""
+
+    def __init__(self, output_dir="../sounds", writers=2):
+        self.output_dir = output_dir
+        self.writers = writers
+        self.jobs = OrderedDict()   # id -> job
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def submit(self, params):
+        """
+        Queue a job, unless an identical one (same filters) is queued or running,
+        in which case that job is returned. Returns (public_job snapshot, deduped).
+        """
+        key = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+        with self.lock:
+            for job in self.jobs.values():
+                if job["key"] == key and job["status"] in ("queued", "planning", "running"):
+                    return public_job(job), True
+
+            self.counter += 1
+            job = {
+                "id": f"{self.counter}-{key[:8]}",
+                "key": key,
+                "params": params,
+                "status": "queued",
+                "planned": 0,
+                "done": 0,
+                "error": None,
+                "submitted_at": time.time(),
+            }
+            self.jobs[job["id"]] = job
+            self.pending.put(job["id"])
+            self.trim_history()
+            return public_job(job), False
+
+    def trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - DAEMON_HISTORY)]:
+            del self.jobs[job_id]
+
+    def queue_depth(self):
+        with self.lock:
+            return sum(job["status"] == "queued" for job in self.jobs.values())
+
+    def update(self, job, **fields):
+        """Change a job's fields under the lock, so status readers never see half an update."""
+        with self.lock:
+            job.update(fields)
+
+    def snapshot(self, job_id):
+        """public_job of job_id taken under the lock, or None once trim_history dropped it."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return public_job(job) if job is not None else None
+
+    def run_forever(self):
+        while True:
+            job_id = self.pending.get()
+            with self.lock:
+                job = self.jobs[job_id]
+            try:
+                self.run_job(job)
+                self.update(job, status="done")
+            except Exception as e:
+                print(f"[ERROR] Daemon job {job['id']} failed: {e}")
+                self.update(job, status="failed", error=str(e))
+
+    def run_job(self, job):
+        self.update(job, status="planning")
+        params = job["params"]
+        args = argparse.Namespace(**{field: params.get(field) for field in DAEMON_JOB_FIELDS})
+
+        # A fresh voice table per job picks up samples added since the daemon started
+        with using_voices(build_ref_codes("../samples")):
+            if args.narrator and args.narrator not in ref_codes():
+                raise ValueError(f"Narrator '{args.narrator}' not found in ../samples/")
+            self.generate(job, args)
+
+    def generate(self, job, args):
+        df = build_dialog_dataframe(args)
+        plan, missing, skipped, links = plan_jobs(
+            df,
+            output_dir=self.output_dir,
+            regenerate=bool(args.regenerate),
+            narrator_override=args.narrator,
+        )
+        print_plan(plan, missing, skipped, links)
+        for source, target in links:
+            link_file(source, target)
+            manifest_link(source, target)
+
+        self.update(job, status="running", planned=sum(len(jobs) for jobs in plan.values()))
+
+        def on_done(_):
+            # Called from the writer pool's threads
+            with self.lock:
+                job["done"] += 1
+
+        TELEMETRY.begin_run(plan)
+        if (args.batch_size or 1) > 1:
+            generate_batched(plan, batch_size=args.batch_size, writers=self.writers,
+                             peak_normalize_output=bool(args.normalize), on_done=on_done,
+                             regenerate=bool(args.regenerate))
+        else:
+            run_plan(plan, writers=self.writers, peak_normalize_output=bool(args.normalize), on_done=on_done,
+                     regenerate=bool(args.regenerate))
+        print_chunk_cache_stats()
+        print_backend_stats()
+        TELEMETRY.flush()
+
+
+def public_job(job):
+    return {k: v for k, v in job.items() if k != "key"}
+
+
+def create_daemon_app(daemon):
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI(title="BetterQuest generator")
+
+    @app.post("/jobs")
+    def post_job(params: dict):
+        job, deduped = daemon.submit({field: params.get(field) for field in DAEMON_JOB_FIELDS})
+        return {**job, "deduped": deduped}
+
+    @app.get("/jobs/{job_id}")
+    def get_job(job_id: str):
+        snapshot = daemon.snapshot(job_id)
+        if snapshot is None:
+            raise HTTPException(status_code=404, detail="unknown job")
+        return snapshot
+
+    @app.get("/jobs/{job_id}/events")
+    def job_events(job_id: str):
+        """
+        Newline-delimited JSON snapshots of the job whenever it changes (and at least
+        every DAEMON_HEARTBEAT_SECONDS), until it finishes. A job trimmed from the
+        history meanwhile ends the stream with a {"status": "gone"} event.
+        """
+        if daemon.snapshot(job_id) is None:
+            raise HTTPException(status_code=404, detail="unknown job")
+
+        def stream():
+            last = None
+            sent_at = 0.0
+            while True:
+                snapshot = daemon.snapshot(job_id)
+                if snapshot is None:
+                    yield json.dumps({"id": job_id, "status": "gone"}) + "\n"
+                    return
+                if snapshot != last or time.time() - sent_at >= DAEMON_HEARTBEAT_SECONDS:
+                    yield json.dumps(snapshot) + "\n"
+                    last = snapshot
+                    sent_at = time.time()
+                if snapshot["status"] in ("done", "failed"):
+                    return
+                time.sleep(0.5)
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    @app.get("/queue")
+    def get_queue():
+        with daemon.lock:
+            jobs = [public_job(job) for job in daemon.jobs.values()]
+        return {
+            "backend": get_backend().version(),
+            "output_dir": os.path.abspath(daemon.output_dir),
+            "depth": sum(job["status"] == "queued" for job in jobs),
+            "running": next((job["id"] for job in jobs if job["status"] in ("planning", "running")), None),
+            "jobs": jobs,
+        }
+
+    return app
 
 
+def serve(output_dir="../sounds", writers=2, port=DAEMON_PORT):
+    import uvicorn
 
-def parse_args():
+    # Load before accepting jobs, so the first job doesn't pay for it
+    load_backend()
+    daemon = GenerationDaemon(output_dir=output_dir, writers=writers)
+    threading.Thread(target=daemon.run_forever, daemon=True).start()
+    print(f"🟢 Generator daemon on http://{DAEMON_HOST}:{port} ({get_backend().version()})")
+    uvicorn.run(create_daemon_app(daemon), host=DAEMON_HOST, port=port, log_level="warning")
+
+
+def daemon_url(path, port=DAEMON_PORT):
+    return f"http://{DAEMON_HOST}:{port}{path}"
+
+
+def daemon_status(port=DAEMON_PORT):
+    """The daemon's /queue status, or None when no daemon answers."""
+    try:
+        with urllib.request.urlopen(daemon_url("/queue", port), timeout=0.3) as response:
+            return json.load(response)
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def daemon_local_reason(args, output_dir, status):
+    """Why this run can't go to the daemon described by status, or None if it can."""
+    defaults = vars(parse_args([]))
+    local_options = [f"--{name.replace('_', '-')}" for name in DAEMON_LOCAL_OPTIONS
+                     if getattr(args, name) != defaults[name]]
+    if local_options:
+        return f"{', '.join(local_options)} can't be passed to it"
+    if status.get("backend") != get_backend().version():
+        return f"it runs {status.get('backend')}, not {get_backend().version()}"
+    if status.get("output_dir") != os.path.abspath(output_dir):
+        return f"it writes to {status.get('output_dir')}, not {os.path.abspath(output_dir)}"
+    return None
+
+
+def submit_to_daemon(args, port=DAEMON_PORT):
+    """
+    Thin-client path: send the filters as a job and print its progress.
+    Returns an exit code, or None if the daemon didn't take the job (run it locally).
+    """
+    params = {field: getattr(args, field) for field in DAEMON_JOB_FIELDS}
+    request = urllib.request.Request(
+        daemon_url("/jobs", port),
+        data=json.dumps(params).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=DAEMON_REQUEST_TIMEOUT) as response:
+            job = json.load(response)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        print(f"[INFO] The generator daemon didn't take the job ({e}); generating in this process")
+        return None
+    print(f"📨 Job {job['id']} sent to the generator daemon" + (" (identical job already in flight)" if job["deduped"] else ""))
+
+    # The job is the daemon's now, so from here on a lost daemon is an error, not a local rerun
+    last = None
+    try:
+        # The timeout applies to every read; the daemon sends a heartbeat well within it
+        with urllib.request.urlopen(daemon_url(f"/jobs/{job['id']}/events", port), timeout=DAEMON_EVENT_TIMEOUT) as events:
+            for line in events:
+                job = json.loads(line)
+                if job["status"] != "gone" and job != last:
+                    print(f"[{job['status']}] {job['done']}/{job['planned']} files")
+                last = job
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        print(f"[ERROR] Lost the generator daemon while following job {job['id']} ({e}); "
+              f"it may still be running, see {daemon_url('/queue', port)}")
+        return 1
+
+    if job["status"] == "done":
+        return 0
+    if job["status"] == "failed":
+        print(f"[ERROR] {job['error']}")
+    elif job["status"] == "gone":
+        print(f"[ERROR] Job {job['id']} left the daemon's history before its result was read")
+    else:
+        print(f"[ERROR] The daemon stopped reporting job {job['id']} while it was {job['status']}")
+    return 1
+
+
+# =========================
+# SHARDING
+# =========================
+
+SHARD_LOG_DIR = "../logs/generator"
+
+
+def parse_shard(value):
+    """'i/N' → (i, N), 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1, got {value!r}")
+    return index, count
+
+
+def in_shard(key, shard):
+    """Stable across processes and machines (unlike hash()), so shards never overlap."""
+    index, count = shard
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % count == index
+
+
+def shard_plan(plan, links, shard):
+    """This shard's jobs (keyed on the canonical path, aliases included) and links."""
+    plan = OrderedDict(
+        (narrator_voice, [job for job in jobs if in_shard(job["filepath"], shard)])
+        for narrator_voice, jobs in plan.items()
+    )
+    plan = OrderedDict((narrator_voice, jobs) for narrator_voice, jobs in plan.items() if jobs)
+    links = [(source, target) for source, target in links if in_shard(source, shard)]
+    return plan, links
+
+
+def shard_suffix(shard):
+    return f"shard{shard[0]}of{shard[1]}"
+
+
+def shard_path(path, shard):
+    """path with the shard suffix before its extension, so shards don't overwrite each other."""
+    if not shard:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{shard_suffix(shard)}{ext}"
+
+
+def write_missing_report(missing, output_dir="../sounds", shard=None):
+    if not missing:
+        return
+    name = f"missing_narrators.{shard_suffix(shard)}.csv" if shard else "missing_narrators.csv"
+    missing_csv = os.path.join(output_dir, name)
+    os.makedirs(output_dir, exist_ok=True)
+    pd.DataFrame(missing).drop_duplicates().to_csv(missing_csv, index=False)
+    print(f"Saved {len(missing)} rows with missing/ambiguous narrators → {missing_csv}")
+
+
+def strip_cli_options(argv, options):
+    """argv without the given '--opt value' / '--opt=value' options."""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in options:
+            skip = "=" not in arg
+            continue
+        result.append(arg)
+    return result
+
+
+def launch_shards(workers, argv, output_dir="../sounds"):
+    """
+    Run this script as `workers` shard processes, each with its own model and an
+    even share of the CPU threads, then merge their logs and reports.
+    --quantize-check is not passed on: the caller runs it once before launching.
+    """
+    script = os.path.abspath(__file__)
+    child_args = strip_cli_options(
+        argv, {"--workers", "--shard", "--torch-threads", "--interop-threads", "--quantize-check"}
+    )
+    child_args = [arg for arg in child_args if arg != "--progress"]   # shard output goes to a log
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    os.makedirs(SHARD_LOG_DIR, exist_ok=True)
+
+    procs = []
+    for index in range(workers):
+        shard = (index, workers)
+        log_path = os.path.join(SHARD_LOG_DIR, f"{shard_suffix(shard)}.log")
+        env = dict(os.environ, OMP_NUM_THREADS=str(threads), PYTHONUNBUFFERED="1")
+        log = open(log_path, "w", encoding="utf-8")
+        proc = subprocess.Popen(
+            [sys.executable, script, *child_args,
+             "--shard", f"{index}/{workers}", "--torch-threads", str(threads), "--interop-threads", "1"],
+            cwd=os.path.dirname(script), env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        procs.append((shard, proc, log))
+        print(f"🚀 Shard {index}/{workers} started (pid {proc.pid}, {threads} threads) → {log_path}")
+
+    failed = 0
+    for shard, proc, log in procs:
+        code = proc.wait()
+        log.close()
+        if code != 0:
+            failed += 1
+            print(f"[ERROR] Shard {shard[0]}/{shard[1]} exited with code {code}")
+
+    merge_shards(workers, output_dir)
+    return failed
+
+
+def merge_shards(count, output_dir="../sounds"):
+    """
+    Reconcile the per-shard outputs of a --workers run, or of --shard runs on
+    several machines once their logs and reports are copied back here:
+    one combined log with shard-prefixed lines, one missing_narrators.csv,
+    and a per-shard summary.
+    """
+    combined_path = os.path.join(SHARD_LOG_DIR, "combined.log")
+    os.makedirs(SHARD_LOG_DIR, exist_ok=True)
+    missing_frames = []
+
+    print(f"\n📊 Shard summary ({count} shards)")
+    with open(combined_path, "w", encoding="utf-8") as combined:
+        for index in range(count):
+            shard = (index, count)
+            counts = Counter()
+            log_path = os.path.join(SHARD_LOG_DIR, f"{shard_suffix(shard)}.log")
+            if os.path.exists(log_path):
+                with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        combined.write(f"[{index}/{count}] {line}")
+                        if line.startswith("Generating "):
+                            counts["generated"] += 1
+                        elif line.startswith("[LINK]"):
+                            counts["linked"] += 1
+                        elif line.startswith("[ERROR]") or line.startswith("Traceback"):
+                            counts["errors"] += 1
+            else:
+                counts["no log"] += 1
+
+            missing_csv = os.path.join(output_dir, f"missing_narrators.{shard_suffix(shard)}.csv")
+            if os.path.exists(missing_csv):
+                frame = pd.read_csv(missing_csv)
+                counts["missing narrator"] += len(frame)
+                missing_frames.append(frame)
+                os.remove(missing_csv)
+
+            summary = ", ".join(f"{n} {what}" for what, n in counts.items()) or "nothing to do"
+            print(f"   shard {index}/{count}: {summary}")
+
+    print(f"   combined log → {combined_path}")
+    if missing_frames:
+        missing = pd.concat(missing_frames, ignore_index=True).drop_duplicates()
+        write_missing_report(missing.to_dict("records"), output_dir)
+
+
+def parse_args(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--race", type=str, help="Filter by NPC race")
     parser.add_argument("--sex", type=str, help="Filter by NPC sex (male/female)")
@@ -439,7 +2341,60 @@ def parse_args():
     parser.add_argument("--regenerate", action="store_true", help="Regenerate existing audio files")
     parser.add_argument("--clean-orphans", action="store_true", 
                         help="Delete sound files for NPCs not in metadata or with wrong race/sex")
-    return parser.parse_args()
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Group chunks N at a time by narrator and chunk length, deduping repeated chunks; "
+                             "chatterbox still generates them one by one (default: 1, row by row)")
+    parser.add_argument("--no-chunk-cache", action="store_true",
+                        help="Always synthesize; don't read or write the per-chunk audio cache")
+    parser.add_argument("--chunk-cache-gb", type=float, default=CHUNK_CACHE_MAX_BYTES / 1024 ** 3,
+                        help=f"Size limit of {CHUNK_CACHE_DIR}, least recently used chunks evicted first (default: %(default)s)")
+    parser.add_argument("--backend", default=BACKEND_NAME, choices=sorted(BACKENDS),
+                        help="TTS engine; 'synthetic' emits deterministic tones without torch, for benchmarks (default: %(default)s)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Where generated audio goes (default: ../sounds, or ../cache/synthetic_sounds for --backend synthetic)")
+    parser.add_argument("--device", default="auto", choices=["auto", "cuda", "mps", "cpu"],
+                        help="Device for the TTS model (default: auto — cuda, then mps, then cpu)")
+    parser.add_argument("--plan", "--dry-run", dest="plan", action="store_true",
+                        help="Only plan the run and print per-voice counts and time estimates; never loads torch or the model")
+    parser.add_argument("--plan-out", type=str, default=None,
+                        help="Write the planned jobs to this JSON job file")
+    parser.add_argument("--jobs-file", type=str, default=None,
+                        help="Run the jobs in a file written by --plan-out instead of planning from the CSV")
+    parser.add_argument("--writers", type=int, default=2,
+                        help="Writer threads converting, encoding and saving audio while synthesis continues (default: 2)")
+    parser.add_argument("--normalize", action="store_true",
+                        help="Peak-normalize each file to -1 dBFS before writing")
+    parser.add_argument("--shard", type=parse_shard, default=None,
+                        help="Only run shard i of N (0-based, e.g. 0/4), partitioned by hash of the output path")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Launch N local shard processes, each with its own model and CPU thread share, then merge their logs")
+    parser.add_argument("--merge-shards", type=int, default=None, metavar="N",
+                        help=f"Merge logs and missing-narrator reports of N shards in {SHARD_LOG_DIR}, then exit")
+    parser.add_argument("--torch-threads", type=int, default=None,
+                        help="torch intra-op CPU threads for this process (default: torch's own choice)")
+    parser.add_argument("--interop-threads", type=int, default=None,
+                        help="torch inter-op threads for this process (default: torch's own choice)")
+    parser.add_argument("--quantize", action="store_true",
+                        help="CPU mode: dynamic int8 quantization of the Chatterbox token model (implies --device cpu with auto)")
+    parser.add_argument("--quantize-check", type=int, default=0, metavar="N",
+                        help="With --quantize: before the run, compare N chunks against an fp32 copy (RTF and spectral distance)")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the generator daemon: model stays loaded, jobs arrive over HTTP on localhost")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT,
+                        help="Daemon port (default: %(default)s)")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Generate in this process even if a daemon is running")
+    parser.add_argument("--link-mode", choices=["hardlink", "copy"], default=LINK_MODE,
+                        help="How NPCs sharing a narrator and identical text share one synthesized wav (default: %(default)s)")
+    parser.add_argument("--dedupe-sounds", action="store_true",
+                        help="Replace byte-identical wavs in ../sounds with links to one copy, then exit")
+    parser.add_argument("--telemetry-json", type=str, default=None,
+                        help=f"Where the stage latency / throughput report goes (default: {SHARD_LOG_DIR}/telemetry.json)")
+    parser.add_argument("--prometheus-textfile", type=str, default=None,
+                        help=f"Also export telemetry as a Prometheus textfile (.prom), refreshed every {TELEMETRY_FLUSH_SECONDS}s")
+    parser.add_argument("--progress", action="store_true",
+                        help="Replace per-file log lines with one live progress line (chunks/s, RTF, ETA)")
+    return parser.parse_args(argv)
 
 
 def filter_dataframe(df, args):
@@ -476,6 +2431,18 @@ def filter_dataframe(df, args):
     return df
 
 
+def build_dialog_dataframe(args):
+    """Dialog CSV → filtered, de-duplicated, normalized rows with books merged."""
+    df = pd.read_csv(NPC_DIALOG_CSV_PATH)
+    df = df[df["text"].notna()]
+
+    df = filter_dataframe(df, args)
+    df = df.drop_duplicates(subset=["npc_name", "text"])
+    df["text"] = df["text"].apply(normalize_dialog_text)
+    df = merge_item_text_rows(df)
+    return df
+
+
 def clean_orphaned_files(output_dir="../sounds"):
     """
     Delete sound files for NPCs that:
@@ -566,58 +2533,124 @@ def merge_item_text_rows(df):
     return df
 
 
-def process_dataframe(df, output_dir="../sounds"):
-    """
-    Process the dataframe row-by-row, generate TTS files.
-    """
-    missing_narrators = []
-    for idx, row in df.iterrows():
-        result = generate_tts_for_row(row, output_dir=output_dir)
-        if not result:
-            missing_narrators.append({
-                "npc_name": row["npc_name"],
-                "dialog_type": row["dialog_type"]
-            })
-
-    if missing_narrators:
-        missing_csv = os.path.join(output_dir, "missing_narrators.csv")
-        pd.DataFrame(missing_narrators).to_csv(missing_csv, index=False)
-        print(f"Saved {len(missing_narrators)} rows with missing/ambiguous narrators → {missing_csv}")
-
 # =========================
 # EXAMPLE USAGE
 # =========================
 if __name__ == "__main__":
     args = parse_args()
+    CHUNK_CACHE_ENABLED = not args.no_chunk_cache
+    CHUNK_CACHE_MAX_BYTES = int(args.chunk_cache_gb * 1024 ** 3)
+    LINK_MODE = args.link_mode
+    TTS_DEVICE = args.device
+    TORCH_THREADS = args.torch_threads
+    INTEROP_THREADS = args.interop_threads
+    QUANTIZE = args.quantize
+    BACKEND_NAME = args.backend
+    TELEMETRY.progress = args.progress
+    TELEMETRY.json_path = shard_path(args.telemetry_json or os.path.join(SHARD_LOG_DIR, "telemetry.json"), args.shard)
+    if args.prometheus_textfile:
+        TELEMETRY.prometheus_path = shard_path(args.prometheus_textfile, args.shard)
+    output_dir = args.output_dir or ("../sounds" if BACKEND_NAME == "chatterbox" else f"../cache/{BACKEND_NAME}_sounds")
+
+    if QUANTIZE and TTS_DEVICE not in ("auto", "cpu"):
+        print(f"[ERROR] --quantize runs on the CPU only; use --device cpu (or auto) instead of --device {TTS_DEVICE}")
+        sys.exit(1)
+
+    if args.workers and args.workers > 1 and (args.shard or args.plan_out or args.plan or args.merge_shards):
+        print("[ERROR] --workers can't be combined with --shard, --plan, --plan-out or --merge-shards")
+        sys.exit(1)
 
     if args.clean_orphans:
-        clean_orphaned_files("../sounds")
+        clean_orphaned_files(output_dir)
         sys.exit(0)
 
-    df = pd.read_csv(NPC_DIALOG_CSV_PATH)
-    df = df[df["text"].notna()]
+    if args.dedupe_sounds:
+        dedupe_sounds(output_dir)
+        sys.exit(0)
 
-    df = filter_dataframe(df, args)
-    df = df.drop_duplicates(subset=["npc_name", "text"])
-    df["text"] = df["text"].apply(normalize_dialog_text)
-    df = merge_item_text_rows(df)
-    
-    # Build gossip index map once at start
-    gossip_map = build_gossip_index_map(df)
+    if args.merge_shards:
+        merge_shards(args.merge_shards, output_dir)
+        sys.exit(0)
 
-    # Validate narrator override if provided
-    if args.narrator:
-        if args.narrator not in REF_CODES:
-            print(f"[ERROR] Narrator '{args.narrator}' not found in ../samples/")
-            print(f"Available narrators: {', '.join(sorted(REF_CODES.keys()))}")
-            sys.exit(1)
-        print(f"[INFO] Using narrator override: {args.narrator}")
+    if args.serve:
+        serve(output_dir, writers=args.writers, port=args.port)
+        sys.exit(0)
 
-    for _, row in df.iterrows():
-        generate_tts_for_row(
-            row,
-            output_dir="../sounds",
+    # Plain generation runs go to a running daemon (it has the model loaded already)
+    local_only = (args.no_daemon or args.plan or args.plan_out or args.jobs_file
+                  or args.shard or args.workers or args.quantize_check)
+    status = None if local_only else daemon_status(args.port)
+    if status:
+        reason = daemon_local_reason(args, output_dir, status)
+        if reason is None:
+            code = submit_to_daemon(args, args.port)
+            if code is not None:
+                sys.exit(code)
+        else:
+            print(f"[INFO] A generator daemon is running, but {reason}; generating in this process")
+
+    if args.workers and args.workers > 1:
+        if args.quantize_check:
+            # Once here instead of once per shard, on the jobs the shards are about to run
+            if args.jobs_file:
+                check_plan, _ = read_job_file(args.jobs_file)
+            else:
+                check_plan, _, _, _ = plan_jobs(build_dialog_dataframe(args), output_dir=output_dir,
+                                                regenerate=args.regenerate, narrator_override=args.narrator)
+            run_quality_check(check_plan, args.quantize_check)
+            BACKEND = None   # free this process's model before every shard loads its own
+        sys.exit(1 if launch_shards(args.workers, sys.argv[1:], output_dir) else 0)
+
+    if args.jobs_file:
+        plan, links = read_job_file(args.jobs_file)
+        if args.shard:
+            plan, links = shard_plan(plan, links, args.shard)
+        print_plan(plan, [], 0, links)
+    else:
+        df = build_dialog_dataframe(args)
+
+        # Validate narrator override if provided
+        if args.narrator:
+            if args.narrator not in REF_CODES:
+                print(f"[ERROR] Narrator '{args.narrator}' not found in ../samples/")
+                print(f"Available narrators: {', '.join(sorted(REF_CODES.keys()))}")
+                sys.exit(1)
+            print(f"[INFO] Using narrator override: {args.narrator}")
+
+        plan, missing, skipped, links = plan_jobs(
+            df,
+            output_dir=output_dir,
             regenerate=args.regenerate,
-            gossip_map=gossip_map,
-            narrator_override=args.narrator
-        )
\ No newline at end of file
+            narrator_override=args.narrator,
+            shard=args.shard,
+        )
+        print_plan(plan, missing, skipped, links)
+        if not args.plan:
+            write_missing_report(missing, output_dir, args.shard)
+
+    if args.plan_out:
+        write_job_file(args.plan_out, plan, links)
+
+    if args.plan:
+        sys.exit(0)
+
+    for source, target in links:
+        print(f"[LINK] {target} → {source}")
+        link_file(source, target)
+        manifest_link(source, target)
+
+    if args.quantize_check:
+        run_quality_check(plan, args.quantize_check)
+
+    TELEMETRY.begin_run(plan)
+    if args.batch_size > 1:
+        generate_batched(plan, batch_size=args.batch_size, writers=args.writers, peak_normalize_output=args.normalize,
+                         regenerate=args.regenerate)
+    else:
+        run_plan(plan, writers=args.writers, peak_normalize_output=args.normalize, regenerate=args.regenerate)
+    TELEMETRY.end_progress()
+
+    print_chunk_cache_stats()
+    print_backend_stats()
+    TELEMETRY.flush()
+    TELEMETRY.print_summary()
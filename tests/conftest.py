@@ -0,0 +1,128 @@
+"""Shared fixtures: scripts/ on sys.path, a small world database snapshot for extract.py, a generator sandbox."""
+import importlib.util
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+DBSCRIPT_TABLES = [
+    "creature_death", "creature_movement", "relay", "quest_start", "quest_end",
+    "gossip", "event", "go_template_use", "go_use", "spell",
+]
+
+WORLD_TABLES = {
+    "creature_template": "Entry int, Name text, GossipMenuId int, DisplayId1 int, ScriptName text",
+    "creature_model_info": "modelid int, gender int",
+    "broadcast_text": "Id int, Text text, Text1 text",
+    "script_texts": "entry int, content_default text, broadcast_text_id int, comment text",
+    "npc_text_broadcast_text": "Id int, " + ", ".join(f"BroadcastTextId{i} int" for i in range(8)),
+    "gossip_menu": "entry int, text_id int",
+    "gossip_menu_option": "menu_id int, id int, option_text text, action_menu_id int, action_script_id int",
+    "gameobject_template": "entry int, name text, type int, data0 int, data3 int",
+    "gameobject": "guid int, id int",
+    "page_text": "entry int, text text, next_page int",
+    "item_template": "entry int, name text, startquest int, PageText int",
+    "quest_template": "entry int, Details text, RequestItemsText text, OfferRewardText text, "
+                      "Objectives text, StartScript int, CompleteScript int",
+    "creature_questrelation": "id int, quest int",
+    "creature_involvedrelation": "id int, quest int",
+    "questgiver_greeting": "Entry int, Text text",
+    "trainer_greeting": "Entry int, Text text",
+    "creature_ai_scripts": "creature_id int, action1_type int, action1_param1 int, "
+                           "action2_type int, action2_param1 int, action3_type int, action3_param3 int",
+}
+for name in DBSCRIPT_TABLES:
+    WORLD_TABLES[f"dbscripts_on_{name}"] = (
+        "id int, command int, buddy_entry int, data_flags int, search_radius int, dataint int, comments text"
+    )
+
+WORLD_ROWS = {
+    "creature_template": [(474, "Defias Rogue", 10, 1, "npc_defias"), (5, "Town Crier", 0, 2, "")],
+    "creature_model_info": [(1, 0), (2, 1)],
+    "broadcast_text": [
+        (1, "Hello there", None), (2, "Death to all", None), (3, "%s dies.", "Fallen at last."),
+        (4, "Walk on", None), (5, "Orphan line", None), (6, "Relay talk", None),
+        (7, "Quest start yell", None), (8, "Sub menu text", None), (9, "AI aggro", None),
+    ],
+    "script_texts": [(-1, "Die insect!", 0, "defias_rogue SAY_AGGRO"), (-2, "Nobody", 0, "nobody_here SAY")],
+    "npc_text_broadcast_text": [(100, 1, 0, 0, 0, 0, 0, 0, 0), (101, 8, 8, 0, 0, 0, 0, 0, 0)],
+    "gossip_menu": [(10, 100), (11, 101)],
+    "gossip_menu_option": [(10, 0, "more", 11, 0)],
+    "dbscripts_on_creature_death": [(474, 0, 5, 0, 0, 2, "")],
+    "dbscripts_on_creature_movement": [(47401, 0, 0, 0, 0, 4, "")],
+    "dbscripts_on_relay": [(1, 0, 0, 0, 0, 6, "")],
+    "dbscripts_on_quest_start": [(55, 0, 0, 0, 0, 7, "")],
+    "quest_template": [(9, "Go do it $N", "Done?", "Thanks", "Kill 5", 55, 0)],
+    "creature_questrelation": [(474, 9)],
+    "creature_involvedrelation": [(474, 9)],
+    "creature_ai_scripts": [(474, 1, 9, 0, 0, 0, 0)],
+    "page_text": [(1, "Page one", 2), (2, "Page two", 1)],
+    "item_template": [(7, "Old Book", 0, 1)],
+    "gameobject_template": [(8, "Plaque", 9, 2, 0)],
+    "questgiver_greeting": [(474, "Greetings")],
+    "trainer_greeting": [(5, "Train?")],
+}
+
+
+@pytest.fixture
+def world_snapshot(tmp_path):
+    """SQLite snapshot (the format --export-snapshot writes) of a tiny world database."""
+    path = str(tmp_path / "world.sqlite")
+    conn = sqlite3.connect(path)
+    for table, columns in WORLD_TABLES.items():
+        conn.execute(f"CREATE TABLE {table} ({columns})")
+    for table, rows in WORLD_ROWS.items():
+        for row in rows:
+            conn.execute(f"INSERT INTO {table} VALUES ({', '.join('?' * len(row))})", row)
+    conn.commit()
+    conn.close()
+    return path
+
+
+NPC_METADATA = [
+    {"name": "Marshal Dughan", "race": "human", "sex": "male"},
+    {"name": "Guard Thomas", "race": "human", "sex": "male"},
+    {"name": "Aayndia Floralwind", "race": "night_elf", "sex": "female"},
+]
+NARRATOR_SAMPLES = ("human_male", "night_elf_female", "narrator")
+
+
+def write_sample(path, seed):
+    """Short reference wav; the seed makes every sample (and so its content hash) distinct."""
+    np = pytest.importorskip("numpy")
+    sf = pytest.importorskip("soundfile")
+    rng = np.random.default_rng(seed)
+    sf.write(str(path), rng.uniform(-0.5, 0.5, 2400).astype("float32"), 24000)
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    """
+    A fresh generator module on the synthetic backend, run from scripts/ inside a
+    tmp tree laid out like the repo (data/, samples/), so its ../cache, ../sounds
+    and ../logs paths all land under tmp_path.
+    """
+    for module in ("numpy", "pandas", "soundfile", "pydub"):
+        pytest.importorskip(module)
+
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "npc_metadata.json").write_text(json.dumps(NPC_METADATA), encoding="utf-8")
+    (tmp_path / "samples").mkdir()
+    for seed, narrator in enumerate(NARRATOR_SAMPLES):
+        write_sample(tmp_path / "samples" / f"{narrator}.wav", seed)
+    (tmp_path / "scripts").mkdir()
+    monkeypatch.chdir(tmp_path / "scripts")
+
+    spec = importlib.util.spec_from_file_location("generator", os.path.join(SCRIPTS_DIR, "generator.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.BACKEND_NAME = "synthetic"
+    yield module
+    if module.MANIFEST is not None:
+        module.MANIFEST.close()
@@ -0,0 +1,101 @@
+"""extract.py name-key trie: Python equivalent of comment LIKE CONCAT(LOWER(REPLACE(Name, ' ', '_')), '%')."""
+import sqlite3
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+import extract  # noqa: E402
+
+
+CREATURES = [
+    (1, "Hogger"),
+    (2, "Hogger Jr"),
+    (3, "Defias Rogue"),
+    (4, "Van_Cleef"),
+    (5, None),
+    (6, "K"),
+]
+
+COMMENTS = [
+    "hogger SAY_AGGRO",
+    "HOGGER_JR yell",
+    "Hogger-Jr emote",
+    "defias rogue",
+    "Defias_Rogue SAY_1",
+    "defiasXrogue",
+    "vanXcleef",
+    "van_cleef",
+    "kobold",
+    "hog",
+    "",
+    None,
+]
+
+
+def like_matches(creatures, comment):
+    """Reference result from SQLite, whose LIKE is case-insensitive with '_' as a one-character wildcard."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE ct (Entry int, Name text)")
+    conn.executemany("INSERT INTO ct VALUES (?, ?)", creatures)
+    rows = conn.execute(
+        "SELECT Entry, Name FROM ct WHERE ? LIKE LOWER(REPLACE(Name, ' ', '_')) || '%'", (comment,)
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_matches_like_pattern_semantics():
+    trie = extract.build_name_key_trie(CREATURES)
+
+    for comment in COMMENTS:
+        assert Counter(extract.match_name_keys(trie, comment)) == Counter(like_matches(CREATURES, comment)), comment
+
+
+def test_underscore_in_key_is_a_single_character_wildcard():
+    trie = extract.build_name_key_trie(CREATURES)
+
+    assert extract.match_name_keys(trie, "Defias-Rogue") == [(3, "Defias Rogue")]
+    assert extract.match_name_keys(trie, "defias_rogue") == [(3, "Defias Rogue")]
+    assert extract.match_name_keys(trie, "defias  rogue") == []  # '_' is exactly one character
+
+
+def test_every_key_prefix_of_the_comment_matches():
+    trie = extract.build_name_key_trie(CREATURES)
+
+    assert extract.match_name_keys(trie, "Hogger Jr says hi") == [(1, "Hogger"), (2, "Hogger Jr")]
+    assert extract.match_name_keys(trie, "Hog") == []
+    assert extract.match_name_keys(trie, None) == []
+
+
+def test_scriptdev2_texts_emit_one_row_per_matching_creature():
+    class RowsCursor:
+        def __init__(self, *results):
+            self.results = list(results)
+
+        def execute(self, sql, params=None):
+            pass
+
+        def fetchall(self):
+            return self.results.pop(0)
+
+    cursor = RowsCursor(
+        [{"Entry": entry, "Name": name} for entry, name in CREATURES],
+        [
+            {"script_entry": -1, "text": "Grr!", "broadcast_text_id": 0, "comment": "hogger_jr SAY"},
+            {"script_entry": -2, "text": "Who?", "broadcast_text_id": 12, "comment": "nobody_here SAY"},
+        ],
+    )
+    npc_meta = {1: {"sex": 0}, 2: {"sex": 1}}
+
+    rows, seen = extract.collect_extractor(extract.extract_scriptdev2_texts, cursor, npc_meta, {})
+
+    assert [(r["npc_name"], r["sex"], r["text"]) for r in rows] == [
+        ("Hogger", 0, "Grr!"),
+        ("Hogger Jr", 1, "Grr!"),
+        ("Nobody Here", None, "Who?"),
+    ]
+    assert seen == {12}
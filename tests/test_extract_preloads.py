@@ -0,0 +1,106 @@
+"""extract.py tables preloaded once per run and joined in Python (load_shared_tables)."""
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+import extract  # noqa: E402
+
+
+class RowsCursor:
+    """Dictionary cursor that answers every query with the same rows and counts executes."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = 0
+
+    def execute(self, sql, params=None):
+        self.executed += 1
+
+    def fetchall(self):
+        return [dict(r) for r in self.rows]
+
+
+@pytest.fixture(autouse=True)
+def text_filter(monkeypatch):
+    text_filter = extract.TextFilter(extract.EXCLUDED_SUBSTRINGS)
+    monkeypatch.setattr(extract, "TEXT_FILTER", text_filter)
+    return text_filter
+
+
+def test_broadcast_text_prefers_clean_text_then_text1(text_filter):
+    cursor = RowsCursor([
+        {"Id": 1, "Text": "  Hello there ", "Text1": "Hi"},
+        {"Id": 2, "Text": "%s dies.", "Text1": "Fallen at last."},
+        {"Id": 3, "Text": None, "Text1": "Only female text"},
+        {"Id": 4, "Text": "%s dies.", "Text1": "%s flees in terror"},
+        {"Id": 5, "Text": "   ", "Text1": None},
+    ])
+
+    texts = extract.load_broadcast_text(cursor)
+
+    assert cursor.executed == 1
+    assert texts == {1: "Hello there", 2: "Fallen at last.", 3: "Only female text"}
+    # One hit per dropped row, credited to the first rule in list order
+    assert sum(text_filter.hits.values()) == 1
+    assert text_filter.hits["dies."] == 1
+
+
+def test_dbscripts_join_preloaded_broadcast_text():
+    npc_meta = {474: {"npc_name": "Defias Rogue", "sex": 0}}
+    preloaded = {"broadcast_text": {7: "Quest start yell"}, "page_text": extract.load_page_text(RowsCursor([]))}
+    cursor = RowsCursor([
+        {"creature_entry": 474, "buddy_entry": 0, "data_flags": 0, "search_radius": 0, "bt_id": 7, "comments": ""},
+        {"creature_entry": 474, "buddy_entry": 0, "data_flags": 0, "search_radius": 0, "bt_id": 8, "comments": ""},
+    ])
+
+    rows, seen = extract.collect_extractor(extract.extract_dbscripts_creature_death, cursor, npc_meta, preloaded)
+
+    # bt_id 8 has no usable text in the preload, so it is neither emitted nor seen
+    assert [(r["npc_name"], r["text"]) for r in rows] == [("Defias Rogue", "Quest start yell")]
+    assert seen == {7}
+
+
+def page_text_fixture():
+    return extract.load_page_text(RowsCursor([
+        {"entry": 1, "text": "Chapter one ", "next_page": 2},
+        {"entry": 2, "text": "%s dies.", "next_page": 3},
+        {"entry": 3, "text": "The end", "next_page": 0},
+        {"entry": 4, "text": "Preface", "next_page": 2},
+        {"entry": 10, "text": "Loop A", "next_page": 11},
+        {"entry": 11, "text": "Loop B", "next_page": 10},
+        {"entry": 20, "text": "Dangling", "next_page": 99},
+    ]))
+
+
+def test_page_chain_in_reading_order_skipping_unclean_pages():
+    page_text = page_text_fixture()
+
+    assert extract.resolve_page_chain(page_text, 1) == ["Chapter one", "The end"]
+    assert extract.resolve_page_chain(page_text, 20) == ["Dangling"]
+    assert extract.resolve_page_chain(page_text, 42) == []
+
+
+def test_page_chain_memoizes_every_suffix():
+    page_text = page_text_fixture()
+    book = extract.resolve_page_chain(page_text, 1)
+
+    assert set(page_text["chains"]) == {1, 2, 3}
+    assert extract.resolve_page_chain(page_text, 1) is book
+    # A second book sharing pages 2..3 reuses the memoized suffix instead of walking it
+    del page_text["pages"][3]
+    assert extract.resolve_page_chain(page_text, 4) == ["Preface", "The end"]
+
+
+def test_page_chain_cycle_stops_at_first_repeated_page(capsys):
+    page_text = page_text_fixture()
+
+    assert extract.resolve_page_chain(page_text, 10) == ["Loop A", "Loop B"]
+    assert "loops at page 10" in capsys.readouterr().out
+    assert 10 in page_text["cyclic"] and 10 not in page_text["chains"]
+
+    # Memoized: no second walk, no second warning
+    assert extract.resolve_page_chain(page_text, 10) == ["Loop A", "Loop B"]
+    assert capsys.readouterr().out == ""
+    assert extract.resolve_page_chain(page_text, 11) == ["Loop B", "Loop A"]
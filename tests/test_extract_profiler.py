@@ -0,0 +1,92 @@
+"""extract.py --profile: per-stage timings, row counts and query stats."""
+import json
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+import extract  # noqa: E402
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = extract.ExtractionProfiler(explain=True)
+    monkeypatch.setattr(extract, "PROFILER", profiler)
+    monkeypatch.setattr(extract, "TEXT_FILTER", extract.TextFilter(extract.EXCLUDED_SUBSTRINGS))
+    return profiler
+
+
+def extract_rows(snapshot, monkeypatch, jobs):
+    monkeypatch.setattr(extract, "SNAPSHOT_DB", snapshot)
+    db = extract.get_connection()
+    cursor = extract.open_cursor(db)
+    with extract.profile_stage("load_npc_metadata"):
+        npc_meta = extract.load_npc_metadata(cursor)
+    with extract.profile_stage("load_shared_tables"):
+        preloaded = extract.load_shared_tables(cursor)
+    rows = list(extract.iter_dialog_rows(cursor, npc_meta, preloaded, jobs))
+    db.close()
+    return rows
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_every_stage_has_its_queries_and_rows(profiler, world_snapshot, monkeypatch, jobs):
+    rows = extract_rows(world_snapshot, monkeypatch, jobs)
+    stages = profiler.stages
+
+    assert "(unstaged)" not in stages
+    for extractor in extract.EXTRACTORS:
+        assert stages[extractor.__name__]["queries"] >= 1, extractor.__name__
+        assert stages[extractor.__name__]["wall_seconds"] > 0
+    assert stages["load_shared_tables"]["queries"] == 2
+    assert sum(st["rows_emitted"] for st in stages.values()) == len(rows)
+    assert sum(st["queries"] for st in stages.values()) == len(profiler.queries)
+    # broadcast_text 3 ("%s dies.") falls back to Text1 and isn't dropped; nothing else in the world is unclean
+    assert sum(st["rows_dropped_unclean"] for st in stages.values()) == 0
+
+
+def test_plans_and_report(profiler, world_snapshot, monkeypatch, tmp_path):
+    extract_rows(world_snapshot, monkeypatch, jobs=1)
+    path = tmp_path / "profile.json"
+    profiler.write_report(str(path))
+
+    report = json.loads(path.read_text())
+    assert set(report) == {"total_seconds", "stages", "queries", "plans", "text_filter_hits"}
+    assert len(report["plans"]) == len({q["sql"] for q in report["queries"]})
+    assert all("error" not in plan[0] for plan in report["plans"].values())
+    seconds = [q["seconds"] for q in report["queries"]]
+    assert seconds == sorted(seconds, reverse=True)
+
+
+def test_dropped_rows_are_attributed_to_the_active_stage(profiler):
+    with extract.profile_stage("extract_quest_greetings"):
+        assert not extract.is_clean_text("%s goes into a frenzy")
+        assert not extract.is_clean_text("%s goes into a frenzy", count=False)
+    assert extract.is_clean_text("Hello")
+
+    assert profiler.stages["extract_quest_greetings"]["rows_dropped_unclean"] == 1
+    assert "(unstaged)" not in profiler.stages
+
+
+def test_cache_hits_are_counted_instead_of_profiled(profiler, tmp_path):
+    class Cursor:
+        def execute(self, sql, params=None):
+            self.sql = sql
+
+        def fetchall(self):
+            if self.sql.startswith("CHECKSUM"):
+                return [{"Table": "world.page_text", "Checksum": 7}]
+            return [{"entry": 1, "text": "Page", "next_page": 0}]
+
+    cache = extract.QueryCache(str(tmp_path))
+    for _ in range(3):
+        cursor = cache.wrap(profiler.wrap(Cursor()))
+        with extract.profile_stage("load_shared_tables"):
+            cursor.execute("SELECT entry, text, next_page FROM page_text")
+            cursor.fetchall()
+
+    stats = profiler.stages["load_shared_tables"]
+    # First run: CHECKSUM TABLE + the SELECT reach the database; then two cache hits
+    assert (stats["queries"], stats["query_cache_hits"], stats["rows_fetched"]) == (2, 2, 2)
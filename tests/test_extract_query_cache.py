@@ -0,0 +1,60 @@
+"""extract.py QueryCache shared by --jobs threads."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+import extract  # noqa: E402
+
+
+class ChecksumCursor:
+    """Answers CHECKSUM TABLE (slowly, to widen races) and SELECTs with one row."""
+
+    checksum_calls = []
+    lock = threading.Lock()
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+        if sql.startswith("CHECKSUM TABLE"):
+            with self.lock:
+                self.checksum_calls.append(sql)
+            time.sleep(0.01)
+
+    def fetchall(self):
+        if self.sql.startswith("CHECKSUM TABLE"):
+            return [{"Table": f"world.{t.strip('` ')}", "Checksum": 1} for t in self.sql[15:].split(",")]
+        return [{"sql": self.sql}]
+
+    def close(self):
+        pass
+
+
+def test_hits_misses_and_checksums_under_threads(tmp_path):
+    ChecksumCursor.checksum_calls = []
+    cache = extract.QueryCache(str(tmp_path))
+    queries = [f"SELECT {i} FROM page_text JOIN item_template" for i in range(8)]
+
+    def run(sql):
+        cursor = cache.wrap(ChecksumCursor())
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        first = list(executor.map(run, queries * 4))
+
+    # Every execute is counted exactly once; each table is checksummed once per run
+    assert cache.hits + cache.misses == len(queries) * 4
+    assert cache.misses >= len(queries)
+    assert ChecksumCursor.checksum_calls == ["CHECKSUM TABLE `item_template`, `page_text`"]
+    assert first == [[{"sql": sql}] for sql in queries * 4]
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".msgpack"] * len(queries)
+
+    warm = extract.QueryCache(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda sql: warm.wrap(ChecksumCursor()).execute(sql), queries))
+    assert (warm.hits, warm.misses) == (len(queries), 0)
@@ -0,0 +1,96 @@
+"""Round trip of extract.py's SQLite snapshot: export_snapshot → SnapshotConnection."""
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import extract  # noqa: E402
+
+
+TABLES = {
+    "creature_template": {
+        "columns": [("Entry", "int"), ("Name", "varchar"), ("GossipMenuId", "mediumint"), ("Scale", "decimal")],
+        "rows": [(1, "Marshal Dughan", 10, Decimal("1")), (2, "Innkeeper Farley", None, Decimal("1.5"))],
+    },
+    "page_text": {
+        "columns": [("entry", "int"), ("text", "longtext"), ("next_page", "int"), ("raw", "blob")],
+        "rows": [(7, "It was a dark and stormy night.", 0, bytearray(b"\x00\x01"))],
+    },
+}
+
+
+class FakeMySQLCursor:
+    """Tuple cursor answering the information_schema and SELECT queries export_snapshot sends."""
+
+    def __init__(self):
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        if "information_schema.COLUMNS" in sql:
+            table = TABLES.get(params[1])
+            self.rows = list(table["columns"]) if table else []
+        else:
+            table = sql.rsplit("FROM", 1)[1].strip().strip("`")
+            self.rows = list(TABLES[table]["rows"])
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeMySQLConnection:
+    def cursor(self):
+        return FakeMySQLCursor()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract.mysql.connector, "connect", lambda **_: FakeMySQLConnection())
+    path = str(tmp_path / "world.sqlite")
+    tables = {"creature_template": ["Entry", "GossipMenuId"], "page_text": ["entry"], "gameobject": ["guid"]}
+    extract.export_snapshot(path, tables=tables, batch_size=1)
+    return path
+
+
+def test_round_trip_rows_as_dicts(snapshot):
+    cursor = extract.SnapshotConnection(snapshot).cursor(dictionary=True)
+    cursor.execute("SELECT Entry, Name, GossipMenuId, Scale FROM creature_template WHERE Entry = %s", (2,))
+    assert cursor.fetchall() == [{"Entry": 2, "Name": "Innkeeper Farley", "GossipMenuId": None, "Scale": 1.5}]
+
+    cursor.execute("SELECT text, raw FROM page_text")
+    assert cursor.fetchall() == [{"text": "It was a dark and stormy night.", "raw": b"\x00\x01"}]
+
+
+def test_mysql_functions_and_indexes(snapshot):
+    cursor = extract.SnapshotConnection(snapshot).cursor()
+    cursor.execute("SELECT FLOOR(Entry / 2) AS half, MOD(Entry, 2) AS odd FROM creature_template ORDER BY Entry")
+    assert cursor.fetchall() == [{"half": 0, "odd": 1}, {"half": 1, "odd": 0}]
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' ORDER BY name")
+    assert [r["name"] for r in cursor.fetchall()] == [
+        "idx_creature_template_Entry",
+        "idx_creature_template_GossipMenuId",
+        "idx_page_text_entry",
+    ]
+
+
+def test_missing_snapshot_and_no_temp_left(snapshot, tmp_path):
+    assert not os.path.exists(snapshot + ".tmp")
+    with pytest.raises(FileNotFoundError):
+        extract.SnapshotConnection(str(tmp_path / "missing.sqlite"))
@@ -0,0 +1,42 @@
+"""extract.py staged outputs: nothing half-written is left behind when extraction fails."""
+import os
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+import extract  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, world_snapshot, monkeypatch):
+    """scripts/ cwd next to a data/ dir, like the repo layout, extracting from world_snapshot."""
+    (tmp_path / "data").mkdir()
+    (tmp_path / "scripts").mkdir()
+    monkeypatch.chdir(tmp_path / "scripts")
+    monkeypatch.setattr(extract, "SNAPSHOT_DB", world_snapshot)
+    monkeypatch.setattr(extract, "STAGED_OUTPUT_CSV", str(tmp_path / "data" / "all_npc_dialog.csv.tmp"))
+    return tmp_path / "data"
+
+
+def test_success_leaves_only_the_staged_csv(workdir):
+    known_count, _ = extract.extract_all_dialog()
+
+    assert known_count > 0
+    assert sorted(os.listdir(workdir)) == ["all_npc_dialog.csv.tmp", "unknown_dialog_investigation.csv"]
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_failing_extractor_removes_staged_csvs(workdir, monkeypatch, jobs):
+    def extract_broken(cursor, npc_meta, preloaded):
+        yield {"npc_name": "Unknown", "sex": None, "dialog_type": "gossip", "quest_id": None, "text": "Half"}
+        raise RuntimeError("lost connection")
+
+    monkeypatch.setattr(extract, "EXTRACTORS", extract.EXTRACTORS[:2] + [extract_broken])
+
+    with pytest.raises(RuntimeError, match="lost connection"):
+        extract.extract_all_dialog(jobs=jobs)
+
+    assert os.listdir(workdir) == []
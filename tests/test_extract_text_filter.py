@@ -0,0 +1,78 @@
+"""extract.py TextFilter: the compiled blocklist behind is_clean_text."""
+import threading
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("msgpack")
+pytest.importorskip("yaml")
+
+import extract  # noqa: E402
+
+
+TEXTS = [
+    None, "", "   ", "Hello there", "%s dies.", "%S GOES INTO A FRENZY", "Stop! (Begins To Cast)",
+    "%s", "100%s", "The %s  rogue", "Nothing to see", "reuse me", "Die.", "dies", "He is possessed by rage",
+    "regex chars .*+?()[]{}|^$\\", "Ünïcode is enraged",
+]
+
+
+def substring_is_clean(text):
+    """is_clean_text as it was before TextFilter: one case-insensitive substring test per rule."""
+    if text is None or not text.strip():
+        return False
+    return not any(rule.lower() in text.strip().lower() for rule in extract.EXCLUDED_SUBSTRINGS)
+
+
+@pytest.fixture
+def text_filter(monkeypatch):
+    text_filter = extract.TextFilter(extract.EXCLUDED_SUBSTRINGS)
+    monkeypatch.setattr(extract, "TEXT_FILTER", text_filter)
+    return text_filter
+
+
+def test_matches_substring_loop(text_filter):
+    for text in TEXTS:
+        assert extract.is_clean_text(text) == substring_is_clean(text), text
+
+
+def test_hits_credit_first_rule_in_list_order(text_filter):
+    # "%s dies." contains both "dies." and "%s "; "dies." comes first in EXCLUDED_SUBSTRINGS
+    assert text_filter.blocking_rule("%s dies.") == "dies."
+    assert text_filter.blocking_rule("%s is enraged") == "is enraged"
+    assert text_filter.blocking_rule("fine", count=False) is None
+    assert text_filter.blocking_rule("%s is possessed", count=False) == "is possessed"
+
+    assert dict(text_filter.hits) == {"dies.": 1, "is enraged": 1}
+
+
+def test_add_rules_recompiles_and_ignores_case_duplicates():
+    text_filter = extract.TextFilter()
+    assert text_filter.blocking_rule("anything") is None
+
+    text_filter.add_rules(["Foo.Bar", "foo.bar", "[x]"])
+    assert text_filter.rules == ["Foo.Bar", "[x]"]
+    assert text_filter.blocking_rule("say FOO.BAR now") == "Foo.Bar"
+    assert text_filter.blocking_rule("fooXbar") is None  # rules are literal, not regexes
+    assert text_filter.blocking_rule("[X] marks") == "[x]"
+
+
+def test_count_filtered_counts_a_row_once(text_filter):
+    extract.count_filtered("%s dies.", "%s flees in terror")
+    extract.count_filtered(None, "  ", "Clean")
+
+    assert dict(text_filter.hits) == {"dies.": 1}
+
+
+def test_hits_are_exact_under_threads(text_filter):
+    def block():
+        for _ in range(2000):
+            extract.is_clean_text("%s becomes enraged")
+
+    threads = [threading.Thread(target=block) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert text_filter.hits["becomes enraged"] == 8 * 2000
@@ -0,0 +1,255 @@
+"""generator.py on the synthetic backend: chunk cache, manifest, dedupe and backend selection."""
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+
+def dialog(*rows):
+    """(npc_name, dialog_type, text[, quest_id]) tuples → a dialog DataFrame like build_dialog_dataframe's."""
+    return pd.DataFrame(
+        [{"npc_name": r[0], "dialog_type": r[1], "text": r[2], "quest_id": r[3] if len(r) > 3 else None} for r in rows]
+    )
+
+
+def plan_and_run(generator, df, **kwargs):
+    plan, missing, skipped, links = generator.plan_jobs(df, output_dir="../sounds", **kwargs)
+    for source, target in links:
+        generator.link_file(source, target)
+        generator.manifest_link(source, target)
+    generator.run_plan(plan, writers=2, regenerate=kwargs.get("regenerate", False))
+    return plan, missing, skipped, links
+
+
+# =========================
+# BACKEND SELECTION
+# =========================
+
+def test_backend_selection(generator):
+    backend = generator.get_backend()
+    assert isinstance(backend, generator.SyntheticBackend)
+    assert generator.get_backend() is backend
+    assert generator.manifest_db_path() == "../cache/generation_manifest.synthetic.sqlite"
+    assert generator.parse_args(["--backend", "synthetic"]).backend == "synthetic"
+    with pytest.raises(SystemExit):
+        generator.parse_args(["--backend", "espeak"])
+
+    # Constructing (and versioning) the real backend must not need torch or the model
+    chatterbox = generator.BACKENDS["chatterbox"](device="cpu", quantize=True)
+    assert chatterbox.model is None
+    assert chatterbox.version().endswith("-int8")
+    with pytest.raises(ValueError):
+        generator.BACKENDS["chatterbox"](device="cuda", quantize=True)
+
+
+def test_synthetic_backend_is_deterministic_per_voice(generator):
+    backend = generator.load_backend()
+    backend.prepare_voice("human_male")
+    first, = backend.synthesize_batch(["Well met, traveler."])
+    again, = backend.synthesize_batch(["Well met, traveler."])
+    backend.prepare_voice("night_elf_female")
+    other, = backend.synthesize_batch(["Well met, traveler."])
+
+    assert len(first) == round(len("Well met, traveler.") * backend.sample_rate / generator.SYNTHETIC_CHARS_PER_SECOND)
+    assert np.array_equal(first, again)
+    assert not np.array_equal(first, other)
+
+
+# =========================
+# CHUNK CACHE
+# =========================
+
+def test_chunk_cache_hits_after_first_run(generator):
+    df = dialog(("Marshal Dughan", "gossip", "Stay out of trouble."), ("Aayndia Floralwind", "gossip", "Ishnu-alah."))
+    plan_and_run(generator, df)
+    assert generator.CHUNK_CACHE_STATS["misses"] == 2
+    assert generator.CHUNK_CACHE_STATS["hits"] == 0
+
+    plan_and_run(generator, df)   # up to date: nothing planned, nothing looked up
+    assert generator.CHUNK_CACHE_STATS["hits"] == 0
+
+    # Another NPC with the same narrator and line (but a different file) is served from the cache
+    plan_and_run(generator, dialog(("Guard Thomas", "quest_accept", "Stay out of trouble.", 12)))
+    assert generator.CHUNK_CACHE_STATS["hits"] == 1
+    assert generator.get_backend().synth_seconds > 0
+
+
+def test_chunk_cache_evicts_least_recently_used_by_mtime(generator):
+    pcm = np.zeros(100, dtype=np.int16)   # 200 bytes per entry
+    generator.CHUNK_CACHE_MAX_BYTES = 3 * pcm.nbytes
+    for n, key in enumerate(["aa01", "bb02", "cc03"]):
+        generator.chunk_cache_put(key, pcm)
+        os.utime(generator.chunk_cache_path(key), ns=(10 ** 18 + n, 10 ** 18 + n))
+
+    # A new process rescans the directory and orders entries by mtime: aa01 is oldest
+    os.utime(generator.chunk_cache_path("aa01"), ns=(10 ** 18 + 5, 10 ** 18 + 5))
+    generator.CHUNK_CACHE_INDEX = None
+    assert list(generator.load_chunk_cache_index()) == ["bb02", "cc03", "aa01"]
+    assert generator.CHUNK_CACHE_BYTES == 3 * pcm.nbytes
+
+    assert generator.chunk_cache_get("bb02") is not None   # refreshes bb02
+    generator.chunk_cache_put("dd04", pcm)
+
+    assert not os.path.exists(generator.chunk_cache_path("cc03"))
+    assert list(generator.CHUNK_CACHE_INDEX) == ["aa01", "bb02", "dd04"]
+    assert generator.CHUNK_CACHE_STATS["evictions"] == 1
+    assert generator.chunk_cache_get("cc03") is None
+
+
+def test_chunk_cache_disabled(generator):
+    generator.CHUNK_CACHE_ENABLED = False
+    generator.chunk_cache_put("aa01", np.zeros(10, dtype=np.int16))
+    assert generator.chunk_cache_get("aa01") is None
+    assert not os.path.exists(generator.CHUNK_CACHE_DIR)
+
+
+# =========================
+# MANIFEST
+# =========================
+
+def test_done_manifest_row_skips_job(generator):
+    df = dialog(("Marshal Dughan", "quest_accept", "Find the gnolls.", 11))
+    plan, _, skipped, _ = plan_and_run(generator, df)
+    filepath = plan["human_male"][0]["filepath"]
+    assert skipped == 0
+    assert generator.load_manifest()[filepath][0] == "done"
+
+    # Done with the same inputs: skipped, even with the wav gone (the manifest is the source of truth)
+    os.remove(filepath)
+    plan, _, skipped, _ = generator.plan_jobs(df, output_dir="../sounds")
+    assert (dict(plan), skipped) == ({}, 1)
+
+
+def test_changed_inputs_replan_job(generator, capsys):
+    plan_and_run(generator, dialog(("Marshal Dughan", "quest_accept", "Find the gnolls.", 11)))
+
+    # Same output path (quest 11), new text
+    plan, _, skipped, _ = generator.plan_jobs(
+        dialog(("Marshal Dughan", "quest_accept", "Find the gnolls. Quickly!", 11)), output_dir="../sounds"
+    )
+    assert skipped == 0
+    assert [job["chunks"] for job in plan["human_male"]] == [["Find the gnolls. Quickly!"]]
+    assert "1 files have changed text, voice or model" in capsys.readouterr().out
+
+    # New narrator sample: the sample hash is part of the inputs
+    with open("../samples/human_male.wav", "ab") as f:
+        f.write(b"\0\0")
+    plan, _, skipped, _ = generator.plan_jobs(
+        dialog(("Marshal Dughan", "quest_accept", "Find the gnolls.", 11)), output_dir="../sounds"
+    )
+    assert skipped == 0 and len(plan["human_male"]) == 1
+
+
+def test_samples_hashed_once_per_narrator_per_plan(generator, monkeypatch):
+    hashed = []
+    file_sha256 = generator.file_sha256
+    monkeypatch.setattr(generator, "file_sha256", lambda path: hashed.append(path) or file_sha256(path))
+
+    df = dialog(*[("Marshal Dughan", "quest_accept", f"Line {n}.", n) for n in range(1, 20)],
+                ("Aayndia Floralwind", "gossip", "Ishnu-alah."))
+    plan, _, _, _ = generator.plan_jobs(df, output_dir="../sounds")
+
+    assert sorted(hashed) == ["../samples/human_male.wav", "../samples/night_elf_female.wav"]
+    assert len(plan["human_male"]) == 19
+
+
+def test_in_progress_row_is_replanned(generator):
+    df = dialog(("Marshal Dughan", "quest_accept", "Find the gnolls.", 11))
+    plan, _, _, _ = generator.plan_jobs(df, output_dir="../sounds")
+    job = plan["human_male"][0]
+    generator.manifest_start(job["filepath"], job["inputs"], len(job["chunks"]))
+
+    plan, _, skipped, _ = generator.plan_jobs(df, output_dir="../sounds")
+    assert skipped == 0 and len(plan["human_male"]) == 1
+
+
+# =========================
+# DEDUPE
+# =========================
+
+def test_identical_lines_become_one_job_plus_links(generator):
+    df = dialog(
+        ("Marshal Dughan", "quest_accept", "Welcome to  Goldshire.", 11),
+        ("Guard Thomas", "quest_accept", "Welcome to Goldshire.", 12),   # same narrator, same normalized text
+        ("Aayndia Floralwind", "quest_accept", "Welcome to Goldshire.", 13),   # different narrator
+        ("Nobody", "gossip", "Who am I?"),
+    )
+    plan, missing, skipped, links = plan_and_run(generator, df)
+
+    assert missing == [{"npc_name": "Nobody", "dialog_type": "gossip"}]
+    assert (skipped, links) == (0, [])
+    assert sum(len(jobs) for jobs in plan.values()) == 2
+    job = plan["human_male"][0]
+    alias, = job["aliases"]
+    assert os.path.samefile(job["filepath"], alias)
+    assert generator.load_manifest()[alias][0] == "done"
+    assert generator.CHUNK_CACHE_STATS["misses"] == 2
+
+    # Canonical file exists: a new alias is linked without any synthesis
+    df = pd.concat([df, dialog(("Guard Thomas", "quest_complete", "Welcome to Goldshire.", 12))])
+    plan, _, skipped, links = generator.plan_jobs(df, output_dir="../sounds")
+    assert dict(plan) == {}
+    assert skipped == 3
+    assert links == [(job["filepath"], "../sounds/human_male/guard_thomas/12_quest_complete.wav")]
+
+
+def test_batched_generation_matches_job_by_job(generator):
+    df = dialog(
+        ("Marshal Dughan", "quest_accept", "Find the gnolls.", 11),
+        ("Marshal Dughan", "quest_complete", "Well done. " * 40, 11),
+        ("Aayndia Floralwind", "gossip", "Ishnu-alah."),
+    )
+    plan, _, _, _ = generator.plan_jobs(df, output_dir="../sounds")
+    generator.run_plan(plan)
+    expected = {job["filepath"]: open(job["filepath"], "rb").read() for jobs in plan.values() for job in jobs}
+
+    generator.generate_batched(plan, batch_size=4, regenerate=True)
+
+    assert {path: open(path, "rb").read() for path in expected} == expected
+
+
+# =========================
+# CHECKPOINTS
+# =========================
+
+@pytest.mark.parametrize("runner", ["run_plan", "generate_batched"])
+def test_interrupted_file_resumes_from_checkpoints(generator, monkeypatch, runner):
+    generator.CHUNK_CACHE_ENABLED = False   # only the checkpoints can supply audio
+    book = " ".join(f"Page {n} of the tale of the gnolls of Elwynn Forest." for n in range(30))
+    df = dialog(("Marshal Dughan", "quest_accept", book, 11))
+    run = getattr(generator, runner)
+
+    backend = generator.load_backend()
+    synthesized = []
+    synthesize_batch = backend.synthesize_batch
+    monkeypatch.setattr(backend, "synthesize_batch", lambda texts: synthesized.extend(texts) or synthesize_batch(texts))
+    write_wav = generator.write_wav
+
+    def failing_write_wav(filepath, pcm_chunks):
+        raise OSError("disk full")
+
+    # First run: every chunk is synthesized and checkpointed, then the writer fails
+    plan, _, _, _ = generator.plan_jobs(df, output_dir="../sounds")
+    job, = plan["human_male"]
+    assert len(job["chunks"]) >= generator.CHECKPOINT_MIN_CHUNKS
+    monkeypatch.setattr(generator, "write_wav", failing_write_wav)
+    with pytest.raises(OSError):
+        run(plan)
+    assert len(synthesized) == len(job["chunks"])
+    assert len(os.listdir(generator.checkpoint_dir(job["filepath"]))) == len(job["chunks"])
+    assert not os.path.exists(job["filepath"])
+
+    # Second run: the file is re-planned and rebuilt from its checkpoints without synthesis
+    monkeypatch.setattr(generator, "write_wav", write_wav)
+    plan, _, _, _ = generator.plan_jobs(df, output_dir="../sounds")
+    assert generator.checkpoint_resumable(plan) == 1
+    synthesized.clear()
+    run(plan)
+
+    assert synthesized == []
+    assert generator.TELEMETRY.totals["resumed_chunks"] == len(job["chunks"])
+    assert generator.load_manifest()[job["filepath"]][0] == "done"
+    assert os.path.exists(job["filepath"])
+    assert not os.path.exists(generator.checkpoint_dir(job["filepath"]))
@@ -0,0 +1,138 @@
+"""generator.py --serve daemon and its thin client, on the synthetic backend."""
+import json
+import socket
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("pandas")
+
+
+DIALOG_CSV = """npc_name,sex,dialog_type,quest_id,text
+Marshal Dughan,male,quest_accept,11,Find the gnolls.
+Marshal Dughan,male,quest_complete,11,Well done.
+Aayndia Floralwind,female,gossip,,Ishnu-alah.
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def client_args(generator, **overrides):
+    args = generator.parse_args([])
+    for name, value in overrides.items():
+        setattr(args, name, value)
+    return args
+
+
+@pytest.fixture
+def daemon(generator):
+    with open(generator.NPC_DIALOG_CSV_PATH, "w", encoding="utf-8") as f:
+        f.write(DIALOG_CSV)
+    return generator.GenerationDaemon(output_dir="../sounds", writers=1)
+
+
+@pytest.fixture
+def serve_app(generator):
+    """Run create_daemon_app(daemon) with uvicorn on a free port; yields that port."""
+    uvicorn = pytest.importorskip("uvicorn")
+    pytest.importorskip("fastapi")
+    servers = []
+
+    def start(daemon):
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(generator.create_daemon_app(daemon), host="127.0.0.1",
+                                               port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        servers.append(server)
+        while not server.started:
+            time.sleep(0.01)
+        return port
+
+    yield start
+    for server in servers:
+        server.should_exit = True
+
+
+def test_job_runs_to_done_with_progress(generator, daemon, serve_app, capsys):
+    threading.Thread(target=daemon.run_forever, daemon=True).start()
+    port = serve_app(daemon)
+
+    assert generator.submit_to_daemon(client_args(generator), port) == 0
+
+    job, = daemon.jobs.values()
+    assert (job["status"], job["planned"], job["done"]) == ("done", 3, 3)
+    assert "[done] 3/3 files" in capsys.readouterr().out
+
+
+def test_failed_job_reports_error(generator, daemon, serve_app, capsys):
+    threading.Thread(target=daemon.run_forever, daemon=True).start()
+    port = serve_app(daemon)
+
+    assert generator.submit_to_daemon(client_args(generator, narrator="murloc"), port) == 1
+    assert "[ERROR] Narrator 'murloc' not found" in capsys.readouterr().out
+
+
+def test_event_stream_ends_with_gone_when_job_is_trimmed(generator, daemon, serve_app, monkeypatch):
+    monkeypatch.setattr(generator, "DAEMON_HISTORY", 0)
+    port = serve_app(daemon)   # no worker: jobs stay queued until the test moves them
+    job, _ = daemon.submit({"npc": "Marshal Dughan"})
+
+    with urllib.request.urlopen(generator.daemon_url(f"/jobs/{job['id']}/events", port), timeout=5) as events:
+        assert json.loads(events.readline())["status"] == "queued"
+        daemon.update(daemon.jobs[job["id"]], status="done")
+        daemon.submit({"npc": "Guard Thomas"})   # trims the finished job from the history
+        assert json.loads(events.readline()) == {"id": job["id"], "status": "gone"}
+        assert events.readline() == b""
+
+
+def test_event_stream_heartbeat(generator, daemon, serve_app, monkeypatch):
+    monkeypatch.setattr(generator, "DAEMON_HEARTBEAT_SECONDS", 0)
+    port = serve_app(daemon)
+    job, _ = daemon.submit({"npc": "Marshal Dughan"})
+
+    with urllib.request.urlopen(generator.daemon_url(f"/jobs/{job['id']}/events", port), timeout=5) as events:
+        assert [json.loads(events.readline())["status"] for _ in range(3)] == ["queued"] * 3
+
+
+class StallingDaemon(BaseHTTPRequestHandler):
+    """Accepts every job, then never sends an event."""
+
+    def do_POST(self):
+        body = json.dumps({"id": "1-abc", "status": "queued", "done": 0, "planned": 0, "deduped": False}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        time.sleep(2)
+
+    def log_message(self, *_):
+        pass
+
+
+def test_client_times_out_on_a_stalled_event_stream(generator, monkeypatch, capsys):
+    monkeypatch.setattr(generator, "DAEMON_EVENT_TIMEOUT", 0.2)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingDaemon)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        started = time.time()
+        assert generator.submit_to_daemon(client_args(generator), server.server_address[1]) == 1
+        assert time.time() - started < 1.5
+    finally:
+        server.shutdown()
+    assert "Lost the generator daemon while following job 1-abc" in capsys.readouterr().out
+
+
+def test_client_runs_locally_when_the_daemon_does_not_take_the_job(generator, capsys):
+    assert generator.submit_to_daemon(client_args(generator), free_port()) is None
+    assert "generating in this process" in capsys.readouterr().out
@@ -0,0 +1,98 @@
+"""generator.py --shard / --workers: partitioning the plan across processes."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+
+SHARDS = 4
+
+
+@pytest.fixture
+def dialog_df():
+    rows = []
+    for n in range(1, 41):
+        rows.append({"npc_name": "Marshal Dughan", "dialog_type": "quest_accept", "text": f"Quest line {n}.", "quest_id": n})
+        # Every third line is also said by a second NPC with the same voice: an alias of the first
+        if n % 3 == 0:
+            rows.append({"npc_name": "Guard Thomas", "dialog_type": "quest_accept", "text": f"Quest line {n}.", "quest_id": n})
+        rows.append({"npc_name": "Aayndia Floralwind", "dialog_type": "gossip", "text": f"Gossip {n}.", "quest_id": None})
+    rows.append({"npc_name": "Nobody", "dialog_type": "gossip", "text": "Who am I?", "quest_id": None})
+    return pd.DataFrame(rows)
+
+
+def planned_paths(plan):
+    return [path for jobs in plan.values() for job in jobs for path in (job["filepath"], *job["aliases"])]
+
+
+def test_shards_cover_plan_exactly_once(generator, dialog_df):
+    full, missing, _, _ = generator.plan_jobs(dialog_df, output_dir="../sounds")
+
+    per_shard = [generator.plan_jobs(dialog_df, output_dir="../sounds", shard=(i, SHARDS)) for i in range(SHARDS)]
+    paths = [path for plan, _, _, _ in per_shard for path in planned_paths(plan)]
+
+    assert sorted(paths) == sorted(planned_paths(full))
+    assert len(paths) == len(set(paths))
+    assert all(plan for plan, _, _, _ in per_shard)   # 80 canonical jobs spread over every shard
+    assert sum(len(m) for _, m, _, _ in per_shard) == len(missing)
+
+
+def test_aliases_and_links_stay_with_their_source(generator, dialog_df):
+    full, _, _, _ = generator.plan_jobs(dialog_df, output_dir="../sounds")
+    jobs = {job["filepath"]: job for jobs in full.values() for job in jobs}
+    for index in range(SHARDS):
+        plan, _, _, _ = generator.plan_jobs(dialog_df, output_dir="../sounds", shard=(index, SHARDS))
+        for job in (job for jobs in plan.values() for job in jobs):
+            assert generator.in_shard(job["filepath"], (index, SHARDS))
+            assert job["aliases"] == jobs[job["filepath"]]["aliases"]
+
+    # Once the canonical wavs exist, the other NPCs' copies become links, sharded by their source
+    generator.run_plan(generator.plan_jobs(dialog_df[dialog_df["npc_name"] != "Guard Thomas"], output_dir="../sounds")[0])
+
+    _, _, _, all_links = generator.plan_jobs(dialog_df, output_dir="../sounds")
+    assert len(all_links) == 13
+    shard_links = [generator.plan_jobs(dialog_df, output_dir="../sounds", shard=(i, SHARDS))[3] for i in range(SHARDS)]
+    assert sorted(link for links in shard_links for link in links) == sorted(all_links)
+    for index, links in enumerate(shard_links):
+        assert all(generator.in_shard(source, (index, SHARDS)) for source, _ in links)
+
+
+def test_shard_children_drop_parent_only_options(generator, monkeypatch):
+    launched = []
+
+    class FakeProcess:
+        pid = 0
+
+        def __init__(self, args, **_):
+            launched.append(args)
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr(generator.subprocess, "Popen", FakeProcess)
+    argv = ["--backend", "synthetic", "--workers", "2", "--quantize", "--quantize-check=4",
+            "--torch-threads", "8", "--progress", "--limit", "10"]
+
+    assert generator.launch_shards(2, argv) == 0
+
+    assert len(launched) == 2
+    for index, args in enumerate(launched):
+        assert args[2:] == ["--backend", "synthetic", "--quantize", "--limit", "10",
+                            "--shard", f"{index}/2", "--torch-threads", str(max(1, (os.cpu_count() or 1) // 2)),
+                            "--interop-threads", "1"]
+
+
+@pytest.mark.parametrize("extra", [["--merge-shards", "2"], ["--shard", "0/2"], ["--plan"]])
+def test_workers_rejects_conflicting_options(generator, extra):
+    result = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(generator.__file__), "generator.py"),
+         "--backend", "synthetic", "--workers", "2", *extra],
+        capture_output=True, text=True,
+    )
+
+    assert result.returncode == 1
+    assert "--workers can't be combined" in result.stdout
+    assert not os.path.exists(generator.SHARD_LOG_DIR)
@@ -0,0 +1,77 @@
+"""generator.py GenerationTelemetry: stage histograms, run totals and textfile flushing."""
+import json
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("pandas")
+
+
+@pytest.fixture
+def telemetry(generator, tmp_path):
+    telemetry = generator.GenerationTelemetry()
+    telemetry.json_path = str(tmp_path / "logs" / "telemetry.json")
+    telemetry.prometheus_path = str(tmp_path / "metrics" / "generator.prom")
+    return telemetry
+
+
+def test_histograms_and_run_totals(generator, telemetry):
+    telemetry.begin_run({"human_male": [{"chunks": ["a" * 60, "b" * 40]}, {"chunks": ["c" * 100]}]})
+    telemetry.observe("synthesize", 0.02, "human_male", 60)
+    telemetry.observe("synthesize", 200, "human_male", 40)
+    telemetry.file_done(["a" * 60, "b" * 40], 6.5)
+
+    assert telemetry.run_totals() == {"files": 1, "chunks": 2, "chars": 100, "audio_seconds": 6.5}
+    hist = telemetry.by_narrator[("synthesize", "human_male")]
+    assert (hist["count"], hist["sum"]) == (2, 200.02)
+    assert hist["buckets"][generator.TELEMETRY_LATENCY_BUCKETS.index(0.05)] == 1
+    assert sum(hist["buckets"]) == 1   # 200 s is past the last bucket, only in +Inf
+    assert set(telemetry.by_length) == {("synthesize", "50-99"), ("synthesize", "0-49")}
+
+
+def test_periodic_flush_waits_for_the_interval(generator, telemetry, monkeypatch):
+    writes = []
+    monkeypatch.setattr(telemetry, "write_prometheus", writes.append)
+
+    telemetry.flush(final=False)
+    telemetry.flush(final=False)
+    assert len(writes) == 1
+
+    telemetry.flush()   # the final flush always writes, and adds the JSON report
+    assert len(writes) == 2
+    assert os.path.exists(telemetry.json_path)
+
+
+def test_periodic_flush_skips_while_another_thread_flushes(generator, telemetry, monkeypatch):
+    monkeypatch.setattr(generator, "TELEMETRY_FLUSH_SECONDS", 0)
+    with telemetry.flush_lock:
+        telemetry.flush(final=False)   # returns instead of waiting for the lock
+    assert not os.path.exists(telemetry.prometheus_path)
+
+
+def test_concurrent_writers_flush_safely(generator, telemetry, monkeypatch):
+    monkeypatch.setattr(generator, "TELEMETRY_FLUSH_SECONDS", 0)
+    telemetry.begin_run({"human_male": [{"chunks": ["x" * 10]}] * 400})
+
+    def writer():
+        for _ in range(50):
+            telemetry.observe("write", 0.003, "human_male", 10)
+            telemetry.file_done(["x" * 10], 1.0)
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    telemetry.flush()
+
+    assert telemetry.run_totals()["files"] == 400
+    prom_dir = os.path.dirname(telemetry.prometheus_path)
+    assert os.listdir(prom_dir) == ["generator.prom"]   # no temp files left behind
+    with open(telemetry.prometheus_path, encoding="utf-8") as f:
+        metrics = f.read()
+    assert f"{generator.TELEMETRY_METRIC_PREFIX}_files_done 400\n" in metrics
+    assert 'betterquest_generator_stage_seconds_count{stage="write",narrator="human_male"} 400' in metrics
+    with open(telemetry.json_path, encoding="utf-8") as f:
+        assert json.load(f)["run_totals"]["files"] == 400